@@ -1,7 +1,24 @@
 from client3x.client3x import (Client3XUI, Payload, CLientPayload, AsyncClient3XUI, ClientError, PanelResponse,
-                               InboundPayload, PanelResponse)
+                               InboundPayload, PanelResponse, BulkClientPayload, BulkAddResult, ChunkResult,
+                               BatchResult, InboundCache, AuthManager, AsyncAuthManager, RetryPolicy, CircuitBreaker,
+                               CircuitOpenError, RateLimiter, TokenBucket, SingleFlight,
+                               Inbound, InboundClient, ClientTraffic, JsonCodec, get_codec, set_codec,
+                               ClientPayloadTemplate, TrafficMeter, TrafficDelta,
+                               PanelMirror, MirroredInbound, MirroredClient, SyncResult,
+                               AsyncFleetClient, FleetResult, PanelResult, Placement, PlacementTarget,
+                               ReconcilePlan, ReconcileResult, plan_clients, ExpiryScheduler, ExpiryEvent, FakePanel, ClientMetrics,
+                               RequestHooks, RequestEvent)
 
 
 __author__ = 'Wertrar'
 __version__ = '1.1.0'
-__all__ = ['Client3XUI', 'Payload', 'CLientPayload', 'AsyncClient3XUI', 'ClientError', 'PanelResponse','InboundPayload']
\ No newline at end of file
+__all__ = ['Client3XUI', 'Payload', 'CLientPayload', 'AsyncClient3XUI', 'ClientError', 'PanelResponse','InboundPayload',
+           'BulkClientPayload', 'BulkAddResult', 'ChunkResult', 'BatchResult',
+           'InboundCache', 'AuthManager', 'AsyncAuthManager', 'RetryPolicy', 'CircuitBreaker', 'CircuitOpenError',
+           'RateLimiter', 'TokenBucket', 'SingleFlight', 'Inbound', 'InboundClient', 'ClientTraffic',
+           'JsonCodec', 'get_codec', 'set_codec', 'ClientPayloadTemplate', 'TrafficMeter', 'TrafficDelta',
+           'PanelMirror', 'MirroredInbound', 'MirroredClient', 'SyncResult',
+           'AsyncFleetClient', 'FleetResult', 'PanelResult', 'Placement', 'PlacementTarget',
+           'ReconcilePlan', 'ReconcileResult', 'plan_clients',
+           'ExpiryScheduler', 'ExpiryEvent', 'FakePanel', 'ClientMetrics',
+           'RequestHooks', 'RequestEvent']
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Overhead of request hooks on the request path of both clients: no hooks registered against a no-op hook
+for every event, and the cost of the checks a client without hooks runs.
+
+The transport of the clients is replaced by a stub answering at once, so only the client code is timed:
+
+    python -m client3x.benchmarks.hooks_overhead_bench --requests 100000
+"""
+import argparse
+import asyncio
+import time
+import timeit
+from types import SimpleNamespace
+
+from client3x.client3x import AsyncClient3XUI, Client3XUI, FakePanel, RequestHooks
+
+
+def add_noop_hooks(hooks: RequestHooks) -> None:
+    for event in RequestHooks.EVENTS:
+        hooks.add(event, lambda request: None)
+
+
+def bench_async(total: int) -> tuple[float, float]:
+    response = SimpleNamespace(status=200, content=SimpleNamespace(total_bytes=64))
+
+    async def send(method, url, data):
+        return response
+
+    async def run(hooked: bool) -> float:
+        client = AsyncClient3XUI('admin', 'admin', '', '127.0.0.1', 'panel', '127.0.0.1', 'sub', 1, scheme='http')
+        client._AsyncClient3XUI__send = send
+        if hooked:
+            add_noop_hooks(client.hooks)
+        started = time.perf_counter()
+        for _ in range(total):
+            await client.delete_client('5b8f3c2e-0001', 1)
+        return (time.perf_counter() - started) / total
+
+    return asyncio.run(run(False)), asyncio.run(run(True))
+
+
+def bench_sync(total: int) -> tuple[float, float]:
+    response = SimpleNamespace(status_code=200, content=b'{"success":true,"msg":"","obj":null}')
+
+    def run(panel: FakePanel, hooked: bool) -> float:
+        client = Client3XUI(**panel.client_kwargs())
+        client._Client3XUI__send = lambda method, url, data: response
+        if hooked:
+            add_noop_hooks(client.hooks)
+        started = time.perf_counter()
+        for _ in range(total):
+            client.delete_client('5b8f3c2e-0001', 1)
+        return (time.perf_counter() - started) / total
+
+    with FakePanel() as panel:  # only for the login of the constructor
+        return run(panel, False), run(panel, True)
+
+
+def main(total: int):
+    hooks = RequestHooks()
+    # what a request runs when no hooks are registered: one truth test and three None checks
+    check = min(timeit.repeat('h = hooks if hooks else None; h is not None; h is not None; h is not None',
+                              globals={'hooks': hooks}, number=total, repeat=5)) / total
+
+    print(f'requests: {total}, transport stubbed')
+    print(f'{"client":18}{"no hooks":>14}{"no-op hooks":>14}{"hook cost":>12}{"no-hook checks":>16}')
+    for name, (plain, hooked) in (('AsyncClient3XUI', bench_async(total)), ('Client3XUI', bench_sync(total))):
+        print(f'{name:18}{plain * 1e6:11.2f} us{hooked * 1e6:11.2f} us{(hooked - plain) * 1e6:9.2f} us'
+              f'{check * 1e9:9.0f} ns ({check / plain:.2%})')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=100000)
+    args = parser.parse_args()
+    main(args.requests)
@@ -0,0 +1,100 @@
+"""
+Encoding and decoding time, and peak decoding memory, of the JSON codecs on a large inbound list response
+and a bulk addClient payload: the standard library ``json`` against ``orjson`` (used by default when installed).
+
+    python -m client3x.benchmarks.json_codec_bench --inbounds 50 --clients 2000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from client3x.client3x import BulkClientPayload, codec
+from client3x.client3x.codec import JsonCodec, OrjsonCodec
+from client3x.client3x.streaming import iter_array
+
+
+def make_response(inbounds: int, clients: int) -> bytes:
+    obj = []
+    for i in range(inbounds):
+        settings = {'clients': [{'id': f'5b8f3c2e-{j:04x}-4c1d-9e7a-{i:012x}', 'flow': 'xtls-rprx-vision',
+                                 'email': f'user{i}-{j}', 'limitIp': 2, 'totalGB': 0, 'expiryTime': 0,
+                                 'enable': True, 'tgId': '', 'subId': f'sub{i}-{j}', 'reset': 0}
+                                for j in range(clients)], 'decryption': 'none', 'fallbacks': []}
+        obj.append({'id': i, 'remark': f'inbound {i}', 'port': 10000 + i, 'protocol': 'vless', 'enable': True,
+                    'settings': json.dumps(settings), 'streamSettings': json.dumps({'network': 'tcp'}),
+                    'sniffing': '{}', 'allocate': '{}',
+                    'clientStats': [{'id': j, 'inboundId': i, 'enable': True, 'email': f'user{i}-{j}',
+                                     'up': j * 1024, 'down': j * 4096, 'expiryTime': 0, 'total': 0, 'reset': 0}
+                                    for j in range(clients)]})
+    return json.dumps({'success': True, 'msg': '', 'obj': obj}).encode()
+
+
+def best_of(repeat: int, run) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def peak_memory(run) -> float:
+    """Return the peak memory allocated while running, in MB"""
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def main(inbounds: int, clients: int, repeat: int):
+    body = make_response(inbounds, clients)
+    first = json.loads(body)['obj'][0]
+    payload = BulkClientPayload(1, json.loads(first['settings'])['clients'])
+
+    backends = [JsonCodec()]
+    if codec.orjson is not None:
+        backends.append(OrjsonCodec())
+    else:
+        print('orjson is not installed, only the standard library codec is measured')
+
+    print(f'response: {len(body) / 2 ** 20:.1f} MB, {inbounds} inbounds x {clients} clients')
+    print(f'{"":38}' + ''.join(f'{backend.name:>12}' for backend in backends))
+
+    cases = [
+        ('decode list response', lambda: codec.loads(body)),
+        ('decode list response + settings', lambda: [codec.loads(inbound['settings'])
+                                                     for inbound in codec.loads(body)['obj']]),
+        ('stream list response (64 KiB chunks)', lambda: sum(1 for _ in iter_array(
+            body[i:i + 65536] for i in range(0, len(body), 65536)))),
+        (f'format bulk payload ({clients} clients)', payload.format),
+    ]
+
+    previous = codec.get_codec()
+    try:
+        for name, run in cases:
+            row = []
+            for backend in backends:
+                codec.set_codec(backend)
+                row.append(best_of(repeat, run))
+            print(f'{name:38}' + ''.join(f'{seconds * 1000:10.1f}ms' for seconds in row))
+
+        print('peak memory')
+        for name, run in cases[:3]:
+            row = []
+            for backend in backends:
+                codec.set_codec(backend)
+                row.append(peak_memory(run))
+            print(f'{name:38}' + ''.join(f'{megabytes:10.1f}MB' for megabytes in row))
+    finally:
+        codec.set_codec(previous)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--inbounds', type=int, default=50)
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    main(args.inbounds, args.clients, args.repeat)
@@ -0,0 +1,258 @@
+"""
+End-to-end throughput and tail latency of ``add_client`` and ``get_client_traffic`` for each client mode:
+``Client3XUI`` called serially, ``Client3XUI`` from a thread pool and ``AsyncClient3XUI`` with bounded concurrency.
+
+The calls go to a ``FakePanel`` started in a separate process, so the panel does not share the CPU and memory
+of the measured clients. Every scenario reports requests per second, p50/p95/p99 latency, errors and memory,
+and the results are written to JSON to compare runs across releases:
+
+    python -m client3x.benchmarks.load_bench --requests 5000 --concurrency 1 10 50 --output load-1.1.0.json
+    python -m client3x.benchmarks.load_bench --compare load-1.0.0.json load-1.1.0.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from client3x import __version__
+from client3x.client3x import AsyncClient3XUI, Client3XUI, CLientPayload, PanelResponse, RetryPolicy
+
+MODES = ('sync-serial', 'sync-threaded', 'async')
+OPERATIONS = ('add_client', 'get_client_traffic')
+ROOT = 'panel'
+
+
+class PanelProcess:
+    """A FakePanel served by a child process"""
+
+    def __init__(self, clients: int, latency: float, error_rate: float):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            self.port = sock.getsockname()[1]
+        code = 'from client3x.client3x.fakepanel import main; main()'
+        self.process = subprocess.Popen(
+            [sys.executable, '-c', code, '--port', str(self.port), '--root-url', ROOT, '--clients', str(clients),
+             '--latency', str(latency), '--error-rate', str(error_rate), '--seed', '1'],
+            stdout=subprocess.PIPE, text=True)
+        if not self.process.stdout.readline():  # printed once the panel is serving
+            raise RuntimeError('The fake panel did not start')
+
+    def client_kwargs(self) -> dict:
+        return {'login': 'admin', 'password': 'admin', 'login_key': '', 'panel_host': '127.0.0.1', 'root_url': ROOT,
+                'sub_host': '127.0.0.1', 'sub_path': 'sub', 'inbound_id': 1, 'panel_port': self.port, 'scheme': 'http'}
+
+    def close(self):
+        self.process.terminate()
+        self.process.wait()
+
+
+def rss_mb() -> tuple[float, float]:
+    """Current and peak resident set size of this process in MB"""
+    current = 0.0
+    try:
+        with open('/proc/self/statm') as statm:
+            current = int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+    except ImportError:
+        peak = 0.0
+    return current, peak
+
+
+def percentile(values: list[float], share: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(share * len(values)) - 1))]
+
+
+def failed(result) -> bool:
+    return result is None or (isinstance(result, PanelResponse) and not result.success)
+
+
+def make_calls(operation: str, mode: str, requests: int, clients: int) -> list[tuple]:
+    """Arguments of every call, new clients for add_client and existing emails for get_client_traffic"""
+    if operation == 'add_client':
+        return [(CLientPayload(1, f'load-{mode}-{i}', f'load-{mode}-{i}@example.com', 0, 0, f'load-{mode}-{i}'),)
+                for i in range(requests)]
+    return [(f'user{i * 7919 % clients}@example.com',) for i in range(requests)]
+
+
+def summarize(mode: str, operation: str, concurrency: int, latencies: list[float], errors: int, seconds: float,
+              heap_peak: float | None) -> dict:
+    latencies.sort()
+    current, peak = rss_mb()
+    return {'mode': mode, 'operation': operation, 'concurrency': concurrency, 'requests': len(latencies) + errors,
+            'errors': errors, 'seconds': round(seconds, 4), 'rps': round((len(latencies) + errors) / seconds, 1),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+            'max_ms': round(latencies[-1] * 1000 if latencies else 0.0, 3),
+            'rss_mb': round(current, 1), 'peak_rss_mb': round(peak, 1),
+            'heap_peak_mb': None if heap_peak is None else round(heap_peak, 2)}
+
+
+def run_sync(call: Callable, calls: list[tuple], concurrency: int) -> tuple[list[float], int, float]:
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(args):
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            ok = not failed(call(*args))
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - started
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    if concurrency == 1:
+        for args in calls:
+            one(args)
+    else:
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(one, calls))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run_async(call: Callable, calls: list[tuple], concurrency: int) -> tuple[list[float], int, float]:
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(args):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                ok = not failed(await call(*args))
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(args) for args in calls))
+    return latencies, errors, time.perf_counter() - started
+
+
+def run_scenario(panel: PanelProcess, mode: str, operation: str, concurrency: int, requests: int, clients: int,
+                 trace_memory: bool, retry: bool) -> dict:
+    concurrency = 1 if mode == 'sync-serial' else concurrency
+    calls = make_calls(operation, f'{mode}-{concurrency}', requests, clients)
+    kwargs = panel.client_kwargs()
+    if retry:
+        kwargs['retry_policy'] = RetryPolicy(backoff_base=0.01)
+    if trace_memory:
+        tracemalloc.start()
+
+    if mode == 'async':
+        async def run():
+            async with AsyncClient3XUI(**kwargs, limit_per_host=concurrency) as client:
+                await client.get_client_traffic('user0@example.com')  # log in outside the measurement
+                return await run_async(getattr(client, operation), calls, concurrency)
+        latencies, errors, seconds = asyncio.run(run())
+    else:
+        client = Client3XUI(**kwargs, pool_maxsize=concurrency)
+        latencies, errors, seconds = run_sync(getattr(client, operation), calls, concurrency)
+        client.session.close()
+
+    heap_peak = None
+    if trace_memory:
+        heap_peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return summarize(mode, operation, concurrency, latencies, errors, seconds, heap_peak)
+
+
+def print_row(row: dict) -> None:
+    print(f"{row['mode']:14} {row['operation']:19} {row['concurrency']:5} {row['rps']:10.1f} "
+          f"{row['p50_ms']:9.2f} {row['p95_ms']:9.2f} {row['p99_ms']:9.2f} {row['errors']:7} {row['rss_mb']:8.1f}")
+
+
+def compare(old_path: str, new_path: str) -> None:
+    """Print the change of throughput and p99 latency of the scenarios both runs have"""
+    with open(old_path) as old_file, open(new_path) as new_file:
+        old, new = json.load(old_file), json.load(new_file)
+    key = lambda row: (row['mode'], row['operation'], row['concurrency'])
+    old_rows = {key(row): row for row in old['results']}
+    print(f"{old['version']} -> {new['version']}")
+    print(f"{'mode':14} {'operation':19} {'conc':>5} {'rps':>10} {'change':>8} {'p99 ms':>9} {'change':>8}")
+    for row in new['results']:
+        before = old_rows.get(key(row))
+        if before is None:
+            continue
+        rps_change = row['rps'] / before['rps'] - 1 if before['rps'] else 0.0
+        p99_change = row['p99_ms'] / before['p99_ms'] - 1 if before['p99_ms'] else 0.0
+        print(f"{row['mode']:14} {row['operation']:19} {row['concurrency']:5} {row['rps']:10.1f} {rps_change:+8.1%} "
+              f"{row['p99_ms']:9.2f} {p99_change:+8.1%}")
+
+
+def main(args) -> None:
+    panel = PanelProcess(args.clients, args.latency, args.error_rate)
+    results = []
+    print(f'requests: {args.requests}, panel clients: {args.clients}, panel latency: {args.latency} s')
+    print(f"{'mode':14} {'operation':19} {'conc':>5} {'rps':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'errors':>7} {'rss MB':>8}")
+    try:
+        for operation in args.operations:
+            for mode in args.modes:
+                for concurrency in ([1] if mode == 'sync-serial' else args.concurrency):
+                    row = run_scenario(panel, mode, operation, concurrency, args.requests, args.clients,
+                                       args.trace_memory, args.retry)
+                    results.append(row)
+                    print_row(row)
+    finally:
+        panel.close()
+
+    if args.output:
+        report = {'version': __version__, 'python': platform.python_version(), 'platform': platform.platform(),
+                  'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                  'settings': {'requests': args.requests, 'clients': args.clients, 'latency': args.latency,
+                               'error_rate': args.error_rate, 'retry': args.retry},
+                  'results': results}
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f'results written to {args.output}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000, help='calls per scenario')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 50],
+                        help='threads of sync-threaded and concurrent calls of async')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--operations', nargs='+', choices=OPERATIONS, default=list(OPERATIONS))
+    parser.add_argument('--clients', type=int, default=10000, help='clients of the fake panel')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds the fake panel adds to every call')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of calls the fake panel fails')
+    parser.add_argument('--retry', action='store_true', help='give the clients a RetryPolicy')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='also report the peak Python heap of each scenario, slows the calls down')
+    parser.add_argument('--output', help='JSON file for the results')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two JSON result files and exit')
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+    else:
+        main(args)
@@ -0,0 +1,156 @@
+"""
+Time and peak allocation of the CPU hot paths outside the network: building and formatting client and inbound
+payloads, creating ``PanelResponse`` objects and the double decode of ``get_clients_in_inbound()``,
+on inbounds with 1k, 10k and 100k clients.
+
+Times are the best of ``--repeat`` samples of at least 100 ms, allocation is the tracemalloc peak of a separate run.
+``--save`` writes the results as a baseline, ``--check`` compares against one and exits with status 1 if a case
+got slower or allocates more than the tolerances allow:
+
+    python -m client3x.benchmarks.micro_bench --save micro-baseline.json
+    python -m client3x.benchmarks.micro_bench --check micro-baseline.json --time-tolerance 0.3
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from client3x.client3x import BulkClientPayload, CLientPayload, InboundPayload, PanelResponse, codec
+
+
+def make_clients(count: int) -> list[dict]:
+    return [{'id': f'5b8f3c2e-{i:04x}-4c1d-9e7a-{i:012x}', 'flow': 'xtls-rprx-vision', 'email': f'user{i}@example.com',
+             'limitIp': 2, 'totalGB': 50 * 1024 ** 3, 'expiryTime': 1767225600000 + i, 'enable': True, 'tgId': '',
+             'subId': f'sub{i:012x}', 'reset': 0} for i in range(count)]
+
+
+def make_inbound(clients: list[dict]) -> dict:
+    """An inbound as the panel sends it, with settings as a JSON string and one clientStats entry per client"""
+    settings = {'clients': clients, 'decryption': 'none', 'fallbacks': []}
+    return {'id': 1, 'up': 0, 'down': 0, 'total': 0, 'remark': 'bench', 'enable': True, 'expiryTime': 0,
+            'listen': '', 'port': 443, 'protocol': 'vless', 'tag': 'inbound-443', 'settings': json.dumps(settings),
+            'streamSettings': json.dumps({'network': 'tcp', 'security': 'reality'}), 'sniffing': '{}', 'allocate': '{}',
+            'clientStats': [{'id': i, 'inboundId': 1, 'enable': True, 'email': client['email'], 'up': i * 1024,
+                             'down': i * 4096, 'expiryTime': client['expiryTime'], 'total': client['totalGB'],
+                             'reset': 0, 'lastOnline': 0} for i, client in enumerate(clients)]}
+
+
+def make_cases(count: int) -> list[tuple[str, callable]]:
+    clients = make_clients(count)
+    rows = [(1, client['id'], client['email'], client['limitIp'], client['expiryTime'], client['subId'])
+            for client in clients]
+    payloads = [CLientPayload(*row) for row in rows]
+    bulk = BulkClientPayload(1, clients)
+    settings = {'clients': clients, 'decryption': 'none', 'fallbacks': []}
+    inbound = make_inbound(clients)
+    get_body = json.dumps({'success': True, 'msg': '', 'obj': inbound})
+    list_body = json.dumps({'success': True, 'msg': '', 'obj': [inbound]})
+
+    def get_clients_in_inbound():
+        data = codec.loads(get_body)
+        return codec.loads(data['obj']['settings'])['clients']
+
+    return [
+        ('CLientPayload.__init__', lambda: [CLientPayload(*row) for row in rows]),
+        ('CLientPayload.format', lambda: [payload.format() for payload in payloads]),
+        ('BulkClientPayload.format', bulk.format),
+        ('BulkClientPayload.format chunks of 100', lambda: [chunk.format() for chunk in bulk.chunks(100)]),
+        ('InboundPayload.__init__', lambda: InboundPayload(443, {'network': 'tcp'}, settings=settings)),
+        ('PanelResponse from get_inbounds body', lambda: PanelResponse(codec.loads(list_body))),
+        ('get_clients_in_inbound decode', get_clients_in_inbound),
+    ]
+
+
+def best_time(run, repeat: int, min_sample: float = 0.1) -> float:
+    """
+    Best time of one call over `repeat` samples, a sample loops until it takes `min_sample` seconds.
+
+    The garbage collector is off while timing, as in timeit, so collections of the fixtures do not land in random samples.
+    """
+    def sample(loops: int) -> float:
+        started = time.perf_counter()
+        for _ in range(loops):
+            run()
+        return time.perf_counter() - started
+
+    gc.collect()
+    gc.disable()
+    try:
+        loops = 1
+        while (elapsed := sample(loops)) < min_sample:
+            loops *= 2
+        return min([elapsed] + [sample(loops) for _ in range(repeat - 1)]) / loops
+    finally:
+        gc.enable()
+
+
+def peak_allocation(run) -> float:
+    """Peak memory allocated while running, in MB"""
+    gc.collect()
+    tracemalloc.start()
+    result = run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return peak / 2 ** 20
+
+
+def measure(sizes: list[int], repeat: int) -> dict[str, dict]:
+    results = {}
+    print(f'{"case":40} {"clients":>8} {"time ms":>10} {"peak MB":>9}')
+    for count in sizes:
+        for name, run in make_cases(count):
+            seconds = best_time(run, repeat)
+            peak = peak_allocation(run)
+            results[f'{name} [{count}]'] = {'seconds': seconds, 'peak_mb': peak}
+            print(f'{name:40} {count:8} {seconds * 1000:10.2f} {peak:9.2f}')
+    return results
+
+
+def check(results: dict[str, dict], baseline: dict[str, dict], time_tolerance: float, memory_tolerance: float) -> list[str]:
+    """Return the cases that got slower or allocate more than the baseline allows"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if result['seconds'] > base['seconds'] * (1 + time_tolerance):
+            regressions.append(f'{key}: {result["seconds"] * 1000:.2f} ms, baseline {base["seconds"] * 1000:.2f} ms')
+        # a little slack so that tiny cases do not fail on allocator noise
+        if result['peak_mb'] > base['peak_mb'] * (1 + memory_tolerance) + 0.01:
+            regressions.append(f'{key}: {result["peak_mb"]:.2f} MB peak, baseline {base["peak_mb"]:.2f} MB')
+    return regressions
+
+
+def main(args) -> int:
+    results = measure(args.sizes, args.repeat)
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump({'codec': codec.get_codec().name, 'results': results}, file, indent=2)
+        print(f'baseline written to {args.save}')
+
+    if args.check:
+        with open(args.check) as file:
+            baseline = json.load(file)
+        if baseline.get('codec') != codec.get_codec().name:
+            print(f'warning: baseline measured with the {baseline.get("codec")} codec, now {codec.get_codec().name}')
+        regressions = check(results, baseline['results'], args.time_tolerance, args.memory_tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        print(f'{len(regressions)} regressions against {args.check}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='clients per inbound')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--save', help='write the results to this baseline file')
+    parser.add_argument('--check', help='compare the results with this baseline file')
+    parser.add_argument('--time-tolerance', type=float, default=0.3, help='allowed slowdown, 0.3 is 30%%')
+    parser.add_argument('--memory-tolerance', type=float, default=0.10, help='allowed growth of the peak allocation')
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,73 @@
+"""
+Memory held by panel clients and traffic statistics as plain dicts (what the panel JSON decodes to)
+against the slotted ``InboundClient`` and ``ClientTraffic`` models.
+
+Both representations are decoded from the same JSON text, the memory still allocated after decoding is compared:
+
+    python -m client3x.benchmarks.models_memory_bench --clients 100000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from client3x.client3x import InboundClient, ClientTraffic
+
+
+def make_settings(count: int) -> str:
+    return json.dumps({'clients': [
+        {'id': f'5b8f3c2e-{i:04x}-4c1d-9e7a-{i:012x}', 'flow': 'xtls-rprx-vision', 'email': f'user{i}@example.com',
+         'limitIp': 2, 'totalGB': 50 * 1024 ** 3, 'expiryTime': 1767225600000 + i, 'enable': True, 'tgId': '',
+         'subId': f'sub{i:012x}', 'comment': '', 'reset': 0}
+        for i in range(count)]})
+
+
+def make_stats(count: int) -> str:
+    return json.dumps([
+        {'id': i, 'inboundId': 1, 'enable': True, 'email': f'user{i}@example.com', 'up': i * 1024,
+         'down': i * 4096, 'expiryTime': 1767225600000 + i, 'total': 50 * 1024 ** 3, 'reset': 0, 'lastOnline': 0}
+        for i in range(count)])
+
+
+def measure(build) -> tuple[float, float]:
+    """Return the retained memory in MB and the build time in seconds"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return retained / 2 ** 20, elapsed
+
+
+def main(count: int):
+    settings = make_settings(count)
+    stats = make_stats(count)
+
+    rows = [
+        ('clients as dicts', lambda: json.loads(settings)['clients']),
+        ('clients as InboundClient', lambda: [InboundClient.from_json(c) for c in json.loads(settings)['clients']]),
+        ('stats as dicts', lambda: json.loads(stats)),
+        ('stats as ClientTraffic', lambda: [ClientTraffic.from_json(s) for s in json.loads(stats)]),
+    ]
+
+    print(f'clients: {count}')
+    results = {}
+    for name, build in rows:
+        results[name] = retained, elapsed = measure(build)
+        print(f'{name:26}: {retained:8.1f} MB retained, {elapsed:6.2f} s to decode')
+
+    for kind, model in (('clients', 'InboundClient'), ('stats', 'ClientTraffic')):
+        saved = 1 - results[f'{kind} as {model}'][0] / results[f'{kind} as dicts'][0]
+        print(f'{model} saves {saved:.0%} of the dict memory')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=100000)
+    args = parser.parse_args()
+    main(args.clients)
@@ -0,0 +1,56 @@
+"""
+Time to create and format addClient payloads for many clients of one inbound:
+``CLientPayload`` per client against ``ClientPayloadTemplate``, and formatting a bulk payload again (as on a resend).
+
+    python -m client3x.benchmarks.payload_template_bench --clients 10000
+"""
+import argparse
+import time
+
+from client3x.client3x import CLientPayload, BulkClientPayload, ClientPayloadTemplate
+
+
+def timed(run, repeat: int = 5) -> float:
+    """Return the best time of `repeat` runs"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main(count: int):
+    clients = [(f'5b8f3c2e-{i:04x}-4c1d-9e7a-{i:012x}', f'user{i}@example.com', f'sub{i:012x}') for i in range(count)]
+    template = ClientPayloadTemplate(1, limitip=2, expiry_time=1767225600000, additional_fields={'tgId': '', 'comment': ''})
+
+    def single_payloads():
+        for client_id, email, subid in clients:
+            CLientPayload(1, client_id, email, 2, 1767225600000, subid,
+                          additional_fields={'tgId': '', 'comment': ''}).format()
+
+    def single_templates():
+        for client_id, email, subid in clients:
+            template.payload(client_id, email, subid).format()
+
+    plain_bulk = BulkClientPayload(1, [template.client(*client) for client in clients])
+    template_bulk = template.bulk(clients)
+    template_bulk.format()
+
+    print(f'clients: {count}')
+    print(f'{"create + format, CLientPayload":44}: {timed(single_payloads) * 1000:8.1f} ms')
+    print(f'{"create + format, template":44}: {timed(single_templates) * 1000:8.1f} ms')
+    print(f'{"create bulk payload, template":44}: {timed(lambda: template.bulk(clients)) * 1000:8.1f} ms')
+    print(f'{"format bulk again, BulkClientPayload":44}: {timed(plain_bulk.format) * 1000:8.1f} ms')
+    print(f'{"format bulk again, cached":44}: {timed(template_bulk.format) * 1000:8.1f} ms')
+    print(f'{"format 100-client chunks, BulkClientPayload":44}: '
+          f'{timed(lambda: [chunk.format() for chunk in plain_bulk.chunks(100)]) * 1000:8.1f} ms')
+    print(f'{"format 100-client chunks, template":44}: '
+          f'{timed(lambda: [chunk.format() for chunk in template_bulk.chunks(100)]) * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=10000)
+    args = parser.parse_args()
+    main(args.clients)
@@ -0,0 +1,99 @@
+"""
+Requests-per-second comparison of a fresh ``aiohttp.ClientSession`` per request
+(the behaviour before the pooled session) against the pooled ``AsyncClient3XUI`` session.
+
+Runs against a minimal local stand-in panel, so no real panel is needed:
+
+    python -m client3x.benchmarks.session_pool_bench --requests 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import time
+
+import aiohttp
+from aiohttp import web
+from yarl import URL
+
+from client3x.client3x import AsyncClient3XUI
+
+ROOT = 'panel-root'
+INBOUNDS = {"success": True, "msg": "", "obj": [{"id": 1, "remark": "bench", "port": 443, "clientStats": []}]}
+
+
+def make_app() -> web.Application:
+    async def login(request):
+        resp = web.json_response({"success": True, "msg": "", "obj": None})
+        resp.set_cookie('3x-ui', 'bench-session')
+        return resp
+
+    async def inbounds(request):
+        return web.json_response(INBOUNDS)
+
+    app = web.Application()
+    app.router.add_post(f'/{ROOT}/login', login)
+    app.router.add_get(f'/{ROOT}/panel/api/inbounds/list', inbounds)
+    return app
+
+
+async def run_fresh_sessions(base_url: str, total: int, concurrency: int) -> float:
+    """Old behaviour: log in once, then open and close a session for every request"""
+    async with aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True)) as session:
+        async with session.post(f'{base_url}/login', data={}) as resp:
+            await resp.read()
+            cookies = session.cookie_jar.filter_cookies(URL(base_url))
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f'{base_url}/panel/api/inbounds/list', cookies=cookies) as resp:
+                    await resp.json()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return total / (time.perf_counter() - started)
+
+
+async def run_pooled_client(port: int, total: int, concurrency: int) -> float:
+    client = AsyncClient3XUI('admin', 'admin', '', '127.0.0.1', ROOT, '127.0.0.1', 'sub', 1,
+                             panel_port=port, scheme='http', limit_per_host=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await client.get_inbounds()
+
+    try:
+        await client.get_inbounds()
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return total / (time.perf_counter() - started)
+    finally:
+        await client.close()
+
+
+async def main(total: int, concurrency: int, port: int):
+    runner = web.AppRunner(make_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', port)
+    await site.start()
+    try:
+        fresh = await run_fresh_sessions(f'http://127.0.0.1:{port}/{ROOT}', total, concurrency)
+        pooled = await run_pooled_client(port, total, concurrency)
+    finally:
+        await runner.cleanup()
+
+    print(f'requests: {total}, concurrency: {concurrency}')
+    print(f'fresh session per request : {fresh:10.1f} req/s')
+    print(f'pooled client session     : {pooled:10.1f} req/s')
+    print(f'speedup                   : {pooled / fresh:10.2f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--port', type=int, default=18080)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.port))
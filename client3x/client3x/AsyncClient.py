@@ -1,31 +1,64 @@
 import asyncio
-import json
+import contextlib
+import itertools
+import time
+import warnings
 from logging import Logger
+from typing import AsyncIterator, Callable, Iterable, Optional
+from urllib.parse import urlencode
 
 import aiohttp
 from aiohttp import ClientResponse
+from yarl import URL
 import logging
 
 from client3x.client3x import InboundPayload
-from client3x.client3x.ClientPayload import CLientPayload
-from client3x.client3x.PanelResponse import PanelResponse
+from client3x.client3x import codec
+from client3x.client3x.ClientPayload import CLientPayload, BulkClientPayload
+from client3x.client3x.cache import InboundCache
+from client3x.client3x.PanelResponse import PanelResponse, BulkAddResult, ChunkResult
 from client3x.client3x.payload import Payload
 from client3x.client3x.errors import ClientError
+from client3x.client3x.batch import BatchResult, batch_call_args
+from client3x.client3x.reconcile import ReconcileResult, plan_clients
+from client3x.client3x.auth import AsyncAuthManager
+from client3x.client3x.retry import RetryPolicy, CircuitBreaker
+from client3x.client3x.ratelimit import RateLimiter
+from client3x.client3x.singleflight import SingleFlight
+from client3x.client3x.streaming import aiter_array
+from client3x.client3x.metrics import ClientMetrics, endpoint_template
+from client3x.client3x.hooks import RequestEvent, RequestHooks
 
 class AsyncClient3XUI:
-    def __init__(self, login, password, login_key, panel_host, root_url, sub_host, sub_path, inbound_id, panel_port = None, sub_port = None, logging_enabled = False,timeout = 300):
+    def __init__(self, login, password, login_key, panel_host, root_url, sub_host, sub_path, inbound_id, panel_port = None, sub_port = None, logging_enabled = False,timeout = 300,
+                 scheme = 'https', limit_per_host = 10, keepalive_timeout = 30, dns_cache_ttl = 300,
+                 cache: InboundCache | None = None, retry_policy: RetryPolicy | None = None,
+                 circuit_breaker: CircuitBreaker | None = None, rate_limiter: RateLimiter | None = None,
+                 coalesce: bool = True, metrics: ClientMetrics | None = None, hooks: RequestHooks | None = None):
 
 
         self.inbound = inbound_id
 
+        self.cache = cache
+
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+
+        self.single_flight = SingleFlight() if coalesce else None
+
+        self.metrics = metrics
+        self.hooks = hooks if hooks is not None else RequestHooks()
+
         self.login_payload = {
             "username": login,
             "password": password,
             "loginSecret": login_key
         }
 
-        self.base_url = f'https://{panel_host}:{panel_port}/{root_url}' if panel_port else f'https://{panel_host}/{root_url}'
-        self.sub_url = f'https://{sub_host}:{sub_port}/{sub_path}/' if sub_port else f'https://{sub_host}/{sub_path}/'
+        self.base_url = f'{scheme}://{panel_host}:{panel_port}/{root_url}' if panel_port else f'{scheme}://{panel_host}/{root_url}'
+        self.sub_url = f'{scheme}://{sub_host}:{sub_port}/{sub_path}/' if sub_port else f'{scheme}://{sub_host}/{sub_path}/'
+
+        self.rate_limiter = RateLimiter.shared(self.base_url, rate_limiter) if rate_limiter is not None else None
 
         self.logger: Logger | None = None
 
@@ -38,11 +71,18 @@ class AsyncClient3XUI:
             self.logger.info(f'Panel base url : {self.base_url}\n')
             self.logger.info(f'Panel sub url : {self.sub_url}\n')
             self.logger.info('Client initialization complete')
-            self.logger.info(f'Start Fetching  cookies from server with timeout of {timeout} seconds')
+            self.logger.info(f'Panel session is renewed on demand and at most every {timeout} seconds')
 
         self.cookie = None
         self.timeout = timeout
         self.task = None
+        self.auth = AsyncAuthManager(self.__fetch_cookies, max_age=timeout)
+
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.session: aiohttp.ClientSession | None = None
+        self.__loop: asyncio.AbstractEventLoop | None = None
 
 
 
@@ -53,77 +93,308 @@ class AsyncClient3XUI:
             if self.logger:
                     self.logger.info('Background task was cancelled.')
 
+        # the session can only be closed gracefully by close(), drop its connections as a last resort
+        session = getattr(self, 'session', None)
+        if session is not None and not session.closed:
+            connector = session.connector
+            session.detach()
+            with contextlib.suppress(Exception):
+                closing = connector.close()
+                if asyncio.iscoroutine(closing):
+                    try:
+                        asyncio.get_running_loop().create_task(closing)
+                    except RuntimeError:
+                        closing.close()  # no running loop, its connections are gone with it
+            warnings.warn('AsyncClient3XUI was not closed, use "async with AsyncClient3XUI(...)" or "await client.close()"',
+                          ResourceWarning, source=self)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
     async def start(self):
-        self.task = asyncio.create_task(self.update_cookies_periodically())
+        """
+        Log in to the panel.
+
+        Calling start() is optional, the client logs in before its first request and again
+        whenever the panel reports an expired session or the session is older than `timeout` seconds.
+        """
+        self.__bind_loop()
+        await self.auth.ensure()
+
+    async def close(self):
+        """Cancel the background task and close the pooled session"""
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+        if self.session and not self.session.closed:
+            await self.session.close()
+            if self.logger:
+                self.logger.info('Client session closed')
+        self.session = None
+
+
+    def __get_session(self) -> aiohttp.ClientSession:
+        """
+        Returns the long-lived session of the client, creating it on first use.
+
+        All requests of the client share one connection pool, so keep-alive connections
+        to the panel are reused instead of opening a new TCP+TLS connection per request.
+        The cookie jar is created with ``unsafe=True`` so that panels addressed by IP keep their cookies.
+        """
+        self.__bind_loop()
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self.limit_per_host,
+                                             keepalive_timeout=self.keepalive_timeout,
+                                             ttl_dns_cache=self.dns_cache_ttl)
+            self.session = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.CookieJar(unsafe=True))
+        return self.session
+
+    def __bind_loop(self) -> None:
+        """
+        Bind the client to the running event loop.
+
+        The pooled session only works on the loop that created it. When the client is used again from a new loop,
+        e.g. by a second asyncio.run(), the session of the finished loop is dropped and the client logs in again.
+
+        :raise RuntimeError: If the client is still in use by another running loop.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is self.__loop:
+            return
+        if self.__loop is not None:
+            if self.__loop.is_running():
+                raise RuntimeError('AsyncClient3XUI is in use by another running event loop, '
+                                   'create one client per event loop')
+            if self.session is not None and not self.session.closed:
+                connector = self.session.connector
+                self.session.detach()
+                # the connections belong to the finished loop, close them without waiting for it
+                closing = connector.close()
+                if self.__loop.is_closed():
+                    asyncio.ensure_future(closing)
+            self.session = None
+            self.auth.reset()
+            if self.logger:
+                self.logger.info('Client moved to a new event loop, the session is created again')
+        self.__loop = loop
 
 
     async def __fetch_cookies(self):
-        """Get new cookies from server by /login POST request"""
+        """
+        Get new cookies from server by /login POST request.
+
+        Called by the auth manager, raises ClientError if the panel rejects the login.
+        """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(f'{self.base_url}/login', data=self.login_payload) as response:
-                    if response.status == 200:
-                        self.cookie = session.cookie_jar.filter_cookies(f'{self.base_url}')
-                        if self.logger:
-                            self.logger.info('Updated cookies. ')
-                    else:
-                        if self.logger:
-                            self.logger.error(f'Failed to update cookies. Wrong status : {response.status}')
+            session = self.__get_session()
+            async with session.post(f'{self.base_url}/login', data=self.login_payload) as response:
+                status = response.status
+                rejected = self.auth.login_error(await response.read()) if status == 200 else None
+                if status == 200 and rejected is None:
+                    self.cookie = session.cookie_jar.filter_cookies(URL(self.base_url))
+                    if self.metrics is not None:
+                        self.metrics.login()
+                    if self.logger:
+                        self.logger.info('Updated cookies. ')
+                    return
         except Exception as e:
             if self.logger:
                 self.logger.error(f'Failed to update cookies.\nError: {repr(e)}')
+            raise ClientError(f'Failed to update cookies \nError: {repr(e)}', 0)
+
+        if rejected is not None:
+            if self.logger:
+                self.logger.error(f'Failed to update cookies. Login rejected : {rejected}')
+            raise ClientError(f'Failed to update cookies. Login rejected : {rejected}', status)
+        if self.logger:
+            self.logger.error(f'Failed to update cookies. Wrong status : {status}')
+        raise ClientError('Failed to update cookies. Wrong status :', status)
 
 
     async def update_cookies_periodically(self):
-        """Update cookies every  timeout seconds"""
+        """
+        Update cookies every  timeout seconds.
+
+        Not needed anymore, expired sessions are renewed on demand. Kept for code that still runs it as a task.
+        """
         while True:
-            await self.__fetch_cookies()
+            try:
+                await self.auth.refresh(self.auth.generation)
+            except ClientError:
+                pass
             await asyncio.sleep(self.timeout)
 
-    async def __post_request(self, url: str, payload: Payload|None) -> ClientResponse:
-        if not self.cookie:
-            await self.__fetch_cookies()
+    async def __send(self, method: str, url: str, data: dict | None = None) -> ClientResponse:
+        """
+        Send one request through the pooled session and read the body before the connection is released.
+
+        If the panel session has expired, log in again and repeat the request once.
+        """
+        generation = await self.auth.ensure()
+        async with self.__get_session().request(method, url, data=data) as resp:
+            await resp.read()
+
+        if self.auth.is_expired(resp.status, resp.history, resp.url):
+            if self.metrics is not None:
+                self.metrics.auth_refresh()
+            if self.logger:
+                self.logger.info(f'Panel session expired [{resp.status}], logging in again')
+            await self.auth.refresh(generation)
+            async with self.__get_session().request(method, url, data=data) as resp:
+                await resp.read()
+
+        return resp
+
+    @staticmethod
+    def __never_sent(error: Exception) -> bool:
+        """Check if a failed request never reached the panel: the login failed or no connection was made"""
+        return isinstance(error, (ClientError, aiohttp.ClientConnectorError, aiohttp.ConnectionTimeoutError))
+
+    async def __request(self, method: str, url: str, payload: Payload | None, idempotent: bool = True,
+                        read: bool = False) -> ClientResponse:
+        """
+        Sends a request with the rate limiter, the retry policy and the circuit breaker of the client.
+
+        Transport errors and 5xx responses count as panel failures. A retryable failure is retried
+        with backoff while the retry policy allows it, the last response of retryable statuses is returned.
+
+        :param method: str : HTTP method.
+        :param url: str : The URL of the request.
+        :param payload: Payload | None : The data to be sent in the body of the request.
+        :param idempotent: bool : Whether repeating the request is safe.
+        :param read: bool : Whether the request only reads data, it then takes a token of the read bucket.
+        :return resp: ClientResponse : The response object with its body already read.
+        :raise ClientError: If the panel can not be reached, CircuitOpenError if its circuit breaker is open.
+        """
+        self.__bind_loop()
+        data = payload.format() if payload is not None else None
+        policy = self.retry_policy
+        breaker = self.circuit_breaker
+        limiter = self.rate_limiter
+        metrics = self.metrics
+        hooks = self.hooks if self.hooks else None
+        if metrics is not None or hooks is not None:
+            path = url[len(self.base_url):]
+            bytes_out = len(urlencode(data)) if data else 0
+        started = time.monotonic()
+
+        for attempt in itertools.count(1):
+            if breaker is not None:
+                breaker.before_call()
+
+            try:
+                if limiter is not None:
+                    waited = await limiter.acquire_async(RateLimiter.READ if read else RateLimiter.WRITE)
+                    if waited and self.logger:
+                        self.logger.debug(f'{method} {url} delayed {waited:.2f}s by the rate limiter')
+
+                if hooks is not None:
+                    event = RequestEvent(method, url, endpoint_template(path), attempt, bytes_out)
+                    await hooks.emit_async('before_request', event, self.logger)
+
+                sent = time.perf_counter()
+                resp = await self.__send(method, url, data)
+
+            except Exception as e:
+                status = e.status if isinstance(e, ClientError) else 0
+                elapsed = time.perf_counter() - sent
+                failure = status == 0 or status >= 500
+                if breaker is not None:
+                    breaker.record_failure() if failure else breaker.record_success()
+                if metrics is not None:
+                    metrics.observe(method, path, status, elapsed, bytes_out)
+                if hooks is not None:
+                    event.status, event.seconds, event.error = status, elapsed, e
+                    await hooks.emit_async('on_error', event, self.logger)
+
+                delay = None
+                if policy is not None and (failure or status in policy.retry_statuses):
+                    delay = policy.next_delay(attempt, time.monotonic() - started, idempotent, not self.__never_sent(e))
+
+                if delay is None:
+                    if self.logger:
+                        self.logger.error(f'Failed to send {method} request.\nUrl: {url}\nPayload : {payload}\nError: {repr(e)}')
+                    if isinstance(e, ClientError):
+                        raise
+                    raise ClientError('Client error: ' + repr(e), 0)
+
+                if metrics is not None:
+                    metrics.retry(method, path)
+                if self.logger:
+                    self.logger.warning(f'{method} {url} failed ({repr(e)}), retry {attempt} in {delay:.2f}s')
+                await asyncio.sleep(delay)
+                continue
+
+            except BaseException:
+                # cancelled, e.g. by a timeout of the caller: give back the call reserved from the breaker
+                if breaker is not None:
+                    breaker.release_probe()
+                raise
+
+            elapsed = time.perf_counter() - sent
+            if breaker is not None:
+                breaker.record_failure() if resp.status >= 500 else breaker.record_success()
+            if metrics is not None:
+                metrics.observe(method, path, resp.status, elapsed, bytes_out, resp.content.total_bytes)
+            if hooks is not None:
+                event.status, event.seconds, event.bytes_in = resp.status, elapsed, resp.content.total_bytes
+                await hooks.emit_async('after_response', event, self.logger)
+
+            if policy is not None and resp.status in policy.retry_statuses:
+                delay = policy.next_delay(attempt, time.monotonic() - started, idempotent, True)
+                if delay is not None:
+                    if metrics is not None:
+                        metrics.retry(method, path)
+                    if self.logger:
+                        self.logger.warning(f'{method} {url} [{resp.status}], retry {attempt} in {delay:.2f}s')
+                    await asyncio.sleep(delay)
+                    continue
+
+            if self.logger:
+                self.logger.info(f'{method} {url} [{resp.status}]')
+            return resp
+
+    async def __post_request(self, url: str, payload: Payload|None, idempotent: bool = True,
+                             read: bool = False) -> ClientResponse:
         """
             Sends an asynchronous POST request to a specified URL with the given payload.
 
-            This function handles the login process before sending the request and ensures
-            the session is closed after the request is completed.
+            The request goes through the pooled session of the client. The response body is read
+            before the connection is returned to the pool, so the returned response stays readable.
+            If the panel session has expired, the client logs in again and retries the request once.
+            Failures are retried according to the retry policy of the client.
 
 
             :param url: str : The URL to which the POST request is sent.
             :param payload: Payload: The data to be sent in the body of the POST request.
+            :param idempotent: bool : Whether repeating the request is safe, False for requests that create objects.
+            :param read: bool : Whether the request only reads data, rate limited as a read.
 
             :return resp: ClientResponce : The response object from the POST request.
 
             :raise: ClientError: If there is an issue connecting to the panel or if the client encounters an error.
         """
+        return await self.__request('POST', url, payload, idempotent, read)
 
-        async with aiohttp.ClientSession() as session:
-            try:
-
-                resp = await session.post(url, data=payload.format(), cookies=self.cookie)
-                if self.logger:
-                    self.logger.info(f'POST {url} [{resp.status}]')
-                return resp
-
-            except Exception as e:
-                if self.logger:
-                    self.logger.error(f'Failed to send POST request.\nUrl: {url}\nPayload : {payload}\nError: {repr(e)}')
-                raise ClientError('Client error: ' + repr(e), resp.status)
-            finally:
-                await session.close()
 
 
-
-    async def __get_request(self, url: str) -> ClientResponse:
+    async def __get_request(self, url: str, idempotent: bool = True) -> ClientResponse:
         """
         Sends an asynchronous GET request to a specified URL.
 
-        This function handles the login process before sending the request and ensures
-        the session is closed after the request is completed.
+        The request goes through the pooled session of the client. The response body is read
+        before the connection is returned to the pool, so the returned response stays readable.
+        If the panel session has expired, the client logs in again and retries the request once.
+        Failures are retried according to the retry policy of the client.
 
         Parameters:
         url (str): The URL to which the GET request is sent.
+        idempotent (bool): Whether repeating the request is safe.
 
         Returns:
         aiohttp.ClientResponse: The response object from the GET request.
@@ -131,18 +402,103 @@ class AsyncClient3XUI:
         Raises:
         ClientError: If there is an issue connecting to the panel or if the client encounters an error.
         """
-        if not self.cookie:
-            await self.__fetch_cookies()
-        async with aiohttp.ClientSession() as session:
-            try:
-                resp = await session.get(url,cookies=self.cookie)
-                if self.logger:
-                    self.logger.info(f'GET {url} [{resp.status}]')
-                return resp
-            except Exception as e:
-                raise ClientError('Client error: ' + repr(e),0)
-            finally:
-                await session.close()
+        return await self.__request('GET', url, None, idempotent, read=True)
+
+    async def __get_json(self, url: str) -> dict:
+        """
+        Sends a GET request and decodes its JSON body.
+
+        Concurrent calls for the same URL share one request, unless coalescing is disabled. Only the body text
+        is shared, every caller decodes its own copy, so a caller changing its result does not affect the others.
+
+        :param url: str : The URL to which the GET request is sent.
+        :return data: dict : The decoded body.
+        """
+        async def fetch():
+            resp = await self.__get_request(url)
+            return await resp.json(loads=str)  # checks the content type, decoded by each caller
+
+        if self.single_flight is None:
+            body = await fetch()
+        else:
+            body = await self.single_flight.do(('GET', url), fetch)
+        return codec.loads(body) if body is not None else None
+
+    @contextlib.asynccontextmanager
+    async def __stream(self, url: str) -> AsyncIterator[ClientResponse]:
+        """
+        Opens a GET request whose body is read by the caller while it arrives.
+
+        The request is rate limited and guarded by the circuit breaker, and sent again once if the panel session
+        has expired, but it is not retried: a failure may happen after part of the body was consumed.
+
+        :param url: str : The URL to which the GET request is sent.
+        :return resp: ClientResponse : The response with its body not read yet.
+        :raise ClientError: If the panel can not be reached or does not answer with 200.
+        """
+        self.__bind_loop()
+        breaker = self.circuit_breaker
+        metrics = self.metrics
+        hooks = self.hooks if self.hooks else None
+        if breaker is not None:
+            breaker.before_call()
+
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(RateLimiter.READ)
+
+            if hooks is not None:
+                event = RequestEvent('GET', url, endpoint_template(url[len(self.base_url):]), 1, 0)
+                await hooks.emit_async('before_request', event, self.logger)
+
+            sent = time.perf_counter()
+            generation = await self.auth.ensure()
+            resp = await self.__get_session().get(url)
+            if self.auth.is_expired(resp.status, resp.history, resp.url):
+                resp.release()
+                if metrics is not None:
+                    metrics.auth_refresh()
+                await self.auth.refresh(generation)
+                resp = await self.__get_session().get(url)
+        except Exception as e:
+            status = e.status if isinstance(e, ClientError) else 0
+            elapsed = time.perf_counter() - sent
+            if breaker is not None:
+                breaker.record_failure() if status == 0 or status >= 500 else breaker.record_success()
+            if metrics is not None:
+                metrics.observe('GET', url[len(self.base_url):], status, elapsed)
+            if hooks is not None:
+                event.status, event.seconds, event.error = status, elapsed, e
+                await hooks.emit_async('on_error', event, self.logger)
+            if self.logger:
+                self.logger.error(f'Failed to send GET request.\nUrl: {url}\nError: {repr(e)}')
+            if isinstance(e, ClientError):
+                raise
+            raise ClientError('Client error: ' + repr(e), 0)
+        except BaseException:
+            if breaker is not None:
+                breaker.release_probe()
+            raise
+
+        if breaker is not None:
+            breaker.record_failure() if resp.status >= 500 else breaker.record_success()
+        if self.logger:
+            self.logger.info(f'GET {url} [{resp.status}] streaming')
+
+        try:
+            if resp.status != 200:
+                raise ClientError(f'Panel answered {resp.reason}', resp.status)
+            yield resp
+        except aiohttp.ClientError as e:
+            raise ClientError('Client error: ' + repr(e), resp.status)
+        finally:
+            resp.release()
+            elapsed = time.perf_counter() - sent
+            if metrics is not None:
+                metrics.observe('GET', url[len(self.base_url):], resp.status, elapsed, bytes_in=resp.content.total_bytes)
+            if hooks is not None:
+                event.status, event.seconds, event.bytes_in = resp.status, elapsed, resp.content.total_bytes
+                await hooks.emit_async('after_response', event, self.logger)
 
 
     def __check_inbound(self, inbound_id: int | None) -> int:
@@ -161,6 +517,73 @@ class AsyncClient3XUI:
             return inbound_id
 
 
+    async def __write_through(self, resp: ClientResponse, inbound_id: int, apply: Callable[[InboundCache], None]) -> None:
+        """
+        Apply a client write to the cached inbound snapshot if the panel accepted it,
+        otherwise drop the snapshot so the next read fetches the real state.
+        """
+        try:
+            success = resp.ok and (await resp.json(content_type=None, loads=codec.loads)).get('success', False)
+        except ValueError:
+            success = False
+
+        if success:
+            apply(self.cache)
+        else:
+            self.cache.invalidate(inbound_id)
+
+
+#---------------------------------------------------- Batch ------------------------------------------------------------
+
+    async def batch_map(self, method, items: Iterable, concurrency: int = 10,
+                        progress_callback: Callable[[int, int, BatchResult], None] | None = None) -> list[BatchResult]:
+        """
+        Calls a client method for every item with at most `concurrency` calls in flight.
+
+        Results are returned in the order of `items`. An exception raised for one item is stored
+        in its BatchResult and does not stop the other calls.
+
+        :param method: Callable | str : A client coroutine method or its name, e.g. client.get_client_traffic or 'get_client_traffic'.
+        :param items: Iterable : The method arguments, a tuple is unpacked into positional arguments and a dict into keyword arguments.
+        :param concurrency: int : The maximum number of simultaneous calls.
+        :param progress_callback: Optional(Callable) : Called as progress_callback(done, total, result) after every item.
+            An exception raised by the callback is logged and does not stop the batch.
+        :return results: list[BatchResult] : One result per item.
+        """
+        if isinstance(method, str):
+            method = getattr(self, method)
+        if concurrency < 1:
+            raise ValueError(f'Concurrency must be positive, got {concurrency}')
+
+        items = list(items)
+        results: list[BatchResult | None] = [None] * len(items)
+        pending = iter(enumerate(items))
+        done = 0
+
+        async def worker():
+            nonlocal done
+            for index, item in pending:
+                args, kwargs = batch_call_args(item)
+                try:
+                    results[index] = BatchResult(item, result=await method(*args, **kwargs))
+                except Exception as e:
+                    if self.logger:
+                        self.logger.error(f'Batch call {getattr(method, "__name__", method)} failed for {item!r}: {repr(e)}')
+                    results[index] = BatchResult(item, error=e)
+
+                done += 1
+                if progress_callback:
+                    try:
+                        progress_callback(done, len(items), results[index])
+                    except Exception as e:
+                        if self.logger:
+                            self.logger.error(f'Batch progress callback failed for {item!r}: {repr(e)}')
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(items)))))
+        return results
+
+#---------------------------------------------------- Batch ------------------------------------------------------------
+
 #-------------------------------------------------- Inbounds -----------------------------------------------------------
     async def get_inbounds(self) -> PanelResponse:
         """
@@ -169,9 +592,25 @@ class AsyncClient3XUI:
 
         url = f'{self.base_url}/panel/api/inbounds/list'
 
-        data = await self.__get_request(url)
+        return PanelResponse(await self.__get_json(url))
 
-        return PanelResponse(await data.json())
+    async def iter_inbounds(self, fields: Iterable[str] | None = None, chunk_size: int = 64 * 1024) -> AsyncIterator[dict]:
+        """
+        Streams the list of inbounds, yielding the inbounds one at a time while the response arrives.
+
+        Unlike get_inbounds(), the whole response is never held in memory: every inbound is decoded when it
+        is complete and only the requested fields are kept. The request is not retried.
+
+        :param fields: Iterable[str] | None : Fields of the inbound to keep, e.g. ('id', 'remark', 'clientStats'). All fields if None.
+        :param chunk_size: int : Bytes read from the connection at a time.
+        :return: AsyncIterator[dict] : The inbounds.
+        :raise ClientError: If the request fails or the panel answers with success false.
+        """
+        url = f'{self.base_url}/panel/api/inbounds/list'
+
+        async with self.__stream(url) as resp:
+            async for inbound in aiter_array(resp.content.iter_chunked(chunk_size), fields, resp.status):
+                yield inbound
 
     async def online_clients(self)  -> PanelResponse:
         """
@@ -180,9 +619,9 @@ class AsyncClient3XUI:
 
         url = f'{self.base_url}/panel/api/inbounds/onlines'
 
-        data = await self.__post_request(url, payload=None)
+        data = await self.__post_request(url, payload=None, read=True)
 
-        return PanelResponse(await data.json())
+        return PanelResponse(await data.json(loads=codec.loads))
 
 
     async def reset_all_traffics(self):
@@ -192,6 +631,8 @@ class AsyncClient3XUI:
 
         url = f'{self.base_url}/panel/api/inbounds/resetAllTraffics'
         await self.__post_request(url, payload=None)
+        if self.cache is not None:
+            self.cache.invalidate()
         if self.logger:
             self.logger.info('All clients traffic data reset')
 
@@ -203,7 +644,7 @@ class AsyncClient3XUI:
         """
 
         url = f'{self.base_url}/panel/api/inbounds/createbackup'
-        await self.__get_request(url)
+        await self.__get_request(url, idempotent=False)
         if self.logger:
             self.logger.info('Panel backup created')
 
@@ -221,12 +662,12 @@ class AsyncClient3XUI:
 
         url = f'{self.base_url}/panel/api/inbounds/add'
 
-        response = await self.__post_request(url, payload=inbound_paload)
+        response = await self.__post_request(url, payload=inbound_paload, idempotent=False)
 
-        return PanelResponse(await response.json())
+        return PanelResponse(await response.json(loads=codec.loads))
 
 
-    async def get_inbound(self, inbound_id: int) -> PanelResponse:
+    async def get_inbound(self, inbound_id: Optional[int] = None) -> PanelResponse:
         """
         Gets an inbound.
 
@@ -235,11 +676,19 @@ class AsyncClient3XUI:
         """
         inbound_id = self.__check_inbound(inbound_id)
 
+        if self.cache is not None:
+            obj = self.cache.inbound(inbound_id)
+            if obj is not None:
+                return PanelResponse({'success': True, 'msg': '', 'obj': obj})
+
         url = f'{self.base_url}/panel/api/inbounds/get/{inbound_id}'
 
-        response = await self.__get_request(url)
+        data = await self.__get_json(url)
+
+        if self.cache is not None and data.get('success') and data.get('obj'):
+            self.cache.put(inbound_id, dict(data['obj']))
 
-        return PanelResponse(await response.json())
+        return PanelResponse(data)
 
     async def update_inbound(self, inbound_payload: InboundPayload, inbound_id = None) -> PanelResponse:
         """
@@ -256,7 +705,10 @@ class AsyncClient3XUI:
 
         response = await self.__post_request(url, payload=inbound_payload)
 
-        return PanelResponse(await response.json())
+        if self.cache is not None:
+            self.cache.invalidate(inbound_id)
+
+        return PanelResponse(await response.json(loads=codec.loads))
 
     async def delete_inbound(self, inbound_id=None) -> None:
         """
@@ -270,6 +722,9 @@ class AsyncClient3XUI:
 
         await self.__post_request(url, payload=None)
 
+        if self.cache is not None:
+            self.cache.invalidate(inbound_id)
+
 
     async def reset_all_clients_in_inbound(self, inbound_id=None) -> None:
         """
@@ -280,6 +735,8 @@ class AsyncClient3XUI:
         inbound_id = self.__check_inbound(inbound_id)
         url = f'{self.base_url}/panel/api/inbounds/resetAllClientTraffics/{inbound_id}'
         await self.__post_request(url, payload=None)
+        if self.cache is not None:
+            self.cache.invalidate(inbound_id)
 
 
     async def delete_depleted_clients(self, inbound_id=None) -> None:
@@ -292,6 +749,8 @@ class AsyncClient3XUI:
         post_request_url = f'{self.base_url}/panel/api/inbounds/delDepletedClients/{inbound_id}'
 
         await self.__post_request(post_request_url, None)
+        if self.cache is not None:
+            self.cache.invalidate(inbound_id)
 
 
     async def get_clients_in_inbound(self, inbound_id=None) -> list:
@@ -303,14 +762,21 @@ class AsyncClient3XUI:
 
         inbound_id = self.__check_inbound(inbound_id)
 
+        if self.cache is not None:
+            clients = self.cache.clients(inbound_id)
+            if clients is not None:
+                return clients
+
         get_request_url = f'{self.base_url}/panel/api/inbounds/get/{inbound_id}'
 
         resp = await self.__get_request(get_request_url)
         data = await resp.text()
 
         if resp.ok:
-            data = json.loads(data)
-            data = json.loads(data['obj']['settings'])
+            data = codec.loads(data)
+            if self.cache is not None and data.get('obj'):
+                return [dict(client) for client in self.cache.put(inbound_id, data['obj']).clients]
+            data = codec.loads(data['obj']['settings'])
             clients = data['clients']
             return clients  # возвращает список клиентов
 
@@ -330,9 +796,7 @@ class AsyncClient3XUI:
 
         url = f'{self.base_url}/panel/api/inbounds/getClientTraffics/{email}'
 
-        data = await self.__get_request(url)
-
-        return PanelResponse(await data.json())
+        return PanelResponse(await self.__get_json(url))
 
 
     async def  get_client_traffic_by_id(self, client_id :str) -> PanelResponse:
@@ -344,9 +808,7 @@ class AsyncClient3XUI:
 
         url = f'{self.base_url}/panel/api/inbounds/getClientTrafficsById/{client_id}'
 
-        data = await self.__get_request(url)
-
-        return PanelResponse(await data.json())
+        return PanelResponse(await self.__get_json(url))
 
 
     async def add_client(self, payload: CLientPayload) -> str:
@@ -360,7 +822,11 @@ class AsyncClient3XUI:
 
         post_request_url = f"{self.base_url}/panel/api/inbounds/addClient"
 
-        resp = await self.__post_request(post_request_url, payload)
+        resp = await self.__post_request(post_request_url, payload, idempotent=False)
+
+        if self.cache is not None:
+            await self.__write_through(resp, payload.data["inbound"],
+                                       lambda cache: cache.add_clients(payload.data["inbound"], payload.data["settings"]["clients"]))
 
         if resp.ok:
             sublink = self.sub_url + payload.data["settings"]["clients"][0]["subId"]
@@ -369,6 +835,100 @@ class AsyncClient3XUI:
             raise ClientError("Couldn't connect to panel", resp.status)
 
 
+    async def add_clients_bulk(self, payload: BulkClientPayload | list[CLientPayload], chunk_size: int = 100) -> BulkAddResult:
+        """
+        Adds many clients to an inbound, sending up to chunk_size clients per addClient request.
+
+        A failed chunk does not stop the remaining chunks, check the result for per-chunk status.
+
+        :param payload: BulkClientPayload | list[CLientPayload] : The clients to add.
+        :param chunk_size: int : The maximum number of clients per request.
+        :return result: BulkAddResult : A sublink per client (None if not added) and per-chunk results.
+        """
+        if not isinstance(payload, BulkClientPayload):
+            payload = BulkClientPayload.from_payloads(payload)
+
+        post_request_url = f"{self.base_url}/panel/api/inbounds/addClient"
+
+        sublinks = []
+        chunks = []
+        for index, chunk in enumerate(payload.chunks(chunk_size)):
+            emails = [client.get("email") for client in chunk.clients]
+            try:
+                resp = await self.__post_request(post_request_url, chunk, idempotent=False)
+                status = resp.status
+                success, message = resp.ok, resp.reason
+                if resp.ok:
+                    response = PanelResponse(await resp.json(content_type=None, loads=codec.loads))
+                    success, message = response.success, response.message
+            except ClientError as e:
+                status, success, message = e.status, False, e.txt
+            except ValueError as e:
+                success, message = False, f'Invalid panel response: {e!r}'
+
+            if self.cache is not None:
+                if success:
+                    self.cache.add_clients(chunk.data["inbound"], chunk.clients)
+                else:
+                    self.cache.invalidate(chunk.data["inbound"])
+
+            if success:
+                sublinks.extend(self.sub_url + client["subId"] for client in chunk.clients)
+            else:
+                sublinks.extend(None for _ in chunk.clients)
+                if self.logger:
+                    self.logger.error(f'Failed to add clients chunk {index} [{status}]: {message}')
+
+            chunks.append(ChunkResult(index, index * chunk_size, emails, success, status, message))
+
+        return BulkAddResult(sublinks, chunks)
+
+
+    async def reconcile_clients(self, desired: Iterable[dict | CLientPayload], inbound_id=None, key: str = 'email',
+                                chunk_size: int = 100, concurrency: int = 10, dry_run: bool = False) -> ReconcileResult:
+        """
+        Makes the clients of an inbound match the desired ones with the fewest writes.
+
+        The current clients are read from the panel, bypassing the cache, and diffed with the desired ones by `key`.
+        Clients that are not desired are deleted first, then changed clients are updated and missing ones are added
+        with add_clients_bulk(). A failed write does not stop the others, check the result.
+
+        :param desired: Iterable[dict | CLientPayload] : All clients the inbound should have, dicts in the panel format.
+        :param inbound_id: Optional(int) : inbound id, if None then uses self.inbound
+        :param key: str : Field identifying a client, 'email' or 'id'.
+        :param chunk_size: int : The maximum number of clients per addClient request.
+        :param concurrency: int : The maximum number of simultaneous update and delete calls.
+        :param dry_run: bool : Only compute the plan, result.plan, without writing.
+        :return result: ReconcileResult : The plan and the results of its writes.
+        """
+        inbound_id = self.__check_inbound(inbound_id)
+        if self.cache is not None:
+            self.cache.invalidate(inbound_id)
+
+        inbound = await self.get_inbound(inbound_id)
+        if not inbound.success or not inbound.obj:
+            raise ClientError(f"Couldn't read the clients of inbound {inbound_id}", 0)
+        current = codec.loads(inbound.obj['settings'])['clients']
+
+        plan = plan_clients(inbound_id, current, desired, key, inbound.obj['protocol'])
+        result = ReconcileResult(plan)
+        if dry_run:
+            return result
+
+        if plan.delete:
+            deletes = [(client_id, inbound_id) for client_id in plan.delete]
+            result.deleted = await self.batch_map(self.delete_client, deletes, concurrency)
+        if plan.update:
+            updates = [(client_id, CLientPayload.from_client(inbound_id, client)) for client_id, client in plan.update]
+            result.updated = await self.batch_map(self.update_client, updates, concurrency)
+        if plan.add:
+            result.added = await self.add_clients_bulk(BulkClientPayload(inbound_id, plan.add), chunk_size)
+
+        if self.logger:
+            self.logger.info(f'Reconciled inbound {inbound_id}: {plan!r}, success: {result.success}')
+        return result
+
+
     async def update_client(self, client_id: str, payload: CLientPayload) -> str:
         """
         Update client info in inbound
@@ -381,6 +941,11 @@ class AsyncClient3XUI:
         post_request_url = f'{self.base_url}/panel/api/inbounds/updateClient/{client_id}'
         resp = await self.__post_request(post_request_url, payload)
 
+        if self.cache is not None:
+            await self.__write_through(resp, payload.data["inbound"],
+                                       lambda cache: cache.update_client(payload.data["inbound"], client_id,
+                                                                         payload.data["settings"]["clients"][0]))
+
         if resp.ok:
             sublink = self.sub_url + payload.data["settings"]["clients"][0]["subId"]
             return sublink
@@ -399,7 +964,10 @@ class AsyncClient3XUI:
 
         post_request_url = f"{self.base_url}/panel/api/inbounds/{inbound_id}/delClient/{client_id}"
 
-        await self.__post_request(post_request_url, None)
+        resp = await self.__post_request(post_request_url, None)
+
+        if self.cache is not None:
+            await self.__write_through(resp, inbound_id, lambda cache: cache.delete_client(inbound_id, client_id))
 
 
     async def client_ipaddress(self, email: str) -> PanelResponse:
@@ -411,8 +979,8 @@ class AsyncClient3XUI:
 
         url = f'{self.base_url}/panel/api/inbounds/clientIps/{email}'
 
-        data = await self.__post_request(url,payload=None)
-        return PanelResponse(await data.json())
+        data = await self.__post_request(url, payload=None, read=True)
+        return PanelResponse(await data.json(loads=codec.loads))
 
 
     async def clear_client_ipadresses(self, email : str):
@@ -435,6 +1003,8 @@ class AsyncClient3XUI:
         inbound_id = self.__check_inbound(inbound_id)
         url = f'{self.base_url}/panel/api/inbounds/{inbound_id}/resetClientTraffic/{email}'
         await self.__post_request(url, payload=None)
+        if self.cache is not None:
+            self.cache.invalidate(inbound_id)
 
 # ------------------------------------------------ Client ---------------------------------------------------------------
 
@@ -1,17 +1,35 @@
-import json
+import contextlib
+import itertools
 import logging
+import threading
+import time
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from logging import Logger
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional
+from urllib.parse import urlencode
 
 from aiohttp import InvalidURL
 from requests import Session, Response
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError, ConnectTimeout, RequestException
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
 
 from client3x.client3x import InboundPayload
-from client3x.client3x.ClientPayload import CLientPayload
+from client3x.client3x import codec
+from client3x.client3x.ClientPayload import CLientPayload, BulkClientPayload
+from client3x.client3x.cache import InboundCache
 from client3x.client3x.payload import Payload
 from client3x.client3x.errors import ClientError
-from client3x.client3x.PanelResponse import PanelResponse
+from client3x.client3x.PanelResponse import PanelResponse, BulkAddResult, ChunkResult
+from client3x.client3x.batch import BatchResult, batch_call_args
+from client3x.client3x.reconcile import ReconcileResult, plan_clients
+from client3x.client3x.auth import AuthManager
+from client3x.client3x.retry import RetryPolicy, CircuitBreaker
+from client3x.client3x.ratelimit import RateLimiter
+from client3x.client3x.streaming import iter_array
+from client3x.client3x.metrics import ClientMetrics, endpoint_template
+from client3x.client3x.hooks import RequestEvent, RequestHooks
 
 
 class Client3XUI:
@@ -19,12 +37,31 @@ class Client3XUI:
                  panel_host, root_url,
                  sub_host, sub_path,
                  inbound_id,
-                 panel_port=None, sub_port=None, logging_enabled=False):
+                 panel_port=None, sub_port=None, logging_enabled=False,
+                 scheme='https', pool_maxsize=10, cache: InboundCache | None = None,
+                 retry_policy: RetryPolicy | None = None, circuit_breaker: CircuitBreaker | None = None,
+                 rate_limiter: RateLimiter | None = None, metrics: ClientMetrics | None = None,
+                 hooks: RequestHooks | None = None):
 
         self.inbound = inbound_id
 
         self.session = None
 
+        self.cache = cache
+
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+
+        self.metrics = metrics
+        self.hooks = hooks if hooks is not None else RequestHooks()
+
+        self.__pool_maxsize = pool_maxsize
+        self.__adapter = HTTPAdapter(pool_maxsize=pool_maxsize)
+        self.__local = threading.local()
+        self.__owner_thread = threading.get_ident()
+
+        self.auth = AuthManager(self.__login)
+
         self.login_payload = {
             "username": login,
             "password": password,
@@ -32,8 +69,10 @@ class Client3XUI:
         }
 
 
-        self.base_url = f'https://{panel_host}:{panel_port}/{root_url}' if panel_port else f'https://{panel_host}/{root_url}'
-        self.sub_url = f'https://{sub_host}:{sub_port}/{sub_path}' if sub_port else f'https://{sub_host}/{sub_path}'
+        self.base_url = f'{scheme}://{panel_host}:{panel_port}/{root_url}' if panel_port else f'{scheme}://{panel_host}/{root_url}'
+        self.sub_url = f'{scheme}://{sub_host}:{sub_port}/{sub_path}' if sub_port else f'{scheme}://{sub_host}/{sub_path}'
+
+        self.rate_limiter = RateLimiter.shared(self.base_url, rate_limiter) if rate_limiter is not None else None
 
         self.logger: Logger | None = None
 
@@ -65,17 +104,38 @@ class Client3XUI:
 
     def __get_session(self) -> Session:
         """Get client session"""
+        session: Session = Session()
+        self.__mount_adapter(session)
+        self.session = session
+        self.auth.ensure()
+        return session
+
+    def __login(self) -> None:
+        """
+        Log in to the panel by /login POST request.
+
+        The session cookie lands in the cookie jar shared by all thread sessions.
+        Called by the auth manager on the first request and whenever the panel session has expired.
+        """
         try:
-            session: Session = Session()
-            with session.post(f'{self.base_url}/login', data=self.login_payload) as response:
+            with self.__thread_session().post(f'{self.base_url}/login', data=self.login_payload) as response:
+                rejected = self.auth.login_error(response.content) if response.status_code == 200 else None
+                if rejected is not None:
+                    if self.logger:
+                        self.logger.error(f'Login rejected : {rejected}')
+                    raise ClientError(f'Failed to set client session. Login rejected : {rejected}', response.status_code)
                 if response.status_code == 200:
-
+                    if self.metrics is not None:
+                        self.metrics.login()
                     if self.logger:
                         self.logger.info(f'Set client session [{response.status_code}]')
-                    return session
+                    return
                 else:
                     raise ClientError('Failed to set client session. Wrong status :', response.status_code)
 
+        except ClientError:
+            raise
+
         except InvalidURL as e:
             if self.logger:
                 self.logger.error(f'Invalid URL: {repr(e)}')
@@ -87,59 +147,285 @@ class Client3XUI:
             raise ClientError(f'Failed to set client session \nError: {repr(e)}', 0)
 
 
-    def __post_request(self, url: str, payload: Payload | None) -> Response:
+    def __mount_adapter(self, session: Session) -> None:
+        """Route all requests of the session through the shared connection pool adapter"""
+        session.mount('https://', self.__adapter)
+        session.mount('http://', self.__adapter)
+
+    def __resize_pool(self, pool_maxsize: int) -> None:
+        """
+        Grow the shared connection pool so it can hold pool_maxsize connections to the panel.
+
+        Thread sessions notice the new adapter and remount it on their next request.
+        The connections pooled by the old adapter are closed.
+        """
+        if pool_maxsize <= self.__pool_maxsize:
+            return
+        old_adapter = self.__adapter
+        self.__pool_maxsize = pool_maxsize
+        self.__adapter = HTTPAdapter(pool_maxsize=pool_maxsize)
+        self.__mount_adapter(self.session)
+        old_adapter.close()
+
+    def __thread_session(self) -> Session:
+        """
+        Returns the session of the calling thread.
+
+        requests.Session is not thread safe, so every worker thread gets its own Session.
+        All of them share the cookie jar of the main session, which keeps the login, and one
+        HTTPAdapter, which keeps a single thread safe connection pool to the panel.
+        """
+        if threading.get_ident() == self.__owner_thread:
+            return self.session
+
+        session = getattr(self.__local, 'session', None)
+        if session is None:
+            session = Session()
+            session.cookies = self.session.cookies
+            self.__local.session = session
+        if getattr(self.__local, 'adapter', None) is not self.__adapter:
+            self.__mount_adapter(session)
+            self.__local.adapter = self.__adapter
+        return session
+
+
+    def __send(self, method: str, url: str, data: dict | None) -> Response:
+        """Send one request, logging in again and repeating it once if the panel session has expired"""
+        generation = self.auth.ensure()
+        resp = self.__thread_session().request(method, url, data=data)
+
+        if self.auth.is_expired(resp.status_code, resp.history, resp.url):
+            if self.metrics is not None:
+                self.metrics.auth_refresh()
+            if self.logger:
+                self.logger.info(f'Panel session expired [{resp.status_code}], logging in again')
+            self.auth.refresh(generation)
+            resp = self.__thread_session().request(method, url, data=data)
+
+        return resp
+
+    @staticmethod
+    def __never_sent(error: Exception) -> bool:
+        """Check if a failed request never reached the panel: the login failed or no connection was made"""
+        if isinstance(error, (ClientError, ConnectTimeout)):
+            return True
+        reason = getattr(error.args[0], 'reason', None) if isinstance(error, RequestsConnectionError) and error.args else None
+        return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+    def __request(self, method: str, url: str, payload: Payload | None, idempotent: bool = True,
+                  read: bool = False) -> Response:
+        """
+        Sends a request with the rate limiter, the retry policy and the circuit breaker of the client.
+
+        Transport errors and 5xx responses count as panel failures. A retryable failure is retried
+        with backoff while the retry policy allows it, the last response of retryable statuses is returned.
+
+        :param method: str : HTTP method.
+        :param url: str : The URL of the request.
+        :param payload: Payload | None : The data to be sent in the body of the request.
+        :param idempotent: bool : Whether repeating the request is safe.
+        :param read: bool : Whether the request only reads data, it then takes a token of the read bucket.
+        :return resp: Response : The response object.
+        :raise ClientError: If the panel can not be reached, CircuitOpenError if its circuit breaker is open.
+        """
+        data = None if payload is None else payload.format()
+        policy = self.retry_policy
+        breaker = self.circuit_breaker
+        limiter = self.rate_limiter
+        metrics = self.metrics
+        hooks = self.hooks if self.hooks else None
+        if metrics is not None or hooks is not None:
+            path = url[len(self.base_url):]
+            bytes_out = len(urlencode(data)) if data else 0
+        started = time.monotonic()
+
+        for attempt in itertools.count(1):
+            if breaker is not None:
+                breaker.before_call()
+
+            try:
+                if limiter is not None:
+                    waited = limiter.acquire(RateLimiter.READ if read else RateLimiter.WRITE)
+                    if waited and self.logger:
+                        self.logger.debug(f'{method} {url} delayed {waited:.2f}s by the rate limiter')
+
+                if hooks is not None:
+                    event = RequestEvent(method, url, endpoint_template(path), attempt, bytes_out)
+                    hooks.emit('before_request', event, self.logger)
+
+                sent = time.perf_counter()
+                resp = self.__send(method, url, data)
+
+            except Exception as e:
+                status = e.status if isinstance(e, ClientError) else 0
+                elapsed = time.perf_counter() - sent
+                failure = status == 0 or status >= 500
+                if breaker is not None:
+                    breaker.record_failure() if failure else breaker.record_success()
+                if metrics is not None:
+                    metrics.observe(method, path, status, elapsed, bytes_out)
+                if hooks is not None:
+                    event.status, event.seconds, event.error = status, elapsed, e
+                    hooks.emit('on_error', event, self.logger)
+
+                delay = None
+                if policy is not None and (failure or status in policy.retry_statuses):
+                    delay = policy.next_delay(attempt, time.monotonic() - started, idempotent, not self.__never_sent(e))
+
+                if delay is None:
+                    if self.logger:
+                        self.logger.error(f'Failed to send {method} request.\nUrl: {url}\nPayload : {payload}\nError: {repr(e)}')
+                    if isinstance(e, ClientError):
+                        raise
+                    raise ClientError('Client error: ' + repr(e), 0)
+
+                if metrics is not None:
+                    metrics.retry(method, path)
+                if self.logger:
+                    self.logger.warning(f'{method} {url} failed ({repr(e)}), retry {attempt} in {delay:.2f}s')
+                time.sleep(delay)
+                continue
+
+            except BaseException:
+                # interrupted, e.g. by KeyboardInterrupt: give back the call reserved from the breaker
+                if breaker is not None:
+                    breaker.release_probe()
+                raise
+
+            elapsed = time.perf_counter() - sent
+            if breaker is not None:
+                breaker.record_failure() if resp.status_code >= 500 else breaker.record_success()
+            if metrics is not None:
+                metrics.observe(method, path, resp.status_code, elapsed, bytes_out, len(resp.content))
+            if hooks is not None:
+                event.status, event.seconds, event.bytes_in = resp.status_code, elapsed, len(resp.content)
+                hooks.emit('after_response', event, self.logger)
+
+            if policy is not None and resp.status_code in policy.retry_statuses:
+                delay = policy.next_delay(attempt, time.monotonic() - started, idempotent, True)
+                if delay is not None:
+                    if metrics is not None:
+                        metrics.retry(method, path)
+                    if self.logger:
+                        self.logger.warning(f'{method} {url} [{resp.status_code}], retry {attempt} in {delay:.2f}s')
+                    time.sleep(delay)
+                    continue
+
+            if self.logger:
+                self.logger.info(f'{method} {url} [{resp.status_code}]')
+            return resp
+
+    def __post_request(self, url: str, payload: Payload | None, idempotent: bool = True,
+                       read: bool = False) -> Response:
         """
             Sends an asynchronous POST request to a specified URL with the given payload.
 
-            This function handles the login process before sending the request and ensures
-            the session is closed after the request is completed.
+            If the panel session has expired, the client logs in again and retries the request once.
+            Failures are retried according to the retry policy of the client.
 
 
             :param url: str : The URL to which the POST request is sent.
             :param payload: Payload: The data to be sent in the body of the POST request.
+            :param idempotent: bool : Whether repeating the request is safe, False for requests that create objects.
+            :param read: bool : Whether the request only reads data, rate limited as a read.
 
             :return resp: Responce : The response object from the POST request.
 
             :raise: ClientError: If there is an issue connecting to the panel or if the client encounters an error.
         """
+        return self.__request('POST', url, payload, idempotent, read)
 
-
-        try:
-            if payload is None:
-                resp = self.session.post(url, data=payload)
-            else:
-                resp = self.session.post(url, data=payload.format())
-            
-            if self.logger:
-                self.logger.info(f'POST {url} [{resp.status_code}]')
-            return resp
-
-        except Exception as e:
-            if self.logger:
-                self.logger.error(f'Failed to send POST request.\nUrl: {url}\nPayload : {payload}\nError: {repr(e)}')
-            raise ClientError('Client error: ' + repr(e), 0)
-
-    def __get_request(self, url: str) -> Response:
+    def __get_request(self, url: str, idempotent: bool = True) -> Response:
         """
         Sends an asynchronous GET request to a specified URL.
 
-        This function handles the login process before sending the request and ensures
-        the session is closed after the request is completed.
+        If the panel session has expired, the client logs in again and retries the request once.
+        Failures are retried according to the retry policy of the client.
 
         Parameters:
         :param url: str:  The URL to which the GET request is sent.
+        :param idempotent: bool : Whether repeating the request is safe.
 
         :return resp: Response : The response object from the GET request.
 
         :raise ClientError : If there is an issue connecting to the panel or if the client encounters an error.
         """
+        return self.__request('GET', url, None, idempotent, read=True)
+
+    @contextlib.contextmanager
+    def __stream(self, url: str) -> Iterator[Response]:
+        """
+        Opens a GET request whose body is read by the caller while it arrives.
+
+        The request is rate limited and guarded by the circuit breaker, and sent again once if the panel session
+        has expired, but it is not retried: a failure may happen after part of the body was consumed.
+
+        :param url: str : The URL to which the GET request is sent.
+        :return resp: Response : The response with its body not read yet.
+        :raise ClientError: If the panel can not be reached or does not answer with 200.
+        """
+        breaker = self.circuit_breaker
+        metrics = self.metrics
+        hooks = self.hooks if self.hooks else None
+        if breaker is not None:
+            breaker.before_call()
+
         try:
-            resp = self.session.get(url)
-            if self.logger:
-                self.logger.info(f'GET {url} [{resp.status_code}]')
-            return resp
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(RateLimiter.READ)
+
+            if hooks is not None:
+                event = RequestEvent('GET', url, endpoint_template(url[len(self.base_url):]), 1, 0)
+                hooks.emit('before_request', event, self.logger)
+
+            sent = time.perf_counter()
+            generation = self.auth.ensure()
+            resp = self.__thread_session().get(url, stream=True)
+            if self.auth.is_expired(resp.status_code, resp.history, resp.url):
+                resp.close()
+                if metrics is not None:
+                    metrics.auth_refresh()
+                self.auth.refresh(generation)
+                resp = self.__thread_session().get(url, stream=True)
         except Exception as e:
+            status = e.status if isinstance(e, ClientError) else 0
+            elapsed = time.perf_counter() - sent
+            if breaker is not None:
+                breaker.record_failure() if status == 0 or status >= 500 else breaker.record_success()
+            if metrics is not None:
+                metrics.observe('GET', url[len(self.base_url):], status, elapsed)
+            if hooks is not None:
+                event.status, event.seconds, event.error = status, elapsed, e
+                hooks.emit('on_error', event, self.logger)
+            if self.logger:
+                self.logger.error(f'Failed to send GET request.\nUrl: {url}\nError: {repr(e)}')
+            if isinstance(e, ClientError):
+                raise
             raise ClientError('Client error: ' + repr(e), 0)
+        except BaseException:
+            if breaker is not None:
+                breaker.release_probe()
+            raise
+
+        if breaker is not None:
+            breaker.record_failure() if resp.status_code >= 500 else breaker.record_success()
+        if self.logger:
+            self.logger.info(f'GET {url} [{resp.status_code}] streaming')
+
+        try:
+            if resp.status_code != 200:
+                raise ClientError(f'Panel answered {resp.reason}', resp.status_code)
+            yield resp
+        except RequestException as e:
+            raise ClientError('Client error: ' + repr(e), resp.status_code)
+        finally:
+            elapsed = time.perf_counter() - sent
+            if metrics is not None:
+                metrics.observe('GET', url[len(self.base_url):], resp.status_code, elapsed, bytes_in=resp.raw.tell())
+            if hooks is not None:
+                event.status, event.seconds, event.bytes_in = resp.status_code, elapsed, resp.raw.tell()
+                hooks.emit('after_response', event, self.logger)
+            resp.close()
 
     def __check_inbound(self, inbound_id: int | None) -> int:
         """
@@ -157,6 +443,75 @@ class Client3XUI:
             return inbound_id
 
 
+    def __write_through(self, resp: Response, inbound_id: int, apply: Callable[[InboundCache], None]) -> None:
+        """
+        Apply a client write to the cached inbound snapshot if the panel accepted it,
+        otherwise drop the snapshot so the next read fetches the real state.
+        """
+        try:
+            success = resp.ok and codec.loads(resp.content).get('success', False)
+        except ValueError:
+            success = False
+
+        if success:
+            apply(self.cache)
+        else:
+            self.cache.invalidate(inbound_id)
+
+
+#---------------------------------------------------- Batch ------------------------------------------------------------
+
+    def batch_map(self, method, items: Iterable, workers: int = 8,
+                  progress_callback: Callable[[int, int, BatchResult], None] | None = None) -> list[BatchResult]:
+        """
+        Calls a client method for every item in a pool of `workers` threads.
+
+        The connection pool is grown to `workers` connections, so every thread gets its own
+        keep-alive connection to the panel. Results are returned in the order of `items`.
+        An exception raised for one item is stored in its BatchResult and does not stop the other calls.
+
+        :param method: Callable | str : A client method or its name, e.g. client.delete_client or 'delete_client'.
+        :param items: Iterable : The method arguments, a tuple is unpacked into positional arguments and a dict into keyword arguments.
+        :param workers: int : The number of worker threads.
+        :param progress_callback: Optional(Callable) : Called in the calling thread as progress_callback(done, total, result) after every item.
+            An exception raised by the callback is logged and does not stop the batch.
+        :return results: list[BatchResult] : One result per item.
+        """
+        if isinstance(method, str):
+            method = getattr(self, method)
+        if workers < 1:
+            raise ValueError(f'Workers must be positive, got {workers}')
+
+        items = list(items)
+        results: list[BatchResult | None] = [None] * len(items)
+
+        def run(index, item) -> BatchResult:
+            args, kwargs = batch_call_args(item)
+            try:
+                results[index] = BatchResult(item, result=method(*args, **kwargs))
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f'Batch call {getattr(method, "__name__", method)} failed for {item!r}: {repr(e)}')
+                results[index] = BatchResult(item, error=e)
+            return results[index]
+
+        self.__resize_pool(workers)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='client3x-batch') as executor:
+            futures = [executor.submit(run, index, item) for index, item in enumerate(items)]
+            for done, future in enumerate(as_completed(futures), start=1):
+                if progress_callback:
+                    result = future.result()
+                    try:
+                        progress_callback(done, len(items), result)
+                    except Exception as e:
+                        if self.logger:
+                            self.logger.error(f'Batch progress callback failed for {result.item!r}: {repr(e)}')
+
+        return results
+
+#---------------------------------------------------- Batch ------------------------------------------------------------
+
 #-------------------------------------------------- Inbounds -----------------------------------------------------------
     def get_inbounds(self) -> PanelResponse:
         """
@@ -165,10 +520,27 @@ class Client3XUI:
 
         url = f'{self.base_url}/panel/api/inbounds/list'
 
-        data = self.__get_request(url).json()
+        data = codec.loads(self.__get_request(url).content)
 
         return PanelResponse(data)
 
+    def iter_inbounds(self, fields: Iterable[str] | None = None, chunk_size: int = 64 * 1024) -> Iterator[dict]:
+        """
+        Streams the list of inbounds, yielding the inbounds one at a time while the response arrives.
+
+        Unlike get_inbounds(), the whole response is never held in memory: every inbound is decoded when it
+        is complete and only the requested fields are kept. The request is not retried.
+
+        :param fields: Iterable[str] | None : Fields of the inbound to keep, e.g. ('id', 'remark', 'clientStats'). All fields if None.
+        :param chunk_size: int : Bytes read from the connection at a time.
+        :return: Iterator[dict] : The inbounds.
+        :raise ClientError: If the request fails or the panel answers with success false.
+        """
+        url = f'{self.base_url}/panel/api/inbounds/list'
+
+        with self.__stream(url) as resp:
+            yield from iter_array(resp.iter_content(chunk_size), fields, resp.status_code)
+
     def online_clients(self)  -> PanelResponse:
         """
         Returns a list of clients that are currently online.
@@ -176,7 +548,7 @@ class Client3XUI:
 
         url = f'{self.base_url}/panel/api/inbounds/onlines'
 
-        data = self.__post_request(url, payload=None).json()
+        data = codec.loads(self.__post_request(url, payload=None, read=True).content)
 
         return PanelResponse(data)
 
@@ -188,6 +560,8 @@ class Client3XUI:
 
         url = f'{self.base_url}/panel/api/inbounds/resetAllTraffics'
         self.__post_request(url, payload=None)
+        if self.cache is not None:
+            self.cache.invalidate()
         if self.logger:
             self.logger.info('All clients traffic data reset')
 
@@ -199,7 +573,7 @@ class Client3XUI:
         """
 
         url = f'{self.base_url}/panel/api/inbounds/createbackup'
-        self.__get_request(url)
+        self.__get_request(url, idempotent=False)
         if self.logger:
             self.logger.info('Panel backup created')
 
@@ -217,7 +591,7 @@ class Client3XUI:
 
         url = f'{self.base_url}/panel/api/inbounds/add'
 
-        response = self.__post_request(url, payload=inbound_paload).json()
+        response = codec.loads(self.__post_request(url, payload=inbound_paload, idempotent=False).content)
 
         return PanelResponse(response)
 
@@ -231,9 +605,17 @@ class Client3XUI:
         """
         inbound_id = self.__check_inbound(inbound_id)
 
+        if self.cache is not None:
+            obj = self.cache.inbound(inbound_id)
+            if obj is not None:
+                return PanelResponse({'success': True, 'msg': '', 'obj': obj})
+
         url = f'{self.base_url}/panel/api/inbounds/get/{inbound_id}'
 
-        response = self.__get_request(url).json()
+        response = codec.loads(self.__get_request(url).content)
+
+        if self.cache is not None and response.get('success') and response.get('obj'):
+            self.cache.put(inbound_id, response['obj'])
 
         return PanelResponse(response)
 
@@ -250,7 +632,10 @@ class Client3XUI:
 
         url = f'{self.base_url}/panel/api/inbounds/update/{inbound_id}'
 
-        response = self.__post_request(url, payload=inbound_payload).json()
+        response = codec.loads(self.__post_request(url, payload=inbound_payload).content)
+
+        if self.cache is not None:
+            self.cache.invalidate(inbound_id)
 
         return PanelResponse(response)
 
@@ -266,6 +651,9 @@ class Client3XUI:
 
         self.__post_request(url, payload=None)
 
+        if self.cache is not None:
+            self.cache.invalidate(inbound_id)
+
 
     def reset_all_clients_in_inbound(self, inbound_id=None) -> None:
         """
@@ -276,6 +664,8 @@ class Client3XUI:
         inbound_id = self.__check_inbound(inbound_id)
         url = f'{self.base_url}/panel/api/inbounds/resetAllClientTraffics/{inbound_id}'
         self.__post_request(url, payload=None)
+        if self.cache is not None:
+            self.cache.invalidate(inbound_id)
 
 
     def delete_depleted_clients(self, inbound_id=None) -> None:
@@ -288,6 +678,8 @@ class Client3XUI:
         post_request_url = f'{self.base_url}/panel/api/inbounds/delDepletedClients/{inbound_id}'
 
         self.__post_request(post_request_url, None)
+        if self.cache is not None:
+            self.cache.invalidate(inbound_id)
 
 
     def get_clients_in_inbound(self, inbound_id=None) -> list:
@@ -299,14 +691,21 @@ class Client3XUI:
 
         inbound_id = self.__check_inbound(inbound_id)
 
+        if self.cache is not None:
+            clients = self.cache.clients(inbound_id)
+            if clients is not None:
+                return clients
+
         get_request_url = f'{self.base_url}/panel/api/inbounds/get/{inbound_id}'
 
         resp = self.__get_request(get_request_url)
         data = resp.text
 
         if resp.ok:
-            data = json.loads(data)
-            data = json.loads(data['obj']['settings'])
+            data = codec.loads(data)
+            if self.cache is not None and data.get('obj'):
+                return [dict(client) for client in self.cache.put(inbound_id, data['obj']).clients]
+            data = codec.loads(data['obj']['settings'])
             clients = data['clients']
             return clients  # возвращает список клиентов
 
@@ -326,7 +725,7 @@ class Client3XUI:
 
         url = f'{self.base_url}/panel/api/inbounds/getClientTraffics/{email}'
 
-        data = self.__get_request(url).json()
+        data = codec.loads(self.__get_request(url).content)
 
         return PanelResponse(data)
 
@@ -340,7 +739,7 @@ class Client3XUI:
 
         url = f'{self.base_url}/panel/api/inbounds/getClientTrafficsById/{client_id}'
 
-        data = self.__get_request(url).json()
+        data = codec.loads(self.__get_request(url).content)
 
         return PanelResponse(data)
 
@@ -356,7 +755,11 @@ class Client3XUI:
 
         post_request_url = f"{self.base_url}/panel/api/inbounds/addClient"
 
-        resp = self.__post_request(post_request_url, payload)
+        resp = self.__post_request(post_request_url, payload, idempotent=False)
+
+        if self.cache is not None:
+            self.__write_through(resp, payload.data["inbound"],
+                                 lambda cache: cache.add_clients(payload.data["inbound"], payload.data["settings"]["clients"]))
 
         if resp.ok:
             sublink = self.sub_url + payload.data["settings"]["clients"][0]["subId"]
@@ -365,6 +768,100 @@ class Client3XUI:
             return None
 
 
+    def add_clients_bulk(self, payload: BulkClientPayload | list[CLientPayload], chunk_size: int = 100) -> BulkAddResult:
+        """
+        Adds many clients to an inbound, sending up to chunk_size clients per addClient request.
+
+        A failed chunk does not stop the remaining chunks, check the result for per-chunk status.
+
+        :param payload: BulkClientPayload | list[CLientPayload] : The clients to add.
+        :param chunk_size: int : The maximum number of clients per request.
+        :return result: BulkAddResult : A sublink per client (None if not added) and per-chunk results.
+        """
+        if not isinstance(payload, BulkClientPayload):
+            payload = BulkClientPayload.from_payloads(payload)
+
+        post_request_url = f"{self.base_url}/panel/api/inbounds/addClient"
+
+        sublinks = []
+        chunks = []
+        for index, chunk in enumerate(payload.chunks(chunk_size)):
+            emails = [client.get("email") for client in chunk.clients]
+            try:
+                resp = self.__post_request(post_request_url, chunk, idempotent=False)
+                status = resp.status_code
+                success, message = resp.ok, resp.reason
+                if resp.ok:
+                    response = PanelResponse(codec.loads(resp.content))
+                    success, message = response.success, response.message
+            except ClientError as e:
+                status, success, message = e.status, False, e.txt
+            except ValueError as e:
+                success, message = False, f'Invalid panel response: {e!r}'
+
+            if self.cache is not None:
+                if success:
+                    self.cache.add_clients(chunk.data["inbound"], chunk.clients)
+                else:
+                    self.cache.invalidate(chunk.data["inbound"])
+
+            if success:
+                sublinks.extend(self.sub_url + client["subId"] for client in chunk.clients)
+            else:
+                sublinks.extend(None for _ in chunk.clients)
+                if self.logger:
+                    self.logger.error(f'Failed to add clients chunk {index} [{status}]: {message}')
+
+            chunks.append(ChunkResult(index, index * chunk_size, emails, success, status, message))
+
+        return BulkAddResult(sublinks, chunks)
+
+
+    def reconcile_clients(self, desired: Iterable[dict | CLientPayload], inbound_id=None, key: str = 'email',
+                          chunk_size: int = 100, workers: int = 8, dry_run: bool = False) -> ReconcileResult:
+        """
+        Makes the clients of an inbound match the desired ones with the fewest writes.
+
+        The current clients are read from the panel, bypassing the cache, and diffed with the desired ones by `key`.
+        Clients that are not desired are deleted first, then changed clients are updated and missing ones are added
+        with add_clients_bulk(). A failed write does not stop the others, check the result.
+
+        :param desired: Iterable[dict | CLientPayload] : All clients the inbound should have, dicts in the panel format.
+        :param inbound_id: Optional(int) : inbound id, if None then uses self.inbound
+        :param key: str : Field identifying a client, 'email' or 'id'.
+        :param chunk_size: int : The maximum number of clients per addClient request.
+        :param workers: int : Threads making the update and delete calls.
+        :param dry_run: bool : Only compute the plan, result.plan, without writing.
+        :return result: ReconcileResult : The plan and the results of its writes.
+        """
+        inbound_id = self.__check_inbound(inbound_id)
+        if self.cache is not None:
+            self.cache.invalidate(inbound_id)
+
+        inbound = self.get_inbound(inbound_id)
+        if not inbound.success or not inbound.obj:
+            raise ClientError(f"Couldn't read the clients of inbound {inbound_id}", 0)
+        current = codec.loads(inbound.obj['settings'])['clients']
+
+        plan = plan_clients(inbound_id, current, desired, key, inbound.obj['protocol'])
+        result = ReconcileResult(plan)
+        if dry_run:
+            return result
+
+        if plan.delete:
+            deletes = [(client_id, inbound_id) for client_id in plan.delete]
+            result.deleted = self.batch_map(self.delete_client, deletes, workers)
+        if plan.update:
+            updates = [(client_id, CLientPayload.from_client(inbound_id, client)) for client_id, client in plan.update]
+            result.updated = self.batch_map(self.update_client, updates, workers)
+        if plan.add:
+            result.added = self.add_clients_bulk(BulkClientPayload(inbound_id, plan.add), chunk_size)
+
+        if self.logger:
+            self.logger.info(f'Reconciled inbound {inbound_id}: {plan!r}, success: {result.success}')
+        return result
+
+
     def update_client(self, client_id: str, payload: CLientPayload) -> str:
         """
         Update client info in inbound
@@ -377,6 +874,11 @@ class Client3XUI:
         post_request_url = f'{self.base_url}/panel/api/inbounds/updateClient/{client_id}'
         resp = self.__post_request(post_request_url, payload)
 
+        if self.cache is not None:
+            self.__write_through(resp, payload.data["inbound"],
+                                 lambda cache: cache.update_client(payload.data["inbound"], client_id,
+                                                                   payload.data["settings"]["clients"][0]))
+
         if resp.ok:
             sublink = self.sub_url + payload.data["settings"]["clients"][0]["subId"]
             return sublink
@@ -392,7 +894,10 @@ class Client3XUI:
         inbound_id = self.__check_inbound(inbound_id)
 
         post_request_url = f"{self.base_url}/panel/api/inbounds/{inbound_id}/delClient/{client_id}"
-        self.__post_request(post_request_url, None)
+        resp = self.__post_request(post_request_url, None)
+
+        if self.cache is not None:
+            self.__write_through(resp, inbound_id, lambda cache: cache.delete_client(inbound_id, client_id))
 
 
     def client_ipaddress(self, email: str) -> PanelResponse:
@@ -404,7 +909,7 @@ class Client3XUI:
 
         url = f'{self.base_url}/panel/api/inbounds/clientIps/{email}'
 
-        data = self.__post_request(url,payload=None).json()
+        data = codec.loads(self.__post_request(url, payload=None, read=True).content)
         return PanelResponse(data)
 
 
@@ -428,5 +933,7 @@ class Client3XUI:
         inbound_id = self.__check_inbound(inbound_id)
         url = f'{self.base_url}/panel/api/inbounds/{inbound_id}/resetClientTraffic/{email}'
         self.__post_request(url, payload=None)
+        if self.cache is not None:
+            self.cache.invalidate(inbound_id)
 
 # ------------------------------------------------ Client ---------------------------------------------------------------
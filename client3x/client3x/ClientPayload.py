@@ -1,7 +1,8 @@
 import pprint
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
-from client3x.client3x.payload import Payload
+from client3x.client3x import codec
+from client3x.client3x.payload import Payload, snapshot
 
 
 class CLientPayload(Payload):
@@ -52,5 +53,236 @@ class CLientPayload(Payload):
         data = {"inbound" : inbound_id, "settings": settings}
         super().__init__(data)
 
+    @classmethod
+    def from_client(cls, inbound_id: int, client: dict) -> 'CLientPayload':
+        """
+        Build a payload from client settings in the panel format.
+
+        :param inbound_id: int: The ID of the inbound connection.
+        :param client: dict: The client settings, as in settings["clients"].
+        :return: CLientPayload
+        """
+        payload = cls.__new__(cls)
+        Payload.__init__(payload, {"inbound": inbound_id, "settings": {"clients": [client]}})
+        return payload
+
     def __str__(self):
-        return f'ClientPayload: \nInbound: {self.data['inbound']},\nSettings: {pprint.pformat(self.data['settings'])})'
\ No newline at end of file
+        return f'ClientPayload: \nInbound: {self.data['inbound']},\nSettings: {pprint.pformat(self.data['settings'])})'
+
+
+class BulkClientPayload(Payload):
+
+    """
+    BulkClientPayload class for adding many clients to one inbound with a single addClient request.
+    """
+
+    def __init__(self, inbound_id: int, clients: list[dict]):
+        """
+        Initialize a BulkClientPayload object with a list of client settings.
+
+        :param inbound_id: int: The ID of the inbound connection.
+        :param clients: list[dict]: Client settings in the panel format, the same dicts
+                        that CLientPayload puts into settings["clients"].
+        """
+        data = {"inbound": inbound_id, "settings": {"clients": list(clients)}}
+        super().__init__(data)
+        # pre-serialized clients and copies of the clients they were serialized from
+        self._fragments: list[str] | None = None
+        self._fragment_clients: list[dict] | None = None
+
+    def _format(self) -> dict:
+        if self._fragments is None:
+            return super()._format()
+
+        clients = self.clients
+        if (len(clients) != len(self._fragments) or len(self.data) != 2
+                or len(self.data["settings"]) != 1):
+            # clients were added or removed, or fields besides the clients were set
+            self._fragments = self._fragment_clients = None
+            return super()._format()
+
+        fragments, seen = self._fragments, self._fragment_clients
+        if clients != seen:
+            for index, client in enumerate(clients):
+                if client != seen[index]:
+                    fragments[index] = codec.dumps(client)
+                    seen[index] = snapshot(client)
+        return {"inbound": self.data["inbound"], "settings": '{"clients":[' + ','.join(fragments) + ']}'}
+
+    def _take_snapshot(self) -> dict:
+        if self._fragments is None:
+            return super()._take_snapshot()
+        return {"inbound": self.data["inbound"], "settings": {"clients": list(self._fragment_clients)}}
+
+    def invalidate(self) -> None:
+        super().invalidate()
+        self._fragments = self._fragment_clients = None
+
+    @classmethod
+    def from_payloads(cls, payloads: Iterable[CLientPayload]) -> 'BulkClientPayload':
+        """
+        Merge single-client payloads into one bulk payload.
+
+        :param payloads: Iterable[CLientPayload]: Payloads that all target the same inbound.
+        :return: BulkClientPayload
+        :raise ValueError: If the payloads are empty or target different inbounds.
+        """
+        payloads = list(payloads)
+        if not payloads:
+            raise ValueError('Cannot build a bulk payload without clients')
+
+        inbound_id = payloads[0].data["inbound"]
+        clients = []
+        for payload in payloads:
+            if payload.data["inbound"] != inbound_id:
+                raise ValueError(f'All payloads must target one inbound, got {inbound_id} and {payload.data["inbound"]}')
+            clients.extend(payload.data["settings"]["clients"])
+
+        return cls(inbound_id, clients)
+
+    @property
+    def clients(self) -> list[dict]:
+        return self.data["settings"]["clients"]
+
+    def chunks(self, size: int) -> Iterator['BulkClientPayload']:
+        """
+        Split the payload into payloads of at most `size` clients each.
+
+        :param size: int: The maximum number of clients per payload.
+        :return: Iterator[BulkClientPayload]
+        """
+        if size < 1:
+            raise ValueError(f'Chunk size must be positive, got {size}')
+
+        clients = self.clients
+        for start in range(0, len(clients), size):
+            chunk = BulkClientPayload(self.data["inbound"], clients[start:start + size])
+            chunk.cache_format = self.cache_format
+            if self._fragments is not None:
+                chunk._fragments = self._fragments[start:start + size]
+                chunk._fragment_clients = self._fragment_clients[start:start + size]
+            yield chunk
+
+    def __len__(self):
+        return len(self.clients)
+
+    def __str__(self):
+        return f'BulkClientPayload: \nInbound: {self.data['inbound']},\nClients: {len(self)}'
+
+
+def _json_string(value) -> str:
+    """Serialize a per-client value, quoting plain strings (uuids, emails) without calling the JSON codec"""
+    if isinstance(value, str) and value.isprintable() and '"' not in value and '\\' not in value:
+        return f'"{value}"'
+    return codec.dumps(value)
+
+
+class ClientPayloadTemplate:
+
+    """
+    Template for creating many clients of one inbound that differ only in id, email and subId.
+
+    The shared client settings are serialized once. Payloads made from the template only encode
+    the per-client fields and keep their formatted form while their data is unchanged, see Payload.cache_format.
+    """
+
+    PER_CLIENT_FIELDS = ("id", "email", "subId")
+
+    def __init__(self, inbound_id: int, limitip: int = 0, expiry_time: float = 0, flow: str = "xtls-rprx-vision",
+                 total_gb: int = 0, enable: bool = True, reset: int = 0,
+                 additional_fields: Optional[dict] = None):
+        """
+        Initialize a template with the settings shared by all its clients.
+
+        :param inbound_id: int: The ID of the inbound connection.
+        :param limitip: int: The maximum number of simultaneous IP connections allowed.
+        :param expiry_time: int|float : The timestamp when the clients' access expires.
+        :param flow: Optional[str] : The flow setting for the clients. Defaults to "xtls-rprx-vision".
+        :param total_gb: Optional[int] :  The total allowed traffic in gigabytes. Defaults to 0 (unlimited).
+        :param enable: Optional[bool] :  Whether the clients are enabled. Defaults to True.
+        :param reset: Optional[int] :  The reset interval for traffic statistics. Defaults to 0.
+        :param additional_fields: Optional[dict] :   Additional fields to include in the client settings.
+        :raise ValueError: If additional_fields contains id, email or subId.
+        """
+        shared = {"flow": flow,
+                  "limitIp": limitip,
+                  "totalGB": total_gb,
+                  "expiryTime": expiry_time,
+                  "enable": enable,
+                  "reset": reset}
+        if additional_fields:
+            per_client = set(additional_fields) & set(self.PER_CLIENT_FIELDS)
+            if per_client:
+                raise ValueError(f'Per-client fields can not be shared: {sorted(per_client)}')
+            shared.update(additional_fields)
+
+        self.inbound_id = inbound_id
+        self.shared = shared
+        self.__shared_json = codec.dumps(shared)[1:-1]
+        # clients of only scalar values are copied with dict() to detect changes in place
+        self.__flat = not any(isinstance(value, (dict, list)) for value in shared.values())
+
+    def client(self, client_id: str, email: str, subid: str) -> dict:
+        """Return the settings of one client in the panel format"""
+        return {"id": client_id, "email": email, "subId": subid, **self.shared}
+
+    def render(self, client_id: str, email: str, subid: str) -> str:
+        """Return the settings of one client serialized to JSON"""
+        return (f'{{"id":{_json_string(client_id)},"email":{_json_string(email)},'
+                f'"subId":{_json_string(subid)},{self.__shared_json}}}')
+
+    def payload(self, client_id: str, email: str, subid: str) -> CLientPayload:
+        """
+        Create the payload of one client.
+
+        :param client_id: str: The unique identifier for the client.
+        :param email: str : The email address associated with the client.
+        :param subid: str: The subscription ID for the client.
+        :return: CLientPayload : A payload with its formatted form already cached.
+        """
+        client = self.client(client_id, email, subid)
+        payload = CLientPayload.from_client(self.inbound_id, client)
+        payload.cache_format = True
+        payload._formatted = {"inbound": self.inbound_id,
+                              "settings": '{"clients":[' + self.render(client_id, email, subid) + ']}'}
+        payload._snapshot = {"inbound": self.inbound_id, "settings": {"clients": [self.__copy(client)]}}
+        return payload
+
+    def bulk(self, clients: Iterable[tuple[str, str, str]]) -> BulkClientPayload:
+        """
+        Create the payload of many clients for add_clients_bulk().
+
+        :param clients: Iterable[tuple[str, str, str]]: (client_id, email, subid) of every client.
+        :return: BulkClientPayload : A payload whose chunks are formatted from the pre-serialized clients.
+        """
+        settings, fragments = [], []
+        for client_id, email, subid in clients:
+            settings.append(self.client(client_id, email, subid))
+            fragments.append(self.render(client_id, email, subid))
+
+        payload = BulkClientPayload(self.inbound_id, settings)
+        payload.cache_format = True
+        payload._fragments = fragments
+        payload._fragment_clients = [self.__copy(client) for client in settings]
+        return payload
+
+    def __copy(self, client: dict) -> dict:
+        return dict(client) if self.__flat else snapshot(client)
+
+    def __repr__(self):
+        return f'ClientPayloadTemplate(inbound_id={self.inbound_id}, shared={self.shared})'
+
+
+def client_identity(client: dict, protocol: str = 'vless') -> str:
+    """
+    Return the value the panel uses to address a client in updateClient and delClient.
+
+    :param client: dict: Client settings in the panel format.
+    :param protocol: str: The protocol of the client's inbound.
+    :return: str: The password for trojan, the email for shadowsocks and the id for other protocols.
+    """
+    if protocol == 'trojan':
+        return client.get("password")
+    if protocol == 'shadowsocks':
+        return client.get("email")
+    return client.get("id")
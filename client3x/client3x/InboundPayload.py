@@ -1,4 +1,6 @@
 import json
+
+from client3x.client3x import codec
 from client3x.client3x.payload import Payload
 
 class InboundPayload(Payload):
@@ -14,19 +16,19 @@ class InboundPayload(Payload):
             "listen": listen,
             "port": port,
             "protocol": protocol,
-            "settings": json.dumps(settings) if settings else json.dumps({
+            "settings": codec.dumps(settings) if settings else codec.dumps({
                 "clients": [],
                 "decryption": "none",
                 "fallbacks": []
             }),
-            "streamSettings": json.dumps(stream_settings),
-            "sniffing": json.dumps(sniffing) if sniffing else json.dumps({
+            "streamSettings": codec.dumps(stream_settings),
+            "sniffing": codec.dumps(sniffing) if sniffing else codec.dumps({
                 "enabled": True,
                 "destOverride": ["http", "tls", "quic", "fakedns"],
                 "metadataOnly": False,
                 "routeOnly": False
             }),
-            "allocate": json.dumps(allocate) if allocate else json.dumps({
+            "allocate": codec.dumps(allocate) if allocate else codec.dumps({
                 "strategy": "always",
                 "refresh": 5,
                 "concurrency": 3
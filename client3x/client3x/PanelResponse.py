@@ -8,12 +8,69 @@ class PanelResponse:
     """
     def __init__(self, response):
         self.success = response.get('success', False)
-        self.message = response.get('message', '')
+        self.message = response.get('msg', response.get('message', ''))
         self.obj = response.get('obj', None)
 
+    def as_model(self, model):
+        """
+        Convert obj to typed models, e.g. response.as_model(Inbound) for get_inbounds().
+
+        :param model: Model class with a from_json() constructor: Inbound, InboundClient or ClientTraffic.
+        :return: A model for a dict obj, a list of models for a list obj, None if there is no obj.
+        """
+        if self.obj is None:
+            return None
+        if isinstance(self.obj, list):
+            return [model.from_json(item) for item in self.obj]
+        return model.from_json(self.obj)
+
     def __repr__(self):
         return ('PanelResponse object (\n'
                 f'success : {self.success}\n'
                 f'msg : {self.message}\n'
                 f'obj : {pprint.pformat(self.obj)}\n)')
 
+
+
+class ChunkResult:
+    """
+    Class for representing the outcome of one addClient request made by add_clients_bulk.
+    """
+    def __init__(self, index: int, start: int, emails: list, success: bool, status: int, message: str = ''):
+        self.index = index
+        self.start = start
+        self.emails = emails
+        self.success = success
+        self.status = status
+        self.message = message
+
+    def __repr__(self):
+        return (f'ChunkResult(index={self.index}, clients={len(self.emails)}, '
+                f'success={self.success}, status={self.status}, msg={self.message!r})')
+
+
+class BulkAddResult:
+    """
+    Class for representing the result of add_clients_bulk.
+
+    `sublinks` has one entry per requested client in the original order,
+    None for clients whose chunk was not added.
+    """
+    def __init__(self, sublinks: list, chunks: list[ChunkResult]):
+        self.sublinks = sublinks
+        self.chunks = chunks
+
+    @property
+    def success(self) -> bool:
+        return all(chunk.success for chunk in self.chunks)
+
+    @property
+    def failed_chunks(self) -> list[ChunkResult]:
+        return [chunk for chunk in self.chunks if not chunk.success]
+
+    def __repr__(self):
+        added = sum(1 for sublink in self.sublinks if sublink is not None)
+        return ('BulkAddResult object (\n'
+                f'success : {self.success}\n'
+                f'added : {added}/{len(self.sublinks)}\n'
+                f'chunks : {pprint.pformat(self.chunks)}\n)')
@@ -1,11 +1,38 @@
 from client3x.client3x.AsyncClient import AsyncClient3XUI
 from client3x.client3x.Client import Client3XUI
 from client3x.client3x.payload import Payload
-from client3x.client3x.ClientPayload import CLientPayload
+from client3x.client3x.ClientPayload import CLientPayload, BulkClientPayload, ClientPayloadTemplate
 from client3x.client3x.InboundPayload import InboundPayload
-from client3x.client3x.errors import ClientError
+from client3x.client3x.errors import ClientError, CircuitOpenError
+from client3x.client3x.PanelResponse import PanelResponse, BulkAddResult, ChunkResult
+from client3x.client3x.batch import BatchResult
+from client3x.client3x.cache import InboundCache
+from client3x.client3x.auth import AuthManager, AsyncAuthManager
+from client3x.client3x.retry import RetryPolicy, CircuitBreaker
+from client3x.client3x.ratelimit import RateLimiter, TokenBucket
+from client3x.client3x.singleflight import SingleFlight
+from client3x.client3x.models import Inbound, InboundClient, ClientTraffic
+from client3x.client3x.codec import JsonCodec, get_codec, set_codec
+from client3x.client3x.metering import TrafficMeter, TrafficDelta
+from client3x.client3x.mirror import PanelMirror, MirroredInbound, MirroredClient, SyncResult
+from client3x.client3x.placement import Placement, PlacementTarget
+from client3x.client3x.reconcile import ReconcilePlan, ReconcileResult, plan_clients
+from client3x.client3x.scheduler import ExpiryScheduler, ExpiryEvent
+from client3x.client3x.fakepanel import FakePanel
+from client3x.client3x.metrics import ClientMetrics
+from client3x.client3x.hooks import RequestHooks, RequestEvent
+from client3x.client3x.fleet import AsyncFleetClient, FleetResult, PanelResult
 
 
 # Add new methods for async client
 
-__all__ = ['Client3XUI', 'AsyncClient3XUI', 'Payload', 'CLientPayload', 'ClientError','InboundPayload']
+__all__ = ['Client3XUI', 'AsyncClient3XUI', 'Payload', 'CLientPayload', 'ClientError','InboundPayload',
+           'BulkClientPayload', 'PanelResponse', 'BulkAddResult', 'ChunkResult', 'BatchResult',
+           'InboundCache', 'AuthManager', 'AsyncAuthManager', 'RetryPolicy', 'CircuitBreaker', 'CircuitOpenError',
+           'RateLimiter', 'TokenBucket', 'SingleFlight', 'Inbound', 'InboundClient', 'ClientTraffic',
+           'JsonCodec', 'get_codec', 'set_codec', 'ClientPayloadTemplate', 'TrafficMeter', 'TrafficDelta',
+           'PanelMirror', 'MirroredInbound', 'MirroredClient', 'SyncResult',
+           'AsyncFleetClient', 'FleetResult', 'PanelResult', 'Placement', 'PlacementTarget',
+           'ReconcilePlan', 'ReconcileResult', 'plan_clients',
+           'ExpiryScheduler', 'ExpiryEvent', 'FakePanel', 'ClientMetrics',
+           'RequestHooks', 'RequestEvent']
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable
+
+from client3x.client3x import codec
+
+
+class BaseAuthManager:
+    """
+    Base class that keeps the login state of a client.
+
+    Every login bumps `generation`. A request remembers the generation it was sent with and, when its
+    response shows an expired session, asks for a refresh of that generation. Only the first caller logs in,
+    callers that were waiting on the same expired generation see the newer one and simply retry.
+    """
+    def __init__(self, max_age: float | None = None, clock: Callable[[], float] = time.monotonic):
+        """
+        :param max_age: Optional(float) : Seconds after which a session is renewed before the next request, None to keep it until it expires.
+        :param clock: Callable : Monotonic time source, seconds.
+        """
+        self.max_age = max_age
+        self.clock = clock
+        self.generation = 0
+        self.logins = 0
+        self.logged_in_at: float | None = None
+
+    @staticmethod
+    def is_expired(status: int, history, url=None) -> bool:
+        """
+        Check if a response shows that the panel session has expired.
+
+        The panel answers API calls of an expired session with 401, or redirects them to the login page.
+        A redirect that ends on an API endpoint again, e.g. from http to https or to a moved base path, is not an expiry.
+
+        :param status: int : The response status.
+        :param history: The redirect history of the response.
+        :param url: str | URL | None : The final URL of the response, None to treat every redirect as an expiry.
+        :return: bool
+        """
+        if status == 401:
+            return True
+        if not history:
+            return False
+        return url is None or '/panel/api/' not in str(url)
+
+    @staticmethod
+    def login_error(body: bytes | str) -> str | None:
+        """
+        Check if the panel rejected a login it answered with 200.
+
+        The panel answers wrong credentials with 200 and "success": false in the body.
+
+        :param body: bytes | str : The body of the login response.
+        :return: str | None : The message of the panel if the login was rejected, None if it succeeded.
+        """
+        try:
+            data = codec.loads(body)
+        except ValueError:
+            return None
+        if isinstance(data, dict) and data.get('success') is False:
+            return data.get('msg') or 'Login rejected'
+        return None
+
+    def _login_needed(self, generation: int | None) -> bool:
+        if self.logged_in_at is None:
+            return True
+        if generation is not None:
+            return generation == self.generation
+        return self.max_age is not None and self.clock() - self.logged_in_at >= self.max_age
+
+    def _logged_in(self) -> None:
+        self.generation += 1
+        self.logins += 1
+        self.logged_in_at = self.clock()
+
+
+class AuthManager(BaseAuthManager):
+    """
+    Auth manager of Client3XUI, single-flight between threads.
+    """
+    def __init__(self, login: Callable[[], None], max_age: float | None = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param login: Callable : Logs in to the panel, raises ClientError on failure.
+        """
+        super().__init__(max_age, clock)
+        self.__login = login
+        self.__lock = threading.Lock()
+
+    def ensure(self) -> int:
+        """Log in if there is no valid session yet and return the current generation"""
+        if not self._login_needed(None):
+            return self.generation
+        with self.__lock:
+            if self._login_needed(None):
+                self.__login()
+                self._logged_in()
+            return self.generation
+
+    def refresh(self, generation: int) -> int:
+        """Log in again if the session of `generation` was not renewed yet and return the current generation"""
+        with self.__lock:
+            if self._login_needed(generation):
+                self.__login()
+                self._logged_in()
+            return self.generation
+
+
+class AsyncAuthManager(BaseAuthManager):
+    """
+    Auth manager of AsyncClient3XUI, single-flight between coroutines.
+    """
+    def __init__(self, login: Callable[[], Awaitable[None]], max_age: float | None = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param login: Callable : Coroutine function that logs in to the panel, raises ClientError on failure.
+        """
+        super().__init__(max_age, clock)
+        self.__login = login
+        self.__lock = asyncio.Lock()
+
+    async def ensure(self) -> int:
+        """Log in if there is no valid session yet and return the current generation"""
+        if not self._login_needed(None):
+            return self.generation
+        async with self.__lock:
+            if self._login_needed(None):
+                await self.__login()
+                self._logged_in()
+            return self.generation
+
+    async def refresh(self, generation: int) -> int:
+        """Log in again if the session of `generation` was not renewed yet and return the current generation"""
+        async with self.__lock:
+            if self._login_needed(generation):
+                await self.__login()
+                self._logged_in()
+            return self.generation
+
+    def reset(self) -> None:
+        """Forget the session and the lock, e.g. when the client moved to a new event loop with a new session"""
+        self.logged_in_at = None
+        self.__lock = asyncio.Lock()
@@ -0,0 +1,37 @@
+import pprint
+
+
+class BatchResult:
+    """
+    Class for representing the outcome of one item of a batch call.
+    """
+    def __init__(self, item, result=None, error: Exception | None = None):
+        self.item = item
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        if self.error is not None:
+            return f'BatchResult(item={self.item!r}, error={self.error!r})'
+        return f'BatchResult(item={self.item!r}, result={pprint.pformat(self.result)})'
+
+
+def batch_call_args(item) -> tuple[tuple, dict]:
+    """
+    Turn a batch item into call arguments.
+
+    A tuple is unpacked into positional arguments, a dict into keyword arguments,
+    anything else is passed as the only positional argument.
+
+    :param item: The batch item.
+    :return: (args, kwargs)
+    """
+    if isinstance(item, tuple):
+        return item, {}
+    if isinstance(item, dict):
+        return (), item
+    return (item,), {}
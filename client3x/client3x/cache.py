@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from client3x.client3x import codec
+from client3x.client3x.ClientPayload import client_identity
+
+
+class InboundSnapshot:
+    """
+    Class for representing a parsed inbound kept by InboundCache.
+
+    `obj` is the inbound as returned by the panel, `settings` is its settings field, decoded on first access,
+    so get_inbound() served from the cache never decodes it.
+    Writes change `settings` in place and the settings string of `obj` is re-encoded on the next to_obj() call.
+    """
+    def __init__(self, obj: dict):
+        self.obj = obj
+        self.protocol = obj.get('protocol', 'vless')
+        self.__settings = None
+        self.__dirty = False
+
+    @property
+    def settings(self) -> dict:
+        if self.__settings is None:
+            self.__settings = codec.loads(self.obj.get('settings') or '{}')
+        return self.__settings
+
+    @property
+    def clients(self) -> list[dict]:
+        return self.settings.setdefault('clients', [])
+
+    def to_obj(self) -> dict:
+        """Return the inbound in the panel format with up-to-date settings"""
+        if self.__dirty:
+            self.obj = dict(self.obj, settings=codec.dumps(self.settings))
+            self.__dirty = False
+        return self.obj
+
+    def add_clients(self, clients: list[dict]) -> None:
+        self.clients.extend(dict(client) for client in clients)
+        self.__dirty = True
+
+    def update_client(self, client_id: str, client: dict) -> bool:
+        for index, current in enumerate(self.clients):
+            if client_identity(current, self.protocol) == client_id:
+                self.clients[index] = dict(client)
+                self.__dirty = True
+                return True
+        return False
+
+    def delete_client(self, client_id: str) -> bool:
+        for index, current in enumerate(self.clients):
+            if client_identity(current, self.protocol) == client_id:
+                email = self.clients.pop(index).get('email')
+                stats = self.obj.get('clientStats')
+                if stats:
+                    self.obj = dict(self.obj, clientStats=[stat for stat in stats if stat.get('email') != email])
+                self.__dirty = True
+                return True
+        return False
+
+
+class InboundCache:
+    """
+    Optional TTL and LRU cache of parsed inbounds, used by get_inbound and get_clients_in_inbound.
+
+    Snapshots expire `ttl` seconds after they were fetched, and the least recently used snapshot
+    is evicted when more than `max_entries` inbounds are cached. Client writes made through a client
+    that owns the cache are applied to the cached snapshot, other inbound writes invalidate it.
+    """
+    def __init__(self, ttl: float = 30, max_entries: int = 128, clock: Callable[[], float] = time.monotonic):
+        """
+        :param ttl: float : Seconds a snapshot stays valid.
+        :param max_entries: int : The maximum number of cached inbounds.
+        :param clock: Callable : Monotonic time source, seconds.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.__entries: OrderedDict[int, tuple[float, InboundSnapshot]] = OrderedDict()
+        self.__lock = threading.RLock()
+
+    def get(self, inbound_id: int) -> InboundSnapshot | None:
+        """Return the cached snapshot of the inbound, None if it is missing or expired"""
+        with self.__lock:
+            entry = self.__entries.get(inbound_id)
+            if entry is None or self.clock() - entry[0] >= self.ttl:
+                if entry is not None:
+                    del self.__entries[inbound_id]
+                self.misses += 1
+                return None
+
+            self.__entries.move_to_end(inbound_id)
+            self.hits += 1
+            return entry[1]
+
+    def inbound(self, inbound_id: int) -> dict | None:
+        """Return a copy of the cached inbound obj, None on a miss"""
+        with self.__lock:
+            snapshot = self.get(inbound_id)
+            return dict(snapshot.to_obj()) if snapshot else None
+
+    def clients(self, inbound_id: int) -> list[dict] | None:
+        """Return a copy of the cached clients of the inbound, None on a miss"""
+        with self.__lock:
+            snapshot = self.get(inbound_id)
+            return [dict(client) for client in snapshot.clients] if snapshot else None
+
+    def put(self, inbound_id: int, obj: dict) -> InboundSnapshot:
+        """Cache the inbound obj returned by the panel and return its snapshot"""
+        snapshot = InboundSnapshot(obj)
+        with self.__lock:
+            self.__entries[inbound_id] = (self.clock(), snapshot)
+            self.__entries.move_to_end(inbound_id)
+            while len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, inbound_id: int | None = None) -> None:
+        """Drop the snapshot of the inbound, or all snapshots if inbound_id is None"""
+        with self.__lock:
+            if inbound_id is None:
+                self.__entries.clear()
+            else:
+                self.__entries.pop(inbound_id, None)
+
+    def add_clients(self, inbound_id: int, clients: list[dict]) -> None:
+        with self.__lock:
+            snapshot = self.__peek(inbound_id)
+            if snapshot:
+                snapshot.add_clients(clients)
+
+    def update_client(self, inbound_id: int, client_id: str, client: dict) -> None:
+        with self.__lock:
+            snapshot = self.__peek(inbound_id)
+            if snapshot and not snapshot.update_client(client_id, client):
+                self.invalidate(inbound_id)
+
+    def delete_client(self, inbound_id: int, client_id: str) -> None:
+        with self.__lock:
+            snapshot = self.__peek(inbound_id)
+            if snapshot and not snapshot.delete_client(client_id):
+                self.invalidate(inbound_id)
+
+    def __peek(self, inbound_id: int) -> InboundSnapshot | None:
+        entry = self.__entries.get(inbound_id)
+        return entry[1] if entry else None
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __repr__(self):
+        return f'InboundCache(entries={len(self)}, ttl={self.ttl}, hits={self.hits}, misses={self.misses})'
@@ -0,0 +1,72 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional dependency, pip install client3x[fast]
+    orjson = None
+
+
+class JsonCodec:
+    """
+    JSON codec used for payload encoding and response decoding.
+
+    Subclass it and install it with set_codec() to plug in another JSON library.
+    """
+    name = 'json'
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+    def __repr__(self):
+        return f'{type(self).__name__}(name={self.name!r})'
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    Codec backed by orjson, used by default when orjson is installed.
+    """
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError('orjson is not installed, install it with: pip install orjson')
+
+    def loads(self, data: bytes | str) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+
+_codec: JsonCodec = OrjsonCodec() if orjson is not None else JsonCodec()
+
+
+def get_codec() -> JsonCodec:
+    """Return the codec in use"""
+    return _codec
+
+
+def set_codec(codec: JsonCodec) -> JsonCodec:
+    """
+    Install the codec used by payloads, clients and models.
+
+    :param codec: JsonCodec : The codec to use, e.g. JsonCodec() to force the standard library.
+    :return: JsonCodec : The codec used before.
+    """
+    global _codec
+    previous, _codec = _codec, codec
+    return previous
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode JSON with the codec in use"""
+    return _codec.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """Encode JSON to a string with the codec in use"""
+    return _codec.dumps(obj)
@@ -25,4 +25,24 @@ class ClientError(Exception):
         Returns:
             str: A formatted string containing the error message and status code.
         """
-        return f'ClientError:  {self.txt} \nstatus: [{self.status}]'
\ No newline at end of file
+        return f'ClientError:  {self.txt} \nstatus: [{self.status}]'
+
+
+class CircuitOpenError(ClientError):
+    """
+    Raised without contacting the panel while its circuit breaker is open.
+    """
+
+    def __init__(self, text, retry_after):
+        """
+        Initialize a new CircuitOpenError instance.
+
+        Args:
+            text (str): A description of the error.
+            retry_after (float): Seconds until the breaker lets a probe request through.
+
+        Returns:
+            None
+        """
+        super().__init__(text, 0)
+        self.retry_after = retry_after
@@ -0,0 +1,573 @@
+import argparse
+import asyncio
+import random
+import secrets
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Callable, Iterable, Optional
+
+from aiohttp import web
+
+from client3x.client3x import codec
+from client3x.client3x.ClientPayload import client_identity
+
+
+_COOKIE = '3x-ui'
+_TRUE = frozenset(('true', 'True', '1', 'on'))
+
+
+def _reply(success: bool = True, msg: str = '', obj=None) -> web.Response:
+    return web.Response(text=codec.dumps({'success': success, 'msg': msg, 'obj': obj}), content_type='application/json')
+
+
+class FakePanel:
+    """
+    aiohttp server answering the login, inbound, client and traffic endpoints used by Client3XUI and AsyncClient3XUI.
+
+    Inbounds, clients and traffic are kept in memory, the JSON of every inbound is cached until it changes,
+    so inbound lists of 100k clients are served quickly. Faults are injected into the API endpoints:
+    `latency` plus up to `jitter` seconds of delay, `error_rate` of answers with `error_status`,
+    failures queued with fail_next(), and sessions that expire `session_ttl` seconds after the login (answered with 401).
+
+        async with FakePanel(latency=0.01, error_rate=0.05) as panel:
+            panel.populate(inbounds=2, clients_per_inbound=50000)
+            async with AsyncClient3XUI(**panel.client_kwargs()) as client:
+                ...
+
+        with FakePanel(session_ttl=60) as panel:  # served from a background thread, for Client3XUI
+            client = Client3XUI(**panel.client_kwargs())
+
+    Standalone: python -m client3x.client3x.fakepanel --port 2053 --clients 100000 --latency 0.02
+    """
+    def __init__(self, username: str = 'admin', password: str = 'admin', root_url: str = 'panel', host: str = '127.0.0.1',
+                 port: int = 0, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, session_ttl: Optional[float] = None, seed: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param username: str : Login of the panel.
+        :param password: str : Password of the panel.
+        :param root_url: str : Web base path of the panel.
+        :param host: str : Address to listen on.
+        :param port: int : Port to listen on, a free port if 0.
+        :param latency: float : Seconds every API request is delayed.
+        :param jitter: float : Up to this many random seconds added to the latency.
+        :param error_rate: float : Share of API requests answered with error_status, 0 to 1.
+        :param error_status: int : HTTP status of injected errors.
+        :param session_ttl: float | None : Seconds a login is valid, forever if None.
+        :param seed: int | None : Seed of the random faults and of populate().
+        :param clock: Callable : Monotonic time source of the session expiry, seconds.
+        """
+        self.username = username
+        self.password = password
+        self.root_url = root_url
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.session_ttl = session_ttl
+        self.clock = clock
+        self.random = random.Random(seed)
+        self.requests: Counter = Counter()
+        self.logins = 0
+        self.backups = 0
+        self.online: set[str] = set()
+        self.ips: dict[str, list[str]] = {}
+        self.__sessions: dict[str, float] = {}
+        self.__failures: list[int] = []
+        self.__inbounds: dict[int, dict] = {}
+        self.__clients: dict[str, tuple[int, dict]] = {}
+        self.__traffic: dict[str, dict] = {}
+        self.__encoded: dict[int, str] = {}
+        self.__next_inbound = 1
+        self.__next_traffic = 1
+        self.__next_user = 0
+        self.__runner: Optional[web.AppRunner] = None
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__thread: Optional[threading.Thread] = None
+
+# ------------------------------------------------------ Server ---------------------------------------------------------
+
+    def app(self) -> web.Application:
+        """Return the aiohttp application of the panel"""
+        app = web.Application(middlewares=[self.__faults], client_max_size=256 * 1024 * 1024)
+        api = f'/{self.root_url}/panel/api/inbounds'
+        app.router.add_post(f'/{self.root_url}/login', self.__login)
+        routes = [
+            ('GET', '/list', self.__list), ('GET', '/get/{inbound_id}', self.__get),
+            ('GET', '/getClientTraffics/{email}', self.__traffic_by_email),
+            ('GET', '/getClientTrafficsById/{client_id}', self.__traffic_by_id),
+            ('GET', '/createbackup', self.__backup), ('POST', '/onlines', self.__onlines),
+            ('POST', '/add', self.__add_inbound), ('POST', '/update/{inbound_id}', self.__update_inbound),
+            ('POST', '/del/{inbound_id}', self.__delete_inbound), ('POST', '/addClient', self.__add_client),
+            ('POST', '/updateClient/{client_id}', self.__update_client),
+            ('POST', '/{inbound_id}/delClient/{client_id}', self.__delete_client),
+            ('POST', '/clientIps/{email}', self.__client_ips), ('POST', '/clearClientIps/{email}', self.__clear_ips),
+            ('POST', '/resetAllTraffics', self.__reset_all), ('POST', '/resetAllClientTraffics/{inbound_id}', self.__reset_inbound),
+            ('POST', '/{inbound_id}/resetClientTraffic/{email}', self.__reset_client),
+            ('POST', '/delDepletedClients/{inbound_id}', self.__delete_depleted),
+        ]
+        for method, path, handler in routes:
+            app.router.add_route(method, api + path, handler)
+        return app
+
+    async def start(self) -> None:
+        """Start serving on the event loop of the caller"""
+        self.__runner = web.AppRunner(self.app(), access_log=None)
+        await self.__runner.setup()
+        site = web.TCPSite(self.__runner, self.host, self.port)
+        await site.start()
+        self.port = self.__runner.addresses[0][1]
+
+    async def close(self) -> None:
+        """Stop serving"""
+        if self.__runner is not None:
+            await self.__runner.cleanup()
+            self.__runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def start_thread(self) -> None:
+        """Start serving from a background thread with its own event loop, for synchronous clients"""
+        started = threading.Event()
+        self.__loop = asyncio.new_event_loop()
+
+        def serve():
+            asyncio.set_event_loop(self.__loop)
+            self.__loop.run_until_complete(self.start())
+            started.set()
+            self.__loop.run_forever()
+            self.__loop.run_until_complete(self.close())
+            self.__loop.close()
+
+        self.__thread = threading.Thread(target=serve, name='fake-panel', daemon=True)
+        self.__thread.start()
+        started.wait()
+
+    def stop_thread(self) -> None:
+        """Stop the background thread started by start_thread()"""
+        if self.__thread is not None:
+            self.__loop.call_soon_threadsafe(self.__loop.stop)
+            self.__thread.join()
+            self.__thread = None
+
+    def __enter__(self):
+        self.start_thread()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop_thread()
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self.host}:{self.port}/{self.root_url}'
+
+    def client_kwargs(self, inbound_id: int = 1, **kwargs) -> dict:
+        """
+        Return the constructor arguments of Client3XUI or AsyncClient3XUI for this panel.
+
+        :param inbound_id: int : Default inbound of the client.
+        :param kwargs: Other constructor arguments, e.g. retry_policy.
+        """
+        return {'login': self.username, 'password': self.password, 'login_key': '', 'panel_host': self.host,
+                'root_url': self.root_url, 'sub_host': self.host, 'sub_path': 'sub', 'inbound_id': inbound_id,
+                'panel_port': self.port, 'scheme': 'http', **kwargs}
+
+# ------------------------------------------------------ Faults ---------------------------------------------------------
+
+    def fail_next(self, count: int = 1, status: int = 503) -> None:
+        """Answer the next `count` API requests with `status`"""
+        self.__failures.extend([status] * count)
+
+    def expire_sessions(self) -> None:
+        """Log out all sessions, the next API requests are answered with 401"""
+        self.__sessions.clear()
+
+    @web.middleware
+    async def __faults(self, request: web.Request, handler) -> web.StreamResponse:
+        if request.match_info.http_exception is not None:
+            return await handler(request)
+        # counted by endpoint, e.g. 'delClient' for /panel/api/inbounds/1/delClient/<id>
+        name = next(part for part in reversed(request.match_info.route.resource.canonical.split('/'))
+                    if part and not part.startswith('{'))
+        self.requests[name] += 1
+        if name == 'login':
+            return await handler(request)
+
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.__failures:
+            return web.Response(status=self.__failures.pop(0), text='Injected failure')
+        if self.error_rate and self.random.random() < self.error_rate:
+            return web.Response(status=self.error_status, text='Injected failure')
+
+        logged_in = self.__sessions.get(request.cookies.get(_COOKIE))
+        if logged_in is None or (self.session_ttl is not None and self.clock() - logged_in >= self.session_ttl):
+            return web.Response(status=401, text='Unauthorized')
+        return await handler(request)
+
+# ------------------------------------------------------- State ---------------------------------------------------------
+
+    def add_inbound(self, remark: str = '', port: Optional[int] = None, protocol: str = 'vless',
+                    clients: Iterable[dict] = (), **fields) -> int:
+        """
+        Add an inbound directly to the state.
+
+        :param remark: str : Remark of the inbound.
+        :param port: int | None : Port of the inbound, 10000 + id if None.
+        :param protocol: str : Protocol of the inbound.
+        :param clients: Iterable[dict] : Clients in the panel format.
+        :param fields: Other inbound fields in the panel format, e.g. streamSettings.
+        :return: int : The id of the inbound.
+        """
+        inbound_id = self.__next_inbound
+        self.__next_inbound += 1
+        settings = {'clients': [], 'decryption': 'none', 'fallbacks': []}
+        self.__inbounds[inbound_id] = {
+            'id': inbound_id, 'up': 0, 'down': 0, 'total': 0, 'remark': remark or f'inbound-{inbound_id}',
+            'enable': True, 'expiryTime': 0, 'listen': '', 'port': port or 10000 + inbound_id, 'protocol': protocol,
+            'tag': f'inbound-{port or 10000 + inbound_id}', 'settings': settings, 'streamSettings': '{}',
+            'sniffing': '{}', 'allocate': '{}', **fields}
+        for client in clients:
+            self.__insert(inbound_id, client)
+        return inbound_id
+
+    def populate(self, inbounds: int = 1, clients_per_inbound: int = 1000, protocol: str = 'vless',
+                 expiry_range: tuple[float, float] = (0.0, 0.0)) -> list[int]:
+        """
+        Add inbounds with synthetic clients and traffic, e.g. populate(1, 100000) for a large panel.
+
+        :param inbounds: int : Number of inbounds.
+        :param clients_per_inbound: int : Clients of every inbound.
+        :param protocol: str : Protocol of the inbounds.
+        :param expiry_range: tuple[float, float] : Seconds from now between which the clients expire, (0, 0) for never.
+        :return: list[int] : The ids of the inbounds.
+        """
+        rng = self.random
+        now = time.time()
+        ids = []
+        for _ in range(inbounds):
+            start = self.__next_user
+            self.__next_user += clients_per_inbound
+            clients = []
+            for n in range(start, start + clients_per_inbound):
+                expiry = int((now + rng.uniform(*expiry_range)) * 1000) if expiry_range[1] else 0
+                secret = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+                client = {'password': secret} if protocol in ('trojan', 'shadowsocks') else {'id': secret, 'flow': ''}
+                client.update({'email': f'user{n}@example.com', 'limitIp': 0, 'totalGB': 0, 'expiryTime': expiry,
+                               'enable': True, 'tgId': '', 'subId': f'sub{n}', 'reset': 0})
+                clients.append(client)
+            inbound_id = self.add_inbound(protocol=protocol, clients=clients)
+            for client in clients:
+                self.add_traffic(client['email'], rng.randrange(10 ** 9), rng.randrange(10 ** 10))
+            ids.append(inbound_id)
+        return ids
+
+    def add_traffic(self, email: str, up: int = 0, down: int = 0) -> None:
+        """Count traffic of a client"""
+        stats = self.__traffic[email]
+        stats['up'] += up
+        stats['down'] += down
+        inbound = self.__inbounds[stats['inboundId']]
+        inbound['up'] += up
+        inbound['down'] += down
+        self.__changed(stats['inboundId'])
+
+    def inbound(self, inbound_id: int) -> Optional[dict]:
+        """Return an inbound in the panel format, None if there is none"""
+        return codec.loads(self.__encode(inbound_id)) if inbound_id in self.__inbounds else None
+
+    def client(self, email: str) -> Optional[dict]:
+        """Return the settings of a client, None if there is none"""
+        entry = self.__clients.get(email)
+        return entry[1] if entry else None
+
+    def traffic(self, email: str) -> Optional[dict]:
+        """Return the traffic statistics of a client, None if there is none"""
+        return self.__traffic.get(email)
+
+    @property
+    def client_count(self) -> int:
+        return len(self.__clients)
+
+    def __insert(self, inbound_id: int, client: dict) -> None:
+        email = client['email']
+        self.__inbounds[inbound_id]['settings']['clients'].append(client)
+        self.__clients[email] = (inbound_id, client)
+        self.__traffic[email] = {'id': self.__next_traffic, 'inboundId': inbound_id, 'enable': client.get('enable', True),
+                                 'email': email, 'up': 0, 'down': 0, 'expiryTime': client.get('expiryTime', 0),
+                                 'total': client.get('totalGB', 0), 'reset': client.get('reset', 0), 'lastOnline': 0}
+        self.__next_traffic += 1
+        self.__changed(inbound_id)
+
+    def __remove(self, email: str) -> None:
+        inbound_id, client = self.__clients.pop(email)
+        clients = self.__inbounds[inbound_id]['settings']['clients']
+        clients.remove(client)
+        self.__traffic.pop(email, None)
+        self.__changed(inbound_id)
+
+    def __find(self, inbound_id: int, client_id: str) -> Optional[dict]:
+        inbound = self.__inbounds[inbound_id]
+        for client in inbound['settings']['clients']:
+            if client_identity(client, inbound['protocol']) == client_id:
+                return client
+        return None
+
+    def __changed(self, inbound_id: int) -> None:
+        self.__encoded.pop(inbound_id, None)
+
+    def __encode(self, inbound_id: int) -> str:
+        encoded = self.__encoded.get(inbound_id)
+        if encoded is None:
+            inbound = self.__inbounds[inbound_id]
+            clients = inbound['settings']['clients']
+            stats = [self.__traffic[client['email']] for client in clients if client['email'] in self.__traffic]
+            encoded = codec.dumps({**inbound, 'settings': codec.dumps(inbound['settings']), 'clientStats': stats})
+            self.__encoded[inbound_id] = encoded
+        return encoded
+
+# ------------------------------------------------------ Handlers -------------------------------------------------------
+
+    async def __login(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        if form.get('username') != self.username or form.get('password') != self.password:
+            return _reply(False, 'Wrong username or password')
+        token = secrets.token_hex(16)
+        self.__sessions[token] = self.clock()
+        self.logins += 1
+        response = _reply(True, 'Login Successfully')
+        response.set_cookie(_COOKIE, token, path='/', httponly=True)
+        return response
+
+    def __inbound_id(self, request: web.Request) -> Optional[int]:
+        try:
+            inbound_id = int(request.match_info['inbound_id'])
+        except ValueError:
+            return None
+        return inbound_id if inbound_id in self.__inbounds else None
+
+    async def __list(self, request: web.Request) -> web.Response:
+        body = '{"success":true,"msg":"","obj":[' + ','.join(map(self.__encode, self.__inbounds)) + ']}'
+        return web.Response(text=body, content_type='application/json')
+
+    async def __get(self, request: web.Request) -> web.Response:
+        inbound_id = self.__inbound_id(request)
+        if inbound_id is None:
+            return _reply(False, 'Obtain Failed: record not found')
+        body = '{"success":true,"msg":"","obj":' + self.__encode(inbound_id) + '}'
+        return web.Response(text=body, content_type='application/json')
+
+    async def __traffic_by_email(self, request: web.Request) -> web.Response:
+        return _reply(obj=self.__traffic.get(request.match_info['email']))
+
+    async def __traffic_by_id(self, request: web.Request) -> web.Response:
+        client_id = request.match_info['client_id']
+        stats = [self.__traffic[email] for email, (inbound_id, client) in self.__clients.items()
+                 if client_identity(client, self.__inbounds[inbound_id]['protocol']) == client_id
+                 and email in self.__traffic]
+        return _reply(obj=stats)
+
+    async def __backup(self, request: web.Request) -> web.Response:
+        self.backups += 1
+        return _reply()
+
+    async def __onlines(self, request: web.Request) -> web.Response:
+        return _reply(obj=sorted(self.online))
+
+    async def __add_inbound(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        settings = codec.loads(form.get('settings') or '{}')
+        clients = settings.pop('clients', [])
+        duplicate = next((client['email'] for client in clients if client['email'] in self.__clients), None)
+        if duplicate is not None:
+            return _reply(False, f'Duplicate email: {duplicate}')
+        inbound_id = self.add_inbound(form.get('remark', ''), int(form.get('port') or 0) or None,
+                                      form.get('protocol', 'vless'), clients, **self.__inbound_fields(form))
+        self.__inbounds[inbound_id]['settings'].update(settings)
+        return _reply(msg='Create Successfully', obj=self.inbound(inbound_id))
+
+    @staticmethod
+    def __inbound_fields(form) -> dict:
+        fields = {key: form[key] for key in ('listen', 'streamSettings', 'sniffing', 'allocate') if key in form}
+        fields.update({key: int(form[key]) for key in ('up', 'down', 'total', 'expiryTime') if key in form})
+        if 'enable' in form:
+            fields['enable'] = form['enable'] in _TRUE
+        return fields
+
+    async def __update_inbound(self, request: web.Request) -> web.Response:
+        inbound_id = self.__inbound_id(request)
+        if inbound_id is None:
+            return _reply(False, 'Update Failed: record not found')
+        form = await request.post()
+        inbound = self.__inbounds[inbound_id]
+        inbound.update(self.__inbound_fields(form))
+        for key in ('remark', 'protocol'):
+            if key in form:
+                inbound[key] = form[key]
+        if 'port' in form:
+            inbound['port'] = int(form['port'])
+        if form.get('settings'):
+            settings = codec.loads(form['settings'])
+            for email in [client['email'] for client in inbound['settings']['clients']]:
+                self.__remove(email)
+            for client in settings.pop('clients', []):
+                self.__insert(inbound_id, client)
+            inbound['settings'].update(settings)
+        self.__changed(inbound_id)
+        return _reply(msg='Update Successfully', obj=self.inbound(inbound_id))
+
+    async def __delete_inbound(self, request: web.Request) -> web.Response:
+        inbound_id = self.__inbound_id(request)
+        if inbound_id is None:
+            return _reply(False, 'Delete Failed: record not found')
+        for email in [client['email'] for client in self.__inbounds[inbound_id]['settings']['clients']]:
+            self.__remove(email)
+        del self.__inbounds[inbound_id]
+        self.__changed(inbound_id)
+        return _reply(msg='Delete Successfully', obj=inbound_id)
+
+    async def __client_form(self, request: web.Request) -> tuple[Optional[int], list[dict]]:
+        form = await request.post()
+        try:
+            inbound_id = int(form.get('id') or form.get('inbound'))
+        except (TypeError, ValueError):
+            return None, []
+        if inbound_id not in self.__inbounds:
+            return None, []
+        return inbound_id, codec.loads(form.get('settings') or '{}').get('clients') or []
+
+    async def __add_client(self, request: web.Request) -> web.Response:
+        inbound_id, clients = await self.__client_form(request)
+        if inbound_id is None:
+            return _reply(False, 'Add Failed: record not found')
+        emails = [client.get('email') for client in clients]
+        duplicate = next((email for email in emails if email in self.__clients or not email), None)
+        if duplicate is not None or len(set(emails)) != len(emails):
+            return _reply(False, f'Duplicate email: {duplicate}')
+        for client in clients:
+            self.__insert(inbound_id, client)
+        return _reply(msg='Inbound client(s) have been added.')
+
+    async def __update_client(self, request: web.Request) -> web.Response:
+        inbound_id, clients = await self.__client_form(request)
+        if inbound_id is None or not clients:
+            return _reply(False, 'Update Failed: record not found')
+        current = self.__find(inbound_id, request.match_info['client_id'])
+        if current is None:
+            return _reply(False, 'Update Failed: client not found')
+        new = clients[0]
+        if new['email'] != current['email'] and new['email'] in self.__clients:
+            return _reply(False, f'Duplicate email: {new["email"]}')
+
+        stats = self.__traffic.pop(current['email'], None)
+        del self.__clients[current['email']]
+        current.clear()
+        current.update(new)
+        self.__clients[current['email']] = (inbound_id, current)
+        if stats is not None:
+            stats.update(email=current['email'], enable=current.get('enable', True),
+                         expiryTime=current.get('expiryTime', 0), total=current.get('totalGB', 0))
+            self.__traffic[current['email']] = stats
+        self.__changed(inbound_id)
+        return _reply(msg='Inbound client has been updated.')
+
+    async def __delete_client(self, request: web.Request) -> web.Response:
+        inbound_id = self.__inbound_id(request)
+        client = self.__find(inbound_id, request.match_info['client_id']) if inbound_id is not None else None
+        if client is None:
+            return _reply(False, 'Delete Failed: client not found')
+        self.__remove(client['email'])
+        return _reply(msg='Inbound client has been deleted.')
+
+    async def __client_ips(self, request: web.Request) -> web.Response:
+        return _reply(obj=self.ips.get(request.match_info['email']) or 'No IP Record')
+
+    async def __clear_ips(self, request: web.Request) -> web.Response:
+        self.ips.pop(request.match_info['email'], None)
+        return _reply(msg='Log cleared')
+
+    def __reset(self, emails: Iterable[str]) -> None:
+        for email in emails:
+            stats = self.__traffic.get(email)
+            if stats is not None:
+                stats['up'] = stats['down'] = 0
+                self.__changed(stats['inboundId'])
+
+    async def __reset_all(self, request: web.Request) -> web.Response:
+        for inbound_id, inbound in self.__inbounds.items():
+            inbound['up'] = inbound['down'] = 0
+            self.__changed(inbound_id)
+        self.__reset(list(self.__traffic))
+        return _reply(msg='All traffic has been reset.')
+
+    async def __reset_inbound(self, request: web.Request) -> web.Response:
+        inbound_id = self.__inbound_id(request)
+        if inbound_id is not None:
+            self.__reset([client['email'] for client in self.__inbounds[inbound_id]['settings']['clients']])
+        return _reply(msg='All traffic from the client has been reset.')
+
+    async def __reset_client(self, request: web.Request) -> web.Response:
+        self.__reset([request.match_info['email']])
+        return _reply(msg='Traffic has been reset.')
+
+    async def __delete_depleted(self, request: web.Request) -> web.Response:
+        inbound_id = int(request.match_info['inbound_id'])
+        now = time.time() * 1000
+        depleted = []
+        for email, (client_inbound, client) in self.__clients.items():
+            if inbound_id not in (-1, client_inbound):
+                continue
+            stats = self.__traffic.get(email, {})
+            expired = 0 < client.get('expiryTime', 0) <= now
+            exhausted = 0 < client.get('totalGB', 0) <= stats.get('up', 0) + stats.get('down', 0)
+            if expired or exhausted:
+                depleted.append(email)
+        for email in depleted:
+            self.__remove(email)
+        return _reply(msg='All depleted clients are deleted.')
+
+    def __repr__(self):
+        return (f'FakePanel(base_url={self.base_url!r}, inbounds={len(self.__inbounds)}, clients={self.client_count}, '
+                f'latency={self.latency}, error_rate={self.error_rate}, session_ttl={self.session_ttl})')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Serve an in-memory 3X-UI stand-in panel')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2053)
+    parser.add_argument('--root-url', default='panel')
+    parser.add_argument('--inbounds', type=int, default=1)
+    parser.add_argument('--clients', type=int, default=1000, help='clients per inbound')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every API request')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--session-ttl', type=float, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    async def serve():
+        panel = FakePanel(root_url=args.root_url, host=args.host, port=args.port, latency=args.latency,
+                          jitter=args.jitter, error_rate=args.error_rate, session_ttl=args.session_ttl, seed=args.seed)
+        panel.populate(args.inbounds, args.clients)
+        async with panel:
+            print(f'{panel!r}, login {panel.username}/{panel.password}', flush=True)
+            await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+import asyncio
+import pprint
+import time
+from typing import Any, Awaitable, Callable, Iterable, Mapping
+
+from client3x.client3x.AsyncClient import AsyncClient3XUI
+from client3x.client3x.PanelResponse import PanelResponse
+from client3x.client3x.errors import ClientError
+from client3x.client3x.placement import Placement
+
+
+class PanelResult:
+    """
+    Class for representing the outcome of a fleet call on one panel.
+    """
+    def __init__(self, panel: str, result=None, error: Exception | None = None, seconds: float = 0.0):
+        self.panel = panel
+        self.result = result
+        self.error = error
+        self.seconds = seconds
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        if self.error is not None:
+            return f'PanelResult(panel={self.panel!r}, error={self.error!r}, seconds={self.seconds:.3f})'
+        return f'PanelResult(panel={self.panel!r}, result={pprint.pformat(self.result)}, seconds={self.seconds:.3f})'
+
+
+class FleetResult:
+    """
+    Class for representing the outcome of a fleet call, one PanelResult per panel in the order of the fleet.
+
+    Panels that failed or timed out are in `errors`, the results of the other panels are still available.
+    """
+    def __init__(self, panels: list[PanelResult]):
+        self.panels = panels
+
+    @property
+    def ok(self) -> bool:
+        return all(panel.ok for panel in self.panels)
+
+    @property
+    def results(self) -> dict[str, Any]:
+        """Results of the panels that answered"""
+        return {panel.panel: panel.result for panel in self.panels if panel.ok}
+
+    @property
+    def errors(self) -> dict[str, Exception]:
+        """Errors of the panels that failed"""
+        return {panel.panel: panel.error for panel in self.panels if not panel.ok}
+
+    def merged(self) -> list[tuple[str, Any]]:
+        """
+        Merge the results of the panels that answered into one list tagged with the panel name.
+
+        List results (obj of a PanelResponse) are flattened, None results are skipped.
+
+        :return: list[tuple[str, Any]] : (panel, item) pairs, e.g. ('de-1', inbound) for get_inbounds().
+        """
+        merged = []
+        for name, result in self.results.items():
+            if isinstance(result, PanelResponse):
+                result = result.obj
+            if result is None:
+                continue
+            if isinstance(result, list):
+                merged.extend((name, item) for item in result)
+            else:
+                merged.append((name, result))
+        return merged
+
+    def __repr__(self):
+        return ('FleetResult object (\n'
+                f'ok : {self.ok}\n'
+                f'answered : {len(self.results)}/{len(self.panels)}\n'
+                f'panels : {pprint.pformat(self.panels)}\n)')
+
+
+class AsyncFleetClient:
+    """
+    Client of several panels, fanning out reads to all of them concurrently.
+
+    Every panel gets `timeout` seconds per call, a slow or failing panel is reported in the result
+    instead of stalling or failing the whole call. A PanelResponse with success false counts as a failure.
+    """
+    def __init__(self, clients: Mapping[str, AsyncClient3XUI] | Iterable[AsyncClient3XUI], timeout: float = 10.0,
+                 placement: Placement | None = None):
+        """
+        :param clients: Mapping[str, AsyncClient3XUI] | Iterable[AsyncClient3XUI] : The panel clients by panel name,
+            clients given without names are named by their base_url.
+        :param timeout: float : Seconds each panel has to answer a call.
+        :param placement: Placement | None : Placement of new clients on the inbounds of the panels, used by locate().
+        """
+        if timeout <= 0:
+            raise ValueError(f'Timeout must be positive, got {timeout}')
+        if not isinstance(clients, Mapping):
+            clients = {client.base_url: client for client in clients}
+        self.clients: dict[str, AsyncClient3XUI] = dict(clients)
+        self.timeout = timeout
+        self.placement = placement
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Close the clients of all panels"""
+        await asyncio.gather(*(client.close() for client in self.clients.values()), return_exceptions=True)
+
+    def __getitem__(self, panel: str) -> AsyncClient3XUI:
+        return self.clients[panel]
+
+    @property
+    def panels(self) -> list[str]:
+        return list(self.clients)
+
+    def locate(self, key: str | int) -> tuple[AsyncClient3XUI, int]:
+        """
+        Return where a client is placed, to add it or to route later calls for it to the right panel.
+
+        :param key: str | int : Email or telegram id of the client, the key the placement uses.
+        :return: tuple[AsyncClient3XUI, int] : The client of the panel and the inbound id.
+        :raise ValueError: If the fleet has no placement.
+        """
+        if self.placement is None:
+            raise ValueError('The fleet has no placement')
+        target = self.placement.locate(key)
+        return self.clients[target.panel], target.inbound_id
+
+    async def __call_panel(self, name: str, client: AsyncClient3XUI, method: str,
+                           call: Callable[[AsyncClient3XUI], Awaitable], timeout: float) -> PanelResult:
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(call(client), timeout)
+            if isinstance(result, PanelResponse) and not result.success:
+                raise ClientError(result.message or 'Panel request failed', 200)
+        except asyncio.TimeoutError:
+            error = asyncio.TimeoutError(f'Panel {name} did not answer {method} in {timeout} seconds')
+        except Exception as e:
+            error = e
+        else:
+            return PanelResult(name, result=result, seconds=time.perf_counter() - started)
+
+        logger = getattr(client, 'logger', None)
+        if logger:
+            logger.error(f'Fleet call {method} failed on panel {name}: {repr(error)}')
+        return PanelResult(name, error=error, seconds=time.perf_counter() - started)
+
+    async def gather(self, method: str, *args, timeout: float | None = None, **kwargs) -> FleetResult:
+        """
+        Call a client coroutine method on all panels concurrently.
+
+        :param method: str : Name of the AsyncClient3XUI method, e.g. 'get_inbounds'.
+        :param args: Positional arguments of the method.
+        :param timeout: float | None : Seconds each panel has to answer, the fleet timeout if None.
+        :param kwargs: Keyword arguments of the method.
+        :return: FleetResult
+        """
+        return await self.__gather(method, lambda client: getattr(client, method)(*args, **kwargs), timeout)
+
+    async def __gather(self, method: str, call: Callable[[AsyncClient3XUI], Awaitable],
+                       timeout: float | None = None) -> FleetResult:
+        timeout = self.timeout if timeout is None else timeout
+        return FleetResult(list(await asyncio.gather(*(
+            self.__call_panel(name, client, method, call, timeout) for name, client in self.clients.items()))))
+
+    async def get_inbounds(self) -> FleetResult:
+        """
+        Get the inbounds of all panels, merged() yields (panel, inbound) pairs.
+        """
+        return await self.gather('get_inbounds')
+
+    async def online_clients(self) -> FleetResult:
+        """
+        Get the online clients of all panels, merged() yields (panel, email) pairs.
+        """
+        return await self.gather('online_clients')
+
+    async def get_client_traffic(self, email: str) -> FleetResult:
+        """
+        Get the traffic of a client from all panels, merged() yields (panel, traffic) for the panels that know the email.
+        """
+        return await self.gather('get_client_traffic', email)
+
+    async def client_stats(self) -> FleetResult:
+        """
+        Get the traffic statistics of all clients of all panels, merged() yields (panel, clientStats entry) pairs.
+
+        The inbound list of every panel is streamed and only the clientStats are kept.
+        """
+        async def stats(client: AsyncClient3XUI) -> list[dict]:
+            return [stat async for inbound in client.iter_inbounds(fields=('clientStats',))
+                    for stat in inbound.get('clientStats') or ()]
+
+        return await self.__gather('client_stats', stats)
+
+    async def find_client(self, email: str) -> tuple[str, dict] | None:
+        """
+        Find the panel of a client.
+
+        :param email: str : Email of the client.
+        :return: tuple[str, dict] | None : (panel, traffic) of the first panel that knows the email, None if no panel does.
+        """
+        merged = (await self.get_client_traffic(email)).merged()
+        return merged[0] if merged else None
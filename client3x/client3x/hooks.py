@@ -0,0 +1,102 @@
+import inspect
+from dataclasses import dataclass, field
+from logging import Logger
+from typing import Any, Callable, Optional
+
+
+@dataclass(slots=True)
+class RequestEvent:
+    """
+    One attempt of a panel request, passed to every hook of the attempt.
+
+    `endpoint` is the path template, e.g. '/panel/api/inbounds/getClientTraffics/{email}', see endpoint_template().
+    `status`, `seconds` and `bytes_in` are set for after_response and on_error, `error` for on_error,
+    where `status` is the status of a ClientError or 0 if there was no response.
+    The same event goes to before_request and to the after_response or on_error hooks of the attempt,
+    so hooks can keep their state, e.g. a tracing span, in `context`.
+    """
+    method: str
+    url: str
+    endpoint: str
+    attempt: int
+    bytes_out: int
+    status: Optional[int] = None
+    seconds: float = 0.0
+    bytes_in: int = 0
+    error: Optional[Exception] = None
+    context: dict = field(default_factory=dict)
+
+
+class RequestHooks:
+    """
+    Callbacks run around every attempt of a panel request: 'before_request', 'after_response' and 'on_error'.
+
+    Hooks are called in the order they were added with the RequestEvent of the attempt. Hooks of AsyncClient3XUI
+    may be coroutine functions, hooks of Client3XUI run in the thread of the request. An exception raised by a hook
+    is logged by the client and does not fail the request. A client without hooks only checks that there are none.
+    """
+    EVENTS = ('before_request', 'after_response', 'on_error')
+
+    def __init__(self):
+        self.__hooks: dict[str, list[Callable[[RequestEvent], Any]]] = {event: [] for event in self.EVENTS}
+        self.__count = 0
+
+    def add(self, event: str, hook: Callable[[RequestEvent], Any]) -> Callable[[RequestEvent], Any]:
+        """
+        Add a hook.
+
+        :param event: str : 'before_request', 'after_response' or 'on_error'.
+        :param hook: Callable : Called with the RequestEvent.
+        :return: The hook, so add() works as a decorator through before_request() and the other shortcuts.
+        """
+        if event not in self.__hooks:
+            raise ValueError(f'Event must be one of {self.EVENTS}, got {event!r}')
+        self.__hooks[event].append(hook)
+        self.__count += 1
+        return hook
+
+    def remove(self, event: str, hook: Callable[[RequestEvent], Any]) -> None:
+        """Remove a hook, raises ValueError if it was not added"""
+        self.__hooks[event].remove(hook)
+        self.__count -= 1
+
+    def before_request(self, hook: Callable[[RequestEvent], Any]) -> Callable[[RequestEvent], Any]:
+        """Add a hook called before an attempt is sent"""
+        return self.add('before_request', hook)
+
+    def after_response(self, hook: Callable[[RequestEvent], Any]) -> Callable[[RequestEvent], Any]:
+        """Add a hook called after a response was read, whatever its status"""
+        return self.add('after_response', hook)
+
+    def on_error(self, hook: Callable[[RequestEvent], Any]) -> Callable[[RequestEvent], Any]:
+        """Add a hook called when an attempt got no response or the login failed"""
+        return self.add('on_error', hook)
+
+    def emit(self, event: str, request: RequestEvent, logger: Logger | None = None) -> None:
+        """Run the hooks of an event"""
+        for hook in self.__hooks[event]:
+            try:
+                hook(request)
+            except Exception as e:
+                if logger:
+                    logger.error(f'Request hook {hook!r} failed on {event}: {repr(e)}')
+
+    async def emit_async(self, event: str, request: RequestEvent, logger: Logger | None = None) -> None:
+        """Run the hooks of an event, awaiting coroutine hooks"""
+        for hook in self.__hooks[event]:
+            try:
+                result = hook(request)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                if logger:
+                    logger.error(f'Request hook {hook!r} failed on {event}: {repr(e)}')
+
+    def __bool__(self):
+        return self.__count > 0
+
+    def __len__(self):
+        return self.__count
+
+    def __repr__(self):
+        return 'RequestHooks(' + ', '.join(f'{event}={len(hooks)}' for event, hooks in self.__hooks.items()) + ')'
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Iterable
+
+
+@dataclass(slots=True)
+class TrafficDelta:
+    """
+    Traffic of a client between two polls, bytes.
+
+    `reset` is True when the counters of the client went down since the previous poll (reset_client_traffic(),
+    reset_all_traffics(), the client was recreated), `up` and `down` are then the traffic counted since the reset.
+    """
+    email: str
+    inbound_id: int
+    up: int
+    down: int
+    reset: bool
+    timestamp: float
+
+
+class TrafficMeter:
+    """
+    Turns the cumulative traffic counters of the panel into per-client deltas.
+
+    Every poll reads the clientStats of all inbounds with one streamed inbounds/list request and compares
+    the counters with the ones of the previous poll. The first poll only records the counters.
+    Clients that appear later are reported with all their traffic, clients that disappear are forgotten.
+    Traffic made between the last poll and a reset of the counters can not be seen and is lost,
+    keep the interval short compared to the way resets are used.
+    """
+    def __init__(self, client=None, interval: float = 60.0, clock: Callable[[], float] = time.time):
+        """
+        :param client: AsyncClient3XUI | None : Client used by poll() and deltas(), not needed to call update() directly.
+        :param interval: float : Seconds between the starts of two polls.
+        :param clock: Callable : Time source of the delta timestamps, seconds.
+        """
+        if interval <= 0:
+            raise ValueError(f'Interval must be positive, got {interval}')
+        self.client = client
+        self.interval = interval
+        self.clock = clock
+        self.polls = 0
+        self.resets = 0
+        self.__counters: dict[str, tuple[int, int]] = {}
+
+    def update(self, stats: Iterable[dict], timestamp: float | None = None) -> list[TrafficDelta]:
+        """
+        Record the counters of a poll.
+
+        :param stats: Iterable[dict] : clientStats entries of all inbounds, in the panel format.
+        :param timestamp: float | None : Time of the poll, the clock is read if None.
+        :return: list[TrafficDelta] : Clients whose traffic changed or whose counters were reset since the previous poll.
+        """
+        if timestamp is None:
+            timestamp = self.clock()
+        previous = self.__counters
+        counters = {}
+        deltas = []
+        first = self.polls == 0
+
+        for stat in stats:
+            email = stat['email']
+            up = stat['up']
+            down = stat['down']
+            counters[email] = current = (up, down)
+            last = previous.get(email)
+            if last == current:  # idle clients, the common case
+                continue
+            if last is None:
+                if first or not (up or down):
+                    continue
+                deltas.append(TrafficDelta(email, stat['inboundId'], up, down, False, timestamp))
+                continue
+            last_up, last_down = last
+            if up < last_up or down < last_down:
+                self.resets += 1
+                deltas.append(TrafficDelta(email, stat['inboundId'], up, down, True, timestamp))
+            else:
+                deltas.append(TrafficDelta(email, stat['inboundId'], up - last_up, down - last_down, False, timestamp))
+
+        self.__counters = counters
+        self.polls += 1
+        return deltas
+
+    async def poll(self) -> list[TrafficDelta]:
+        """
+        Read the counters of all clients from the panel and return their deltas.
+
+        :return: list[TrafficDelta] : See update().
+        :raise ClientError: If the request fails, the counters of the previous poll are kept.
+        """
+        timestamp = self.clock()
+        stats = []
+        async for inbound in self.client.iter_inbounds(fields=('clientStats',)):
+            stats.extend(inbound.get('clientStats') or ())
+        return self.update(stats, timestamp)
+
+    async def deltas(self) -> AsyncIterator[TrafficDelta]:
+        """
+        Poll every `interval` seconds forever and yield the deltas.
+
+        The generator stops with the error of a failed poll. The meter keeps its counters,
+        so calling deltas() again resumes metering without losing traffic.
+
+        :return: AsyncIterator[TrafficDelta]
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            for delta in await self.poll():
+                yield delta
+            await asyncio.sleep(max(0.0, started + self.interval - loop.time()))
+
+    @property
+    def clients(self) -> int:
+        """Number of clients whose counters are known"""
+        return len(self.__counters)
+
+    def __repr__(self):
+        return f'TrafficMeter(interval={self.interval}, clients={self.clients}, polls={self.polls}, resets={self.resets})'
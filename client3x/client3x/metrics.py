@@ -0,0 +1,205 @@
+import bisect
+import threading
+from dataclasses import dataclass, field
+from typing import Iterable
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# path segments that name an endpoint, every other segment is a parameter
+_ACTIONS = frozenset((
+    'login', 'panel', 'api', 'inbounds', 'list', 'get', 'add', 'update', 'del', 'addClient', 'updateClient',
+    'delClient', 'getClientTraffics', 'getClientTrafficsById', 'clientIps', 'clearClientIps', 'onlines',
+    'createbackup', 'resetAllTraffics', 'resetAllClientTraffics', 'resetClientTraffic', 'delDepletedClients'))
+
+# name of the parameter that follows an action
+_PARAMETERS = {
+    'get': '{inbound_id}', 'update': '{inbound_id}', 'del': '{inbound_id}', 'resetAllClientTraffics': '{inbound_id}',
+    'delDepletedClients': '{inbound_id}', 'updateClient': '{client_id}', 'delClient': '{client_id}',
+    'getClientTrafficsById': '{client_id}', 'getClientTraffics': '{email}', 'clientIps': '{email}',
+    'clearClientIps': '{email}', 'resetClientTraffic': '{email}'}
+
+
+def endpoint_template(path: str) -> str:
+    """
+    Replace the emails and ids in a panel API path by parameter names.
+
+    endpoint_template('/panel/api/inbounds/3/delClient/5b8f...') == '/panel/api/inbounds/{inbound_id}/delClient/{client_id}'
+
+    :param path: str : The path of the request after the base url of the panel, query strings are dropped.
+    :return: str : The path with known action names kept and every other segment replaced.
+    """
+    segments = path.split('?', 1)[0].split('/')
+    template = []
+    for index, segment in enumerate(segments):
+        if not segment or segment in _ACTIONS:
+            template.append(segment)
+        elif index + 1 < len(segments) and segments[index + 1] in _ACTIONS:
+            template.append('{inbound_id}')  # /{inbound_id}/delClient/... and /{inbound_id}/resetClientTraffic/...
+        else:
+            template.append(_PARAMETERS.get(segments[index - 1], '{param}') if index else '{param}')
+    return '/'.join(template)
+
+
+@dataclass(slots=True)
+class _EndpointStats:
+    statuses: dict[int, int] = field(default_factory=dict)
+    buckets: list[int] = field(default_factory=list)
+    seconds: float = 0.0
+    bytes_out: int = 0
+    bytes_in: int = 0
+    retries: int = 0
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound)) if bound != int(bound) else f'{bound:.1f}'
+
+
+class ClientMetrics:
+    """
+    Request metrics of one or more clients: counts by status, latency histograms, bytes sent and received,
+    retries, logins and session refreshes, per endpoint template.
+
+    Endpoints are labelled by method and endpoint_template() of the path, so emails and ids do not create
+    new label values. Every attempt of a request is observed once, a retried request counts every attempt
+    and a retry. Status 0 stands for attempts that got no response. Safe to share between threads and clients.
+    """
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS, namespace: str = 'client3x'):
+        """
+        :param buckets: Iterable[float] : Upper bounds of the latency histogram buckets in seconds.
+        :param namespace: str : Prefix of the Prometheus metric names.
+        """
+        self.buckets = tuple(sorted(set(buckets)))
+        if not self.buckets:
+            raise ValueError('At least one histogram bucket is needed')
+        self.namespace = namespace
+        self.logins = 0
+        self.auth_refreshes = 0
+        self.__endpoints: dict[tuple[str, str], _EndpointStats] = {}
+        self.__templates: dict[str, str] = {}
+        self.__lock = threading.Lock()
+
+    def __stats(self, method: str, path: str) -> _EndpointStats:
+        template = self.__templates.get(path)
+        if template is None:
+            template = endpoint_template(path)
+            if len(self.__templates) < 4096:  # paths with emails are unbounded, only the first ones are remembered
+                self.__templates[path] = template
+        stats = self.__endpoints.get((method, template))
+        if stats is None:
+            stats = self.__endpoints[(method, template)] = _EndpointStats(buckets=[0] * (len(self.buckets) + 1))
+        return stats
+
+    def observe(self, method: str, path: str, status: int, seconds: float, bytes_out: int = 0, bytes_in: int = 0) -> None:
+        """
+        Record one attempt of a request.
+
+        :param method: str : HTTP method.
+        :param path: str : Path after the base url of the panel, e.g. '/panel/api/inbounds/list'.
+        :param status: int : Response status, 0 if there was no response.
+        :param seconds: float : Time until the response was read.
+        :param bytes_out: int : Size of the request body.
+        :param bytes_in: int : Size of the response body.
+        """
+        with self.__lock:
+            stats = self.__stats(method, path)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.buckets[bisect.bisect_left(self.buckets, seconds)] += 1
+            stats.seconds += seconds
+            stats.bytes_out += bytes_out
+            stats.bytes_in += bytes_in
+
+    def retry(self, method: str, path: str) -> None:
+        """Record that a request is sent again after a failure"""
+        with self.__lock:
+            self.__stats(method, path).retries += 1
+
+    def login(self) -> None:
+        """Record a successful login"""
+        with self.__lock:
+            self.logins += 1
+
+    def auth_refresh(self) -> None:
+        """Record a response that showed an expired session, before the client logs in again"""
+        with self.__lock:
+            self.auth_refreshes += 1
+
+    def reset(self) -> None:
+        """Drop all recorded values"""
+        with self.__lock:
+            self.__endpoints.clear()
+            self.logins = 0
+            self.auth_refreshes = 0
+
+    def snapshot(self) -> dict:
+        """
+        Return the recorded values.
+
+        :return: dict : {'endpoints': {'GET /panel/api/inbounds/list': {'method', 'endpoint', 'requests', 'statuses',
+            'retries', 'bytes_out', 'bytes_in', 'latency': {'count', 'sum', 'buckets'}}}, 'logins', 'auth_refreshes'},
+            the buckets map upper bounds ('+Inf' last) to cumulative counts like Prometheus.
+        """
+        with self.__lock:
+            endpoints = {}
+            for (method, template), stats in sorted(self.__endpoints.items()):
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(self.buckets + ('+Inf',), stats.buckets):
+                    cumulative += count
+                    buckets[bound] = cumulative
+                endpoints[f'{method} {template}'] = {
+                    'method': method, 'endpoint': template, 'requests': cumulative, 'statuses': dict(stats.statuses),
+                    'retries': stats.retries, 'bytes_out': stats.bytes_out, 'bytes_in': stats.bytes_in,
+                    'latency': {'count': cumulative, 'sum': stats.seconds, 'buckets': buckets}}
+            return {'endpoints': endpoints, 'logins': self.logins, 'auth_refreshes': self.auth_refreshes}
+
+    def to_prometheus(self) -> str:
+        """Return the recorded values in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        endpoints = snapshot['endpoints'].values()
+        name = self.namespace
+        lines = []
+
+        def header(metric: str, kind: str, text: str):
+            lines.append(f'# HELP {name}_{metric} {text}')
+            lines.append(f'# TYPE {name}_{metric} {kind}')
+
+        def labels(item: dict, **extra) -> str:
+            pairs = {'method': item['method'], 'endpoint': item['endpoint'], **extra}
+            return ','.join(f'{key}="{_escape(str(value))}"' for key, value in pairs.items())
+
+        header('requests_total', 'counter', 'Panel request attempts by endpoint and response status, 0 for no response.')
+        for item in endpoints:
+            for status, count in sorted(item['statuses'].items()):
+                lines.append(f'{name}_requests_total{{{labels(item, status=status)}}} {count}')
+
+        header('request_duration_seconds', 'histogram', 'Time until the response of a panel request was read.')
+        for item in endpoints:
+            latency = item['latency']
+            for bound, count in latency['buckets'].items():
+                le = bound if bound == '+Inf' else _format_bound(bound)
+                lines.append(f'{name}_request_duration_seconds_bucket{{{labels(item, le=le)}}} {count}')
+            lines.append(f'{name}_request_duration_seconds_sum{{{labels(item)}}} {latency["sum"]!r}')
+            lines.append(f'{name}_request_duration_seconds_count{{{labels(item)}}} {latency["count"]}')
+
+        for metric, key, text in (('request_bytes_total', 'bytes_out', 'Bytes of panel request bodies.'),
+                                  ('response_bytes_total', 'bytes_in', 'Bytes of panel response bodies.'),
+                                  ('retries_total', 'retries', 'Panel requests sent again after a failure.')):
+            header(metric, 'counter', text)
+            for item in endpoints:
+                lines.append(f'{name}_{metric}{{{labels(item)}}} {item[key]}')
+
+        header('logins_total', 'counter', 'Successful logins to the panel.')
+        lines.append(f'{name}_logins_total {snapshot["logins"]}')
+        header('auth_refreshes_total', 'counter', 'Expired panel sessions that were renewed.')
+        lines.append(f'{name}_auth_refreshes_total {snapshot["auth_refreshes"]}')
+        return '\n'.join(lines) + '\n'
+
+    def __repr__(self):
+        with self.__lock:
+            requests = sum(sum(stats.statuses.values()) for stats in self.__endpoints.values())
+            return f'ClientMetrics(endpoints={len(self.__endpoints)}, requests={requests}, logins={self.logins})'
@@ -0,0 +1,272 @@
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+from client3x.client3x import codec
+
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS inbounds (
+    id INTEGER PRIMARY KEY, remark TEXT, protocol TEXT, port INTEGER, listen TEXT, tag TEXT, enable INTEGER,
+    expiry_time INTEGER, up INTEGER, down INTEGER, total INTEGER
+);
+CREATE TABLE IF NOT EXISTS clients (
+    email TEXT PRIMARY KEY, inbound_id INTEGER NOT NULL, id TEXT, sub_id TEXT, enable INTEGER, flow TEXT,
+    limit_ip INTEGER, total_gb INTEGER, expiry_time INTEGER, tg_id, comment TEXT
+);
+CREATE INDEX IF NOT EXISTS clients_inbound_id ON clients (inbound_id);
+CREATE INDEX IF NOT EXISTS clients_id ON clients (id);
+CREATE INDEX IF NOT EXISTS clients_sub_id ON clients (sub_id);
+CREATE INDEX IF NOT EXISTS clients_expiry_time ON clients (expiry_time);
+CREATE TABLE IF NOT EXISTS traffic (
+    email TEXT PRIMARY KEY, inbound_id INTEGER NOT NULL, up INTEGER, down INTEGER, total INTEGER, last_online INTEGER
+);
+'''
+
+_COLUMNS = {
+    'inbounds': ('id', 'remark', 'protocol', 'port', 'listen', 'tag', 'enable', 'expiry_time', 'up', 'down', 'total'),
+    'clients': ('email', 'inbound_id', 'id', 'sub_id', 'enable', 'flow', 'limit_ip', 'total_gb', 'expiry_time', 'tg_id',
+                'comment'),
+    'traffic': ('email', 'inbound_id', 'up', 'down', 'total', 'last_online'),
+}
+
+_CLIENT_QUERY = ('SELECT c.inbound_id, c.email, c.id, c.sub_id, c.enable, c.flow, c.limit_ip, c.total_gb, '
+                 'c.expiry_time, c.tg_id, c.comment, IFNULL(t.up, 0), IFNULL(t.down, 0), IFNULL(t.last_online, 0) '
+                 'FROM clients c LEFT JOIN traffic t ON t.email = c.email')
+
+
+def _column(value: Any) -> Any:
+    """Return a free-form client field as a value SQLite can store, lists and objects as their JSON text"""
+    return codec.dumps(value) if isinstance(value, (list, dict)) else value
+
+
+def _fingerprint(row: tuple) -> int:
+    """Hash of a row from its JSON form, unlike hash(row) it also works for unhashable values"""
+    return hash(codec.dumps(row))
+
+
+@dataclass(slots=True)
+class MirroredInbound:
+    """Inbound row of the mirror"""
+    id: int
+    remark: str
+    protocol: str
+    port: int
+    listen: str
+    tag: str
+    enable: bool
+    expiry_time: int
+    up: int
+    down: int
+    total: int
+
+
+@dataclass(slots=True)
+class MirroredClient:
+    """Client row of the mirror with the traffic of the client, 0 when the panel sent no statistics for it"""
+    inbound_id: int
+    email: str
+    id: str
+    sub_id: str
+    enable: bool
+    flow: str
+    limit_ip: int
+    total_gb: int
+    expiry_time: int
+    tg_id: Any
+    comment: str
+    up: int
+    down: int
+    last_online: int
+
+
+@dataclass(slots=True)
+class SyncResult:
+    """Rows written by a sync, over all tables"""
+    inserted: int
+    updated: int
+    deleted: int
+    unchanged: int
+    seconds: float
+
+    @property
+    def changed(self) -> int:
+        return self.inserted + self.updated + self.deleted
+
+
+class PanelMirror:
+    """
+    Local SQLite copy of the inbounds, clients and traffic statistics of a panel.
+
+    sync() and sync_async() read the inbound list with one streamed request and write only the rows that
+    differ from the mirror, in one transaction: a failed sync leaves the mirror as it was.
+    Rows are compared by hashes kept in memory, so the database file must not be written by anything else.
+    Queries are answered from the indexed tables without contacting the panel,
+    they see the panel as of the last sync.
+    """
+    def __init__(self, path: str = ':memory:'):
+        """
+        :param path: str : SQLite database file, created if missing. The mirror is kept in memory by default.
+        """
+        self.path = path
+        self.last_sync: Optional[SyncResult] = None
+        self.__lock = threading.Lock()
+        self.__hashes: Optional[dict[str, dict]] = None  # hashes of the rows per table and key, read on the first sync
+        self.__db = sqlite3.connect(path, check_same_thread=False)
+        self.__db.executescript(_SCHEMA)
+
+    def load(self, inbounds: Iterable[dict]) -> SyncResult:
+        """
+        Bring the mirror up to date with an inbound list.
+
+        :param inbounds: Iterable[dict] : All inbounds of the panel in the panel format, e.g. the obj of get_inbounds().
+        :return: SyncResult
+        """
+        started = time.perf_counter()
+        rows = {table: {} for table in _COLUMNS}
+        for inbound in inbounds:
+            self.__collect(inbound, rows)
+
+        counts = [0, 0, 0, 0]
+        with self.__lock:
+            known, hashes = self.__known(), {}
+            with self.__db:
+                for table, table_rows in rows.items():
+                    hashes[table], table_counts = self.__apply(table, table_rows, known[table])
+                    for i, count in enumerate(table_counts):
+                        counts[i] += count
+            self.__hashes = hashes
+
+        self.last_sync = SyncResult(*counts, time.perf_counter() - started)
+        return self.last_sync
+
+    def sync(self, client) -> SyncResult:
+        """
+        Bring the mirror up to date with the panel.
+
+        :param client: Client3XUI : Client of the panel.
+        :return: SyncResult
+        :raise ClientError: If the request fails, the mirror is not changed.
+        """
+        return self.load(client.iter_inbounds())
+
+    async def sync_async(self, client) -> SyncResult:
+        """
+        Bring the mirror up to date with the panel.
+
+        :param client: AsyncClient3XUI : Client of the panel.
+        :return: SyncResult
+        :raise ClientError: If the request fails, the mirror is not changed.
+        """
+        return self.load([inbound async for inbound in client.iter_inbounds()])
+
+    @staticmethod
+    def __collect(inbound: dict, rows: dict[str, dict]) -> None:
+        # read from the panel JSON directly, building models of 100k clients would cost more than the whole sync
+        get = inbound.get
+        inbound_id = inbound['id']
+        rows['inbounds'][inbound_id] = (inbound_id, get('remark', ''), get('protocol', ''), get('port', 0),
+                                        get('listen', ''), get('tag', ''), int(get('enable', True)),
+                                        get('expiryTime', 0), get('up', 0), get('down', 0), get('total', 0))
+        settings = get('settings')
+        clients = rows['clients']
+        for client in (codec.loads(settings).get('clients') or ()) if settings else ():
+            get = client.get
+            email = get('email', '')
+            clients[email] = (email, inbound_id, get('id') or get('password', ''), get('subId', ''),
+                              int(get('enable', True)), get('flow', ''), get('limitIp', 0), get('totalGB', 0),
+                              get('expiryTime', 0), _column(get('tgId', '')), _column(get('comment', '')))
+        traffic = rows['traffic']
+        for stat in inbound.get('clientStats') or ():
+            get = stat.get
+            email = get('email', '')
+            traffic[email] = (email, inbound_id, get('up', 0), get('down', 0), get('total', 0), get('lastOnline', 0))
+
+    def __apply(self, table: str, rows: dict, known: dict) -> tuple[dict, tuple[int, int, int, int]]:
+        columns = _COLUMNS[table]
+        hashes = {}
+        changed = []
+        for row_key, row in rows.items():
+            hashes[row_key] = row_hash = _fingerprint(row)
+            if known.get(row_key) != row_hash:
+                changed.append(row)
+        deleted = [(row_key,) for row_key in known.keys() - rows.keys()]
+
+        if changed:
+            self.__db.executemany(f'INSERT OR REPLACE INTO {table} ({", ".join(columns)}) '
+                                  f'VALUES ({", ".join("?" * len(columns))})', changed)
+        if deleted:
+            self.__db.executemany(f'DELETE FROM {table} WHERE {columns[0]} = ?', deleted)
+
+        inserted = sum(1 for row in changed if row[0] not in known)
+        return hashes, (inserted, len(changed) - inserted, len(deleted), len(rows) - len(changed))
+
+    def __known(self) -> dict[str, dict]:
+        if self.__hashes is None:
+            self.__hashes = {table: {row[0]: _fingerprint(row) for row in self.__db.execute(
+                f'SELECT {", ".join(columns)} FROM {table}')} for table, columns in _COLUMNS.items()}
+        return self.__hashes
+
+    def __clients(self, where: str = '', params: tuple = ()) -> list[MirroredClient]:
+        with self.__lock:
+            rows = self.__db.execute(f'{_CLIENT_QUERY} {where}', params).fetchall()
+        return [MirroredClient(row[0], row[1], row[2], row[3], bool(row[4]), *row[5:]) for row in rows]
+
+    def client(self, email: str) -> Optional[MirroredClient]:
+        """Return the client with the email, None if it is not in the mirror"""
+        clients = self.__clients('WHERE c.email = ?', (email,))
+        return clients[0] if clients else None
+
+    def client_by_id(self, client_id: str) -> Optional[MirroredClient]:
+        """Return the client with the id (the password of trojan clients), None if it is not in the mirror"""
+        clients = self.__clients('WHERE c.id = ?', (client_id,))
+        return clients[0] if clients else None
+
+    def clients_by_sub_id(self, sub_id: str) -> list[MirroredClient]:
+        """Return the clients of the subscription"""
+        return self.__clients('WHERE c.sub_id = ? ORDER BY c.email', (sub_id,))
+
+    def clients_in_inbound(self, inbound_id: int) -> list[MirroredClient]:
+        """Return the clients of the inbound"""
+        return self.__clients('WHERE c.inbound_id = ? ORDER BY c.email', (inbound_id,))
+
+    def clients_expiring(self, start: int, end: int) -> list[MirroredClient]:
+        """
+        Return the clients expiring in a time range, soonest first.
+
+        Clients that never expire (expiry time 0) or whose time starts on first use (negative expiry time) are not returned.
+
+        :param start: int : Start of the range, Unix time in milliseconds like expiryTime of the panel.
+        :param end: int : End of the range, included.
+        """
+        return self.__clients('WHERE c.expiry_time BETWEEN ? AND ? AND c.expiry_time > 0 '
+                              'ORDER BY c.expiry_time, c.email', (start, end))
+
+    def inbound(self, inbound_id: int) -> Optional[MirroredInbound]:
+        """Return the inbound, None if it is not in the mirror"""
+        inbounds = self.__inbounds('WHERE id = ?', (inbound_id,))
+        return inbounds[0] if inbounds else None
+
+    def inbounds(self) -> list[MirroredInbound]:
+        """Return all inbounds"""
+        return self.__inbounds('ORDER BY id')
+
+    def __inbounds(self, where: str, params: tuple = ()) -> list[MirroredInbound]:
+        with self.__lock:
+            rows = self.__db.execute(f'SELECT {", ".join(_COLUMNS["inbounds"])} FROM inbounds {where}', params).fetchall()
+        return [MirroredInbound(*row[:6], bool(row[6]), *row[7:]) for row in rows]
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self):
+        return f'PanelMirror(path={self.path!r}, last_sync={self.last_sync!r})'
@@ -0,0 +1,188 @@
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from client3x.client3x import codec
+
+
+@dataclass(slots=True)
+class InboundClient:
+    """
+    Client of an inbound, one entry of settings["clients"].
+
+    Keys of the panel JSON that have no field are kept in `extra`, so they survive a from_json() / to_json() round trip.
+    """
+    id: str = ''
+    email: str = ''
+    enable: bool = True
+    flow: str = ''
+    limit_ip: int = 0
+    total_gb: int = 0
+    expiry_time: int = 0
+    tg_id: Any = ''
+    sub_id: str = ''
+    reset: int = 0
+    comment: str = ''
+    password: str = ''
+    extra: Optional[dict] = None
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'InboundClient':
+        """
+        Build a client from its panel JSON.
+
+        :param data: dict : The client as returned by the panel.
+        :return: InboundClient
+        """
+        get = data.get
+        extra = {key: data[key] for key in data.keys() - _CLIENT_KEYS} or None
+        return cls(get('id', ''), get('email', ''), get('enable', True), get('flow', ''), get('limitIp', 0),
+                   get('totalGB', 0), get('expiryTime', 0), get('tgId', ''), get('subId', ''), get('reset', 0),
+                   get('comment', ''), get('password', ''), extra)
+
+    def to_json(self) -> dict:
+        """Return the client in the panel format"""
+        data = {'id': self.id, 'email': self.email, 'enable': self.enable, 'flow': self.flow,
+                'limitIp': self.limit_ip, 'totalGB': self.total_gb, 'expiryTime': self.expiry_time,
+                'tgId': self.tg_id, 'subId': self.sub_id, 'reset': self.reset, 'comment': self.comment}
+        if self.password:
+            data['password'] = self.password
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+@dataclass(slots=True)
+class ClientTraffic:
+    """
+    Traffic statistics of a client, one entry of clientStats or the obj of get_client_traffic().
+    """
+    id: int = 0
+    inbound_id: int = 0
+    enable: bool = True
+    email: str = ''
+    up: int = 0
+    down: int = 0
+    expiry_time: int = 0
+    total: int = 0
+    reset: int = 0
+    last_online: int = 0
+    extra: Optional[dict] = None
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'ClientTraffic':
+        """
+        Build traffic statistics from their panel JSON.
+
+        :param data: dict : The statistics as returned by the panel.
+        :return: ClientTraffic
+        """
+        get = data.get
+        extra = {key: data[key] for key in data.keys() - _TRAFFIC_KEYS} or None
+        return cls(get('id', 0), get('inboundId', 0), get('enable', True), get('email', ''), get('up', 0),
+                   get('down', 0), get('expiryTime', 0), get('total', 0), get('reset', 0), get('lastOnline', 0),
+                   extra)
+
+    def to_json(self) -> dict:
+        """Return the statistics in the panel format"""
+        data = {'id': self.id, 'inboundId': self.inbound_id, 'enable': self.enable, 'email': self.email,
+                'up': self.up, 'down': self.down, 'expiryTime': self.expiry_time, 'total': self.total,
+                'reset': self.reset, 'lastOnline': self.last_online}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+def _lazy_json(raw: str, cache: str, doc: str) -> property:
+    """Property decoding the JSON string field `raw` on first access and keeping the result in the slot `cache`"""
+    def decoded(self):
+        value = getattr(self, cache)
+        if value is None:
+            text = getattr(self, raw)
+            value = codec.loads(text) if text else {}
+            setattr(self, cache, value)
+        return value
+
+    return property(decoded, doc=doc)
+
+
+@dataclass(slots=True)
+class Inbound:
+    """
+    Inbound as returned by get_inbounds() and get_inbound().
+
+    The panel sends settings, streamSettings, sniffing and allocate as JSON strings. They are kept as the raw_* strings
+    and decoded only when the settings, stream_settings, sniffing or allocate property is first read,
+    so inbounds whose nested fields are never read do not pay for decoding them.
+    to_json() encodes the decoded fields again, so changes made to them are sent to the panel.
+    """
+    id: int = 0
+    up: int = 0
+    down: int = 0
+    total: int = 0
+    remark: str = ''
+    enable: bool = True
+    expiry_time: int = 0
+    listen: str = ''
+    port: int = 0
+    protocol: str = ''
+    tag: str = ''
+    raw_settings: str = ''
+    raw_stream_settings: str = ''
+    raw_sniffing: str = ''
+    raw_allocate: str = ''
+    client_stats: Optional[list[ClientTraffic]] = None
+    extra: Optional[dict] = None
+    _settings: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+    _stream_settings: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+    _sniffing: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+    _allocate: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+
+    settings = _lazy_json('raw_settings', '_settings', 'Decoded settings: clients, decryption, fallbacks')
+    stream_settings = _lazy_json('raw_stream_settings', '_stream_settings', 'Decoded streamSettings')
+    sniffing = _lazy_json('raw_sniffing', '_sniffing', 'Decoded sniffing settings')
+    allocate = _lazy_json('raw_allocate', '_allocate', 'Decoded allocate settings')
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'Inbound':
+        """
+        Build an inbound from its panel JSON.
+
+        :param data: dict : The inbound as returned by the panel.
+        :return: Inbound
+        """
+        get = data.get
+        stats = get('clientStats')
+        extra = {key: data[key] for key in data.keys() - _INBOUND_KEYS} or None
+        return cls(get('id', 0), get('up', 0), get('down', 0), get('total', 0), get('remark', ''), get('enable', True),
+                   get('expiryTime', 0), get('listen', ''), get('port', 0), get('protocol', ''), get('tag', ''),
+                   get('settings', ''), get('streamSettings', ''), get('sniffing', ''), get('allocate', ''),
+                   [ClientTraffic.from_json(stat) for stat in stats] if stats is not None else None, extra)
+
+    def clients(self) -> list[InboundClient]:
+        """Build the clients of the inbound from its settings"""
+        return [InboundClient.from_json(client) for client in self.settings.get('clients', ())]
+
+    def __encoded(self, raw: str, decoded: Optional[dict]) -> str:
+        return raw if decoded is None else codec.dumps(decoded)
+
+    def to_json(self) -> dict:
+        """Return the inbound in the panel format"""
+        data = {'id': self.id, 'up': self.up, 'down': self.down, 'total': self.total, 'remark': self.remark,
+                'enable': self.enable, 'expiryTime': self.expiry_time, 'listen': self.listen, 'port': self.port,
+                'protocol': self.protocol, 'tag': self.tag,
+                'settings': self.__encoded(self.raw_settings, self._settings),
+                'streamSettings': self.__encoded(self.raw_stream_settings, self._stream_settings),
+                'sniffing': self.__encoded(self.raw_sniffing, self._sniffing),
+                'allocate': self.__encoded(self.raw_allocate, self._allocate),
+                'clientStats': [stat.to_json() for stat in self.client_stats] if self.client_stats is not None else None}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+_CLIENT_KEYS = frozenset(('id', 'email', 'enable', 'flow', 'limitIp', 'totalGB', 'expiryTime', 'tgId', 'subId',
+                          'reset', 'comment', 'password'))
+_TRAFFIC_KEYS = frozenset(('id', 'inboundId', 'enable', 'email', 'up', 'down', 'expiryTime', 'total', 'reset',
+                           'lastOnline'))
+_INBOUND_KEYS = frozenset(('id', 'up', 'down', 'total', 'remark', 'enable', 'expiryTime', 'listen', 'port',
+                           'protocol', 'tag', 'settings', 'streamSettings', 'sniffing', 'allocate', 'clientStats'))
@@ -1,24 +1,75 @@
-import json
 import pprint
 
+from client3x.client3x import codec
+
+
+def snapshot(value):
+    """Copy the dicts and lists of a value, the other values are shared, to detect later changes in place"""
+    if isinstance(value, dict):
+        return {key: snapshot(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [snapshot(item) for item in value]
+    return value
+
 
 class Payload:
 
-    def __init__(self, data: dict):
-        self.data = data
+    def __init__(self, data: dict, cache_format: bool = False):
+        """
+        :param data: dict : The payload data, nested dicts are sent as JSON strings.
+        :param cache_format: bool : Keep the result of format() while data is unchanged.
+        """
+        self.__data = data
+        self.cache_format = cache_format
+        self._formatted = None
+        self._snapshot = None
+
+    @property
+    def data(self) -> dict:
+        return self.__data
+
+    @data.setter
+    def data(self, data: dict):
+        self.__data = data
+        self.invalidate()
 
+    def invalidate(self) -> None:
+        """Drop the cached result of format()"""
+        self._formatted = None
+        self._snapshot = None
 
     def format(self):
+        """
+        Return the data in the form it is sent, nested dicts serialized to JSON.
+
+        A cached result is returned only while data equals the copy taken when it was cached,
+        so changes of data in place are sent as well.
+        """
+        if self._formatted is not None:
+            if self._snapshot == self.__data:
+                return self._formatted
+            self._formatted = None
+
+        formatted = self._format()
+        if self.cache_format:
+            self._formatted = formatted
+            self._snapshot = self._take_snapshot()
+        return formatted
+
+    def _format(self) -> dict:
         formatted : dict = {}
         for key, value in self.data.items():
             if isinstance(value, dict):
-                formatted[key] = json.dumps(value)
+                formatted[key] = codec.dumps(value)
             else:
                 formatted[key] = value
         return formatted
 
+    def _take_snapshot(self) -> dict:
+        return snapshot(self.__data)
+
     def __str__(self):
         return f'Payload\ndata = {pprint.pformat(self.data)}'
 
     def __repr__(self):
-        return f'Payload(data = {pprint.pformat(self.data)} )'
\ No newline at end of file
+        return f'Payload(data = {pprint.pformat(self.data)} )'
@@ -0,0 +1,100 @@
+import bisect
+import hashlib
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class PlacementTarget:
+    """Inbound of a panel that clients are placed on"""
+    panel: str
+    inbound_id: int
+
+    def __str__(self):
+        return f'{self.panel}/{self.inbound_id}'
+
+
+def _hash(value: str) -> int:
+    # stable across processes and Python versions, unlike hash()
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+
+
+class Placement:
+    """
+    Maps client keys (email, telegram id) to panel inbounds by weighted consistent hashing.
+
+    Every inbound owns `replicas * weight` points of a hash ring, a key belongs to the inbound of the first point
+    at or after its hash. Adding an inbound moves only the keys it takes over, removing one moves only its own keys,
+    spread over the remaining inbounds in proportion to their weights.
+    The same targets, weights and key always give the same inbound, in any process,
+    so locate() also finds where a client was placed, as long as the targets did not change since.
+    """
+    def __init__(self, replicas: int = 256):
+        """
+        :param replicas: int : Points of an inbound of weight 1, more points spread the keys more evenly.
+        """
+        if replicas < 1:
+            raise ValueError(f'Replicas must be at least 1, got {replicas}')
+        self.replicas = replicas
+        self.__weights: dict[PlacementTarget, float] = {}
+        self.__points: list[int] = []
+        self.__owners: list[PlacementTarget] = []
+
+    def add(self, panel: str, inbound_id: int, weight: float = 1.0) -> PlacementTarget:
+        """
+        Add an inbound, or change its weight.
+
+        :param panel: str : Name of the panel, e.g. its name in AsyncFleetClient.
+        :param inbound_id: int : Id of the inbound on the panel.
+        :param weight: float : Share of the keys relative to the other inbounds.
+        :return: PlacementTarget
+        """
+        if weight <= 0:
+            raise ValueError(f'Weight must be positive, got {weight}')
+        target = PlacementTarget(panel, inbound_id)
+        self.__weights[target] = weight
+        self.__build()
+        return target
+
+    def remove(self, panel: str, inbound_id: int) -> None:
+        """Remove an inbound, its keys move to the other inbounds"""
+        del self.__weights[PlacementTarget(panel, inbound_id)]
+        self.__build()
+
+    def remove_panel(self, panel: str) -> None:
+        """Remove all inbounds of a panel"""
+        for target in [target for target in self.__weights if target.panel == panel]:
+            del self.__weights[target]
+        self.__build()
+
+    def __build(self) -> None:
+        points = []
+        for target, weight in self.__weights.items():
+            name = str(target)
+            points.extend((_hash(f'{name}#{i}'), name, target) for i in range(max(1, round(self.replicas * weight))))
+        points.sort(key=lambda point: point[:2])  # the name breaks ties, so the ring does not depend on insertion order
+        self.__points = [point[0] for point in points]
+        self.__owners = [point[2] for point in points]
+
+    def locate(self, key: str | int) -> PlacementTarget:
+        """
+        Return the inbound of a client.
+
+        :param key: str | int : Email or telegram id of the client.
+        :return: PlacementTarget
+        :raise LookupError: If no inbound was added.
+        """
+        if not self.__points:
+            raise LookupError('No inbounds to place clients on')
+        index = bisect.bisect_left(self.__points, _hash(str(key)))
+        return self.__owners[index if index < len(self.__points) else 0]
+
+    @property
+    def targets(self) -> dict[PlacementTarget, float]:
+        """Inbounds and their weights"""
+        return dict(self.__weights)
+
+    def __len__(self):
+        return len(self.__weights)
+
+    def __repr__(self):
+        return f'Placement(targets={len(self)}, replicas={self.replicas})'
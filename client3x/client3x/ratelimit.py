@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+import weakref
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Token bucket that smooths bursts instead of rejecting them.
+
+    A caller that finds the bucket empty takes a token on credit and waits until that token is refilled,
+    so callers are served in arrival order at `rate` requests per second after the first `burst` ones.
+    """
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        """
+        :param rate: float : Tokens added per second.
+        :param burst: int : Bucket capacity, the number of requests that may go out at once.
+        :param clock: Callable : Monotonic time source, seconds.
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError(f'Rate must be positive and burst at least 1, got rate={rate}, burst={burst}')
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.waiting = 0
+        self.acquired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.__tokens = float(burst)
+        self.__updated = clock()
+        self.__lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return the seconds the caller has to wait before using it"""
+        with self.__lock:
+            now = self.clock()
+            self.__tokens = min(self.burst, self.__tokens + (now - self.__updated) * self.rate) - 1
+            self.__updated = now
+
+            wait = -self.__tokens / self.rate if self.__tokens < 0 else 0.0
+            self.acquired += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            return wait
+
+    def acquire(self) -> float:
+        """Wait for a token, blocking the calling thread. Returns the waited seconds"""
+        wait = self.reserve()
+        if wait > 0:
+            self.__queue(1)
+            try:
+                time.sleep(wait)
+            finally:
+                self.__queue(-1)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """Wait for a token without blocking the event loop. Returns the waited seconds"""
+        wait = self.reserve()
+        if wait > 0:
+            self.__queue(1)
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self.__queue(-1)
+        return wait
+
+    def __queue(self, delta: int) -> None:
+        with self.__lock:
+            self.waiting += delta
+
+    def stats(self) -> dict:
+        """Return queue depth and wait time statistics"""
+        with self.__lock:
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'queue_depth': self.waiting,
+                'acquired': self.acquired,
+                'total_wait': self.total_wait,
+                'max_wait': self.max_wait,
+                'avg_wait': self.total_wait / self.acquired if self.acquired else 0.0,
+            }
+
+    def __repr__(self):
+        return f'TokenBucket(rate={self.rate}, burst={self.burst}, queue_depth={self.waiting})'
+
+
+class RateLimiter:
+    """
+    Client-side rate limiter of one panel with separate buckets for reads and writes.
+
+    Clients pass a RateLimiter with the `rate_limiter` parameter and use RateLimiter.shared(), so all clients
+    of the same base_url end up sharing the limiter that was registered first for it.
+    """
+    __registry: 'weakref.WeakValueDictionary[str, RateLimiter]' = weakref.WeakValueDictionary()
+    __registry_lock = threading.Lock()
+
+    READ = 'read'
+    WRITE = 'write'
+
+    def __init__(self, reads_per_second: float = 20, read_burst: int = 40,
+                 writes_per_second: float = 5, write_burst: int = 10,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param reads_per_second: float : Sustained rate of read requests (GET, onlines, clientIps).
+        :param read_burst: int : Read requests allowed at once.
+        :param writes_per_second: float : Sustained rate of write requests.
+        :param write_burst: int : Write requests allowed at once.
+        :param clock: Callable : Monotonic time source, seconds.
+        """
+        self.buckets = {
+            self.READ: TokenBucket(reads_per_second, read_burst, clock),
+            self.WRITE: TokenBucket(writes_per_second, write_burst, clock),
+        }
+
+    @classmethod
+    def shared(cls, base_url: str, limiter: 'RateLimiter') -> 'RateLimiter':
+        """
+        Return the limiter registered for the panel, registering `limiter` if there is none yet.
+
+        :param base_url: str : The base URL of the panel.
+        :param limiter: RateLimiter : The limiter to register.
+        :return: RateLimiter : The limiter shared by all clients of the panel.
+        """
+        with cls.__registry_lock:
+            registered = cls.__registry.get(base_url)
+            if registered is None:
+                cls.__registry[base_url] = registered = limiter
+            return registered
+
+    def acquire(self, kind: str) -> float:
+        return self.buckets[kind].acquire()
+
+    async def acquire_async(self, kind: str) -> float:
+        return await self.buckets[kind].acquire_async()
+
+    def stats(self) -> dict:
+        """Return the statistics of the read and write buckets"""
+        return {kind: bucket.stats() for kind, bucket in self.buckets.items()}
+
+    def __repr__(self):
+        return f'RateLimiter(reads={self.buckets[self.READ]!r}, writes={self.buckets[self.WRITE]!r})'
@@ -0,0 +1,114 @@
+import pprint
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from client3x.client3x.ClientPayload import CLientPayload, client_identity
+from client3x.client3x.PanelResponse import BulkAddResult
+from client3x.client3x.batch import BatchResult
+
+
+@dataclass(slots=True)
+class ReconcilePlan:
+    """
+    Writes that turn the clients of an inbound into the desired ones.
+
+    `update` holds (client_id, client) pairs: the id the panel knows the client by and its new settings,
+    `delete` the ids of the clients to delete. `skipped` counts the current clients without the key, they are left alone.
+    """
+    inbound_id: int
+    add: list[dict] = field(default_factory=list)
+    update: list[tuple[str, dict]] = field(default_factory=list)
+    delete: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    skipped: int = 0
+
+    @property
+    def changes(self) -> int:
+        return len(self.add) + len(self.update) + len(self.delete)
+
+    def __repr__(self):
+        return (f'ReconcilePlan(inbound_id={self.inbound_id}, add={len(self.add)}, update={len(self.update)}, '
+                f'delete={len(self.delete)}, unchanged={self.unchanged}, skipped={self.skipped})')
+
+
+class ReconcileResult:
+    """
+    Class for representing the outcome of reconcile_clients().
+
+    The lists of the plan that were executed have their results, None if the plan had nothing to do or was not executed.
+    """
+    def __init__(self, plan: ReconcilePlan, added: Optional[BulkAddResult] = None,
+                 updated: Optional[list[BatchResult]] = None, deleted: Optional[list[BatchResult]] = None):
+        self.plan = plan
+        self.added = added
+        self.updated = updated
+        self.deleted = deleted
+
+    @property
+    def success(self) -> bool:
+        return ((self.added is None or self.added.success)
+                and all(result.ok for result in self.updated or ())
+                and all(result.ok for result in self.deleted or ()))
+
+    def __repr__(self):
+        failed_updates = sum(1 for result in self.updated or () if not result.ok)
+        failed_deletes = sum(1 for result in self.deleted or () if not result.ok)
+        return ('ReconcileResult object (\n'
+                f'success : {self.success}\n'
+                f'plan : {self.plan!r}\n'
+                f'failed chunks : {pprint.pformat(self.added.failed_chunks if self.added else [])}\n'
+                f'failed updates : {failed_updates}\n'
+                f'failed deletes : {failed_deletes}\n)')
+
+
+def desired_clients(desired: Iterable[dict | CLientPayload]) -> list[dict]:
+    """Return client settings in the panel format from client dicts and single client payloads"""
+    return [client.data["settings"]["clients"][0] if isinstance(client, CLientPayload) else client for client in desired]
+
+
+def plan_clients(inbound_id: int, current: Iterable[dict], desired: Iterable[dict | CLientPayload],
+                 key: str = 'email', protocol: str = 'vless') -> ReconcilePlan:
+    """
+    Diff the clients of an inbound with the desired ones.
+
+    A current client is changed only when a field given in its desired settings differs, fields the desired settings
+    leave out keep their current value. Current clients without the key can not be matched and are skipped,
+    neither updated nor deleted. Runs in time linear in the number of clients.
+
+    :param inbound_id: int : The inbound of the clients.
+    :param current: Iterable[dict] : Clients of the inbound, e.g. from get_clients_in_inbound().
+    :param desired: Iterable[dict | CLientPayload] : Clients the inbound should have, in the panel format.
+    :param key: str : Field identifying a client on both sides, 'email' or 'id'.
+    :param protocol: str : Protocol of the inbound, decides the id updates and deletes address a client by.
+    :return: ReconcilePlan
+    :raise ValueError: If desired clients lack the key or share one.
+    """
+    plan = ReconcilePlan(inbound_id)
+    remaining = {}
+    for client in current:
+        client_id = client.get(key)
+        if client_id:
+            remaining[client_id] = client
+        else:
+            plan.skipped += 1
+    seen = set()
+
+    for client in desired_clients(desired):
+        client_id = client.get(key)
+        if not client_id:
+            raise ValueError(f'Desired client without {key}: {client!r}')
+        if client_id in seen:
+            raise ValueError(f'Desired clients share the {key} {client_id!r}')
+        seen.add(client_id)
+
+        existing = remaining.pop(client_id, None)
+        if existing is None:
+            plan.add.append(client)
+        elif existing == client or existing.items() >= client.items():
+            plan.unchanged += 1
+        else:
+            plan.update.append((client_identity(existing, protocol), {**existing, **client}))
+
+    plan.delete = [client_identity(client, protocol) for client in remaining.values()]
+    return plan
+
@@ -0,0 +1,146 @@
+import random
+import threading
+import time
+from typing import Callable
+
+from client3x.client3x.errors import CircuitOpenError
+
+
+class RetryPolicy:
+    """
+    Retry policy for panel requests: exponential backoff with full jitter, bounded by attempts and elapsed time.
+
+    Idempotent requests are retried after transport errors and retryable statuses. Non-idempotent requests
+    (adding clients or inbounds) are only retried when they never reached the panel, e.g. on a refused connection.
+    """
+    def __init__(self, max_attempts: int = 3, backoff_base: float = 0.2, backoff_max: float = 5.0,
+                 max_elapsed: float = 30.0, jitter: bool = True,
+                 retry_statuses: tuple[int, ...] = (502, 503, 504), retry_non_idempotent: bool = False):
+        """
+        :param max_attempts: int : The maximum number of attempts, including the first one.
+        :param backoff_base: float : Delay before the first retry, doubled for every next one.
+        :param backoff_max: float : The maximum delay between attempts.
+        :param max_elapsed: float : Seconds after the first attempt when no new attempt is started.
+        :param jitter: bool : Pick a random delay between 0 and the backoff ("full jitter") to spread out retries of many callers.
+        :param retry_statuses: tuple[int] : Response statuses that are retried.
+        :param retry_non_idempotent: bool : Retry non-idempotent requests even if they may have reached the panel.
+        """
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_elapsed = max_elapsed
+        self.jitter = jitter
+        self.retry_statuses = retry_statuses
+        self.retry_non_idempotent = retry_non_idempotent
+
+    def backoff(self, attempt: int) -> float:
+        """Return the delay after the failed attempt number `attempt`, counting from 1"""
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def next_delay(self, attempt: int, elapsed: float, idempotent: bool, sent: bool) -> float | None:
+        """
+        Decide whether a failed attempt is retried.
+
+        :param attempt: int : The number of the failed attempt, counting from 1.
+        :param elapsed: float : Seconds since the first attempt started.
+        :param idempotent: bool : Whether the request can safely be repeated.
+        :param sent: bool : Whether the request may have reached the panel.
+        :return: The delay before the next attempt, None to give up.
+        """
+        if attempt >= self.max_attempts:
+            return None
+        if sent and not idempotent and not self.retry_non_idempotent:
+            return None
+
+        delay = self.backoff(attempt)
+        if elapsed + delay > self.max_elapsed:
+            return None
+        return delay
+
+    def __repr__(self):
+        return (f'RetryPolicy(max_attempts={self.max_attempts}, backoff_base={self.backoff_base}, '
+                f'backoff_max={self.backoff_max}, max_elapsed={self.max_elapsed})')
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of one panel.
+
+    After `failure_threshold` consecutive failures the breaker opens and requests fail fast with
+    CircuitOpenError. After `recovery_timeout` seconds it half-opens and lets `half_open_max_calls`
+    probe requests through: a successful probe closes it, a failed one opens it again.
+    Share one instance between all clients of the same panel.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0, half_open_max_calls: int = 1,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param failure_threshold: int : Consecutive failures that open the breaker.
+        :param recovery_timeout: float : Seconds the breaker stays open before probing the panel.
+        :param half_open_max_calls: int : Probe requests allowed at once while half-open.
+        :param clock: Callable : Monotonic time source, seconds.
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self.failures = 0
+        self.__state = self.CLOSED
+        self.__opened_at = 0.0
+        self.__probes = 0
+        self.__lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self.__lock:
+            if self.__state == self.OPEN and self.clock() - self.__opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self.__state
+
+    def before_call(self) -> None:
+        """
+        Reserve a call to the panel.
+
+        :raise CircuitOpenError: If the breaker is open, or half-open with all probes in flight.
+        """
+        with self.__lock:
+            if self.__state == self.CLOSED:
+                return
+
+            retry_after = self.__opened_at + self.recovery_timeout - self.clock()
+            if self.__state == self.OPEN:
+                if retry_after > 0:
+                    raise CircuitOpenError('Circuit breaker is open, panel is unavailable', retry_after)
+                self.__state = self.HALF_OPEN
+                self.__probes = 0
+
+            if self.__probes >= self.half_open_max_calls:
+                raise CircuitOpenError('Circuit breaker is half-open, waiting for a probe request', max(retry_after, 0))
+            self.__probes += 1
+
+    def release_probe(self) -> None:
+        """Give back a call reserved by before_call() that ended without a result, e.g. a cancelled request"""
+        with self.__lock:
+            if self.__state == self.HALF_OPEN and self.__probes > 0:
+                self.__probes -= 1
+
+    def record_success(self) -> None:
+        with self.__lock:
+            self.failures = 0
+            self.__state = self.CLOSED
+            self.__probes = 0
+
+    def record_failure(self) -> None:
+        with self.__lock:
+            self.failures += 1
+            if self.__state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.__state = self.OPEN
+                self.__opened_at = self.clock()
+                self.__probes = 0
+
+    def __repr__(self):
+        return f'CircuitBreaker(state={self.state}, failures={self.failures})'
@@ -0,0 +1,269 @@
+import asyncio
+import heapq
+import inspect
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+from client3x.client3x import codec
+from client3x.client3x.ClientPayload import CLientPayload, client_identity
+
+
+@dataclass(slots=True)
+class ExpiryEvent:
+    """
+    A client reaching a warning time or its expiry time.
+
+    `kind` is 'warning', with `warn_before` the seconds left, or 'expired'. For expired events `error` holds
+    the exception of the action, if it failed.
+    """
+    kind: str
+    email: str
+    inbound_id: int
+    expiry_time: int
+    client: dict
+    warn_before: Optional[float] = None
+    error: Optional[Exception] = None
+
+
+@dataclass(slots=True)
+class _Tracked:
+    inbound_id: int
+    client: dict
+    expiry_time: int
+    version: int
+    protocol: str
+    pending: bool = False
+    failures: int = 0
+
+
+class ExpiryScheduler:
+    """
+    Runs warnings and an action when clients expire, waking exactly when the next client is due.
+
+    Due times are kept in a min-heap. track() and forget() change single clients in O(log n), entries of changed
+    clients stay in the heap and are skipped when they come up, so the client list is never scanned again.
+    Expiry times are Unix milliseconds like expiryTime of the panel, clients that never expire (0) or whose time
+    starts on first use (negative) are not tracked.
+
+    Actions, all made with the methods of the client:
+    - 'disable': update_client() with enable false.
+    - 'delete': delete_client().
+    - 'renew': update_client() with the expiry time moved by `renew_period`, the client stays tracked.
+      A failed renewal is tried again after `retry_delay` seconds, doubled for every next failure up to an hour.
+    - None: only the hooks run.
+    """
+    ACTIONS = ('disable', 'delete', 'renew', None)
+
+    def __init__(self, client, action: Optional[str] = 'disable', warn_before: Iterable[float] = (),
+                 on_warning: Optional[Callable[[ExpiryEvent], Any]] = None,
+                 on_expired: Optional[Callable[[ExpiryEvent], Any]] = None,
+                 renew_period: float = 30 * 86400, retry_delay: float = 60,
+                 clock: Callable[[], float] = time.time):
+        """
+        :param client: AsyncClient3XUI : Client making the actions.
+        :param action: str | None : 'disable', 'delete', 'renew' or None.
+        :param warn_before: Iterable[float] : Seconds before the expiry time at which on_warning is called, e.g. (86400, 3600).
+        :param on_warning: Callable | None : Called with a warning ExpiryEvent, may be a coroutine function.
+        :param on_expired: Callable | None : Called with the expired ExpiryEvent after the action, may be a coroutine function.
+            An exception raised by a hook is logged and does not stop the scheduler.
+        :param renew_period: float : Seconds added to the expiry time by the 'renew' action.
+        :param retry_delay: float : Seconds before a failed 'renew' action is tried again.
+        :param clock: Callable : Time source, Unix seconds.
+        """
+        if action not in self.ACTIONS:
+            raise ValueError(f'Action must be one of {self.ACTIONS}, got {action!r}')
+        if renew_period <= 0:
+            raise ValueError(f'Renew period must be positive, got {renew_period}')
+        self.client = client
+        self.action = action
+        self.warn_before = sorted(set(warn_before), reverse=True)
+        self.on_warning = on_warning
+        self.on_expired = on_expired
+        self.renew_period = renew_period
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self.fired = 0
+        self.__tracked: dict[str, _Tracked] = {}
+        self.__heap: list[tuple[int, int, str, int, Optional[float]]] = []
+        self.__sequence = itertools.count()
+        self.__versions = itertools.count(1)
+        self.__wake = asyncio.Event()
+
+    def track(self, inbound_id: int, client: dict, protocol: str = 'vless') -> None:
+        """
+        Start tracking a client, or update it after it changed.
+
+        Call it after adding or updating a client, with the settings sent to the panel.
+        Warnings already due for the same expiry time are not repeated.
+
+        :param inbound_id: int : The inbound of the client.
+        :param client: dict : Client settings in the panel format.
+        :param protocol: str : Protocol of the inbound, decides the id the actions address the client by.
+        """
+        email = client['email']
+        expiry_time = client.get('expiryTime', 0)
+        tracked = self.__tracked.get(email)
+        if expiry_time <= 0 or not client.get('enable', True):
+            self.forget(email)
+            return
+        if tracked is not None and tracked.expiry_time == expiry_time:
+            tracked.inbound_id, tracked.client, tracked.protocol = inbound_id, client, protocol
+            if not tracked.pending:
+                # the expiry already ran without rescheduling it, run it again
+                tracked.failures = 0
+                self.__push(expiry_time, email, tracked.version, None)
+                tracked.pending = True
+            return
+
+        version = next(self.__versions)
+        self.__tracked[email] = _Tracked(inbound_id, client, expiry_time, version, protocol, pending=True)
+        now = self.clock() * 1000
+        for seconds in self.warn_before:
+            due = expiry_time - seconds * 1000
+            if due > now:
+                self.__push(due, email, version, seconds)
+        self.__push(expiry_time, email, version, None)
+
+    def track_payload(self, payload: CLientPayload, protocol: str = 'vless') -> None:
+        """Track the client of a payload sent with add_client() or update_client() to an inbound of the protocol"""
+        self.track(payload.data['inbound'], payload.data['settings']['clients'][0], protocol)
+
+    def forget(self, email: str) -> None:
+        """Stop tracking a client, e.g. after deleting it"""
+        self.__tracked.pop(email, None)
+
+    def load(self, inbounds: Iterable[dict]) -> int:
+        """
+        Track the clients of an inbound list.
+
+        :param inbounds: Iterable[dict] : Inbounds in the panel format, e.g. the obj of get_inbounds().
+        :return: int : The number of tracked clients.
+        """
+        for inbound in inbounds:
+            settings = inbound.get('settings')
+            for client in (codec.loads(settings).get('clients') or ()) if settings else ():
+                self.track(inbound['id'], client, inbound.get('protocol', 'vless'))
+        return len(self.__tracked)
+
+    async def load_async(self) -> int:
+        """
+        Track the clients of all inbounds of the panel, read with one streamed request.
+
+        :return: int : The number of tracked clients.
+        """
+        inbounds = self.client.iter_inbounds(fields=('id', 'protocol', 'settings'))
+        return self.load([inbound async for inbound in inbounds])
+
+    def __push(self, due: float, email: str, version: int, warn_before: Optional[float]) -> None:
+        if len(self.__heap) > 2 * (len(self.__tracked) * (len(self.warn_before) + 1) + 64):
+            # mostly entries of changed clients, drop them so the heap does not grow with every change
+            self.__heap = [item for item in self.__heap if self.__live(item)]
+            heapq.heapify(self.__heap)
+        item = (due, next(self.__sequence), email, version, warn_before)
+        heapq.heappush(self.__heap, item)
+        if self.__heap[0] is item:
+            self.__wake.set()
+
+    def __live(self, item: tuple) -> bool:
+        tracked = self.__tracked.get(item[2])
+        return tracked is not None and tracked.version == item[3]
+
+    def __head(self) -> Optional[tuple]:
+        """Return the next live heap entry, dropping the entries of forgotten or changed clients"""
+        heap = self.__heap
+        while heap and not self.__live(heap[0]):
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def next_due(self) -> Optional[float]:
+        """Unix milliseconds of the next warning or expiry, None if no client is tracked"""
+        head = self.__head()
+        return head[0] if head is not None else None
+
+    async def run_due(self) -> list[ExpiryEvent]:
+        """
+        Run the warnings and actions that are due.
+
+        :return: list[ExpiryEvent] : The events that ran.
+        """
+        events = []
+        now = self.clock() * 1000
+        while (head := self.__head()) is not None and head[0] <= now:
+            heapq.heappop(self.__heap)
+            _, _, email, _, warn_before = head
+            tracked = self.__tracked[email]
+            if warn_before is not None:
+                event = ExpiryEvent('warning', email, tracked.inbound_id, tracked.expiry_time, tracked.client, warn_before)
+                await self.__call(self.on_warning, event)
+            else:
+                tracked.pending = False
+                event = ExpiryEvent('expired', email, tracked.inbound_id, tracked.expiry_time, tracked.client)
+                await self.__expire(tracked, event)
+                await self.__call(self.on_expired, event)
+            self.fired += 1
+            events.append(event)
+        return events
+
+    async def __expire(self, tracked: _Tracked, event: ExpiryEvent) -> None:
+        email = event.email
+        client_id = client_identity(tracked.client, tracked.protocol)
+        if self.action != 'renew':
+            self.forget(email)
+        try:
+            if self.action == 'delete':
+                await self.client.delete_client(client_id, tracked.inbound_id)
+            elif self.action == 'disable':
+                client = {**tracked.client, 'enable': False}
+                await self.client.update_client(client_id, CLientPayload.from_client(tracked.inbound_id, client))
+            elif self.action == 'renew':
+                client = {**tracked.client, 'expiryTime': tracked.expiry_time + int(self.renew_period * 1000)}
+                await self.client.update_client(client_id, CLientPayload.from_client(tracked.inbound_id, client))
+                self.track(tracked.inbound_id, client, tracked.protocol)
+        except Exception as e:
+            event.error = e
+            logger = getattr(self.client, 'logger', None)
+            if logger:
+                logger.error(f'Expiry action {self.action} failed for {email}: {repr(e)}')
+            if self.action == 'renew' and self.__tracked.get(email) is tracked:
+                tracked.failures += 1
+                delay = min(self.retry_delay * 2 ** (tracked.failures - 1), max(self.retry_delay, 3600))
+                self.__push(self.clock() * 1000 + delay * 1000, email, tracked.version, None)
+                tracked.pending = True
+
+    async def __call(self, hook: Optional[Callable[[ExpiryEvent], Any]], event: ExpiryEvent) -> None:
+        if hook is None:
+            return
+        try:
+            result = hook(event)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger = getattr(self.client, 'logger', None)
+            if logger:
+                logger.error(f'Expiry hook {hook!r} failed on {event.kind} of {event.email}: {repr(e)}')
+
+    async def run(self) -> None:
+        """
+        Run forever, sleeping until the next client is due.
+
+        Clients tracked while it sleeps wake it up when they are due earlier. Cancel the task to stop it.
+        """
+        while True:
+            self.__wake.clear()
+            await self.run_due()
+            due = self.next_due()
+            timeout = None if due is None else max(0.0, due / 1000 - self.clock())
+            try:
+                await asyncio.wait_for(self.__wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    @property
+    def tracked(self) -> int:
+        """Number of tracked clients"""
+        return len(self.__tracked)
+
+    def __repr__(self):
+        return f'ExpiryScheduler(action={self.action!r}, tracked={self.tracked}, next_due={self.next_due()})'
@@ -0,0 +1,49 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one.
+
+    The first caller of a key starts the call, callers that arrive while it is in flight wait for the same result
+    (or exception) instead of starting their own. The key is forgotten as soon as the call finishes,
+    so nothing is cached beyond the lifetime of the call.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.__calls: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable]):
+        """
+        Run `call` for `key`, or join the call already running for it.
+
+        A caller that is cancelled stops waiting, the shared call keeps running for the others.
+
+        :param key: Hashable : Identity of the call, e.g. method and URL.
+        :param call: Callable : Coroutine function making the call.
+        :return: The result of the shared call.
+        """
+        future = self.__calls.get(key)
+        if future is None:
+            self.misses += 1
+            future = asyncio.ensure_future(call())
+            self.__calls[key] = future
+            future.add_done_callback(lambda done: self.__forget(key, done))
+        else:
+            self.hits += 1
+        return await asyncio.shield(future)
+
+    def __forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self.__calls.get(key) is future:
+            del self.__calls[key]
+        if not future.cancelled():
+            future.exception()  # retrieved here, so a call all callers stopped waiting for is not reported as unhandled
+
+    @property
+    def in_flight(self) -> int:
+        return len(self.__calls)
+
+    def __repr__(self):
+        return f'SingleFlight(in_flight={self.in_flight}, hits={self.hits}, misses={self.misses})'
@@ -0,0 +1,210 @@
+import re
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+from client3x.client3x import codec
+from client3x.client3x.errors import ClientError
+
+
+# Short strings are matched by the patterns below, long ones (like the settings of an inbound) fail to match
+# and are skipped by _string_end(), which runs at the speed of a plain substring search
+_STRING = rb'"[^"\\]{0,256}+(?:\\.[^"\\]{0,256}+){0,8}+"'
+_ATOM = rb'[^"\[\]{}]++|' + _STRING
+_NESTED_1 = rb'\{(?:' + _ATOM + rb')*+\}|\[(?:' + _ATOM + rb')*+\]'
+_NESTED_2 = rb'\{(?:' + _ATOM + rb'|' + _NESTED_1 + rb')*+\}|\[(?:' + _ATOM + rb'|' + _NESTED_1 + rb')*+\]'
+
+# Runs of scalars and complete strings, matched in one go up to the next bracket
+_FLAT = re.compile(rb'(?:' + _ATOM + rb')*+')
+# The same between the elements of the array, also stopping at commas
+_FLAT_ELEMENTS = re.compile(rb'(?:[^"\[\]{},]++|' + _STRING + rb')*+')
+# Inside an element, complete values nested up to two levels deep are skipped too
+_FLAT_NESTED = re.compile(rb'(?:' + _ATOM + rb'|' + _NESTED_1 + rb'|' + _NESTED_2 + rb')*+')
+_PLAIN_QUOTE = re.compile(rb'"(?<!\\")')
+
+_QUOTE, _BACKSLASH, _COMMA = ord('"'), ord('\\'), ord(',')
+_OPEN = frozenset(b'[{')
+
+
+def _string_end(buffer: bytearray, pos: int) -> int:
+    """
+    Return the index of the quote closing the string that continues at `pos`, -1 if it is not in the buffer.
+
+    `pos` must not be in the middle of an escape sequence.
+    """
+    while True:
+        match = _PLAIN_QUOTE.search(buffer, pos)
+        plain = match.start() if match else -1
+        # a quote after a backslash closes the string only after an even run of backslashes, e.g. "C:\\"
+        after_backslash = buffer.find(b'\\\\"', max(pos - 2, 0), plain + 1 if match else len(buffer))
+        if after_backslash < 0:
+            return plain
+        quote = after_backslash + 2
+        run = 0
+        while quote - run - 1 >= pos and buffer[quote - run - 1] == _BACKSLASH:
+            run += 1
+        if run % 2 == 0:
+            return quote
+        pos = quote + 1
+
+
+def _string_resume(buffer: bytearray, pos: int) -> int:
+    """Return where to continue an unterminated string next time: the end, or before a dangling backslash"""
+    end = len(buffer)
+    run = 0
+    while end - run - 1 >= pos and buffer[end - run - 1] == _BACKSLASH:
+        run += 1
+    return end - run % 2
+
+
+class ArrayStream:
+    """
+    Incremental parser of panel responses that splits the `obj` array into its elements as the body arrives.
+
+    Scalars, strings and shallow nested values are skipped by regular expressions, only the remaining brackets are
+    handled one by one, with the string state kept across chunks. Each element is decoded once, by codec.loads(),
+    when it is complete. Bytes of an element are dropped as soon as it has been returned,
+    memory use is bound by the largest element, not by the size of the response.
+    The rest of the top level object (`success`, `msg`) is kept and decoded by close().
+    """
+    def __init__(self, key: str = 'obj'):
+        """
+        :param key: str : Top level key of the array to split.
+        """
+        self.__key = re.compile(rb'"' + re.escape(key.encode()) + rb'"\s*:\s*$')
+        self.__buffer = bytearray()
+        self.__head = bytearray()
+        self.__pos = 0
+        self.__mark = 0
+        self.__depth = 0
+        self.__in_string = False
+        self.__in_array = False
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        """
+        Add a chunk of the body.
+
+        :param chunk: bytes : Next chunk of the body.
+        :return: list[bytes] : Raw elements of the array completed by the chunk.
+        """
+        buffer = self.__buffer
+        buffer += chunk
+        elements = []
+        pos, mark, depth = self.__pos, self.__mark, self.__depth
+        in_string, in_array = self.__in_string, self.__in_array
+
+        end = len(buffer)
+        while True:
+            if in_string:
+                close = _string_end(buffer, pos)
+                if close < 0:
+                    pos = _string_resume(buffer, pos)  # the string continues in the next chunk
+                    break
+                pos = close + 1
+                in_string = False
+                continue
+
+            if not in_array:
+                pos = _FLAT.match(buffer, pos).end()
+            elif depth == 2:
+                pos = _FLAT_ELEMENTS.match(buffer, pos).end()
+            else:
+                pos = _FLAT_NESTED.match(buffer, pos).end()
+            if pos == end:
+                break
+            char = buffer[pos]
+            pos += 1
+
+            if char == _QUOTE:
+                in_string = True
+            elif char in _OPEN:
+                if depth == 1 and not in_array:
+                    self.__head += buffer[mark:pos - 1]
+                    mark = pos
+                    if self.__key.search(self.__head):
+                        self.__head += b'null'
+                        in_array = True
+                        depth += 1
+                        continue
+                    self.__head += buffer[pos - 1:pos]
+                depth += 1
+            elif char == _COMMA:
+                if in_array and depth == 2:
+                    elements.append(bytes(buffer[mark:pos - 1]))
+                    mark = pos
+            else:
+                depth -= 1
+                if in_array and depth == 1:
+                    element = bytes(buffer[mark:pos - 1])
+                    if element.strip():
+                        elements.append(element)
+                    in_array = False
+                    mark = pos
+
+        if not in_array:
+            self.__head += buffer[mark:pos]
+            mark = pos
+        del buffer[:mark]
+        self.__pos, self.__mark, self.__depth = pos - mark, 0, depth
+        self.__in_string, self.__in_array = in_string, in_array
+        return elements
+
+    def close(self) -> dict:
+        """
+        Finish parsing.
+
+        :return: dict : The top level object of the response, with the array replaced by None.
+        :raise ClientError: If the body ended in the middle of the response.
+        """
+        if self.__depth or self.__in_string or self.__buffer.strip():
+            raise ClientError('Truncated panel response', 0)
+        return codec.loads(self.__head)
+
+
+def project(element: dict, fields: frozenset | None) -> dict:
+    """Keep only the given top level fields of a decoded element"""
+    if fields is None:
+        return element
+    return {field: value for field, value in element.items() if field in fields}
+
+
+def _decode(stream: ArrayStream, chunk: bytes, fields: frozenset | None) -> list[dict]:
+    return [project(codec.loads(element), fields) for element in stream.feed(chunk)]
+
+
+def _check(stream: ArrayStream, status: int) -> None:
+    head = stream.close()
+    if not head.get('success'):
+        raise ClientError(head.get('msg') or head.get('message') or 'Panel request failed', status)
+
+
+def iter_array(chunks: Iterable[bytes], fields: Iterable[str] | None = None, status: int = 200) -> Iterator[dict]:
+    """
+    Yield the elements of the `obj` array of a panel response from the chunks of its body.
+
+    :param chunks: Iterable[bytes] : The body of the response.
+    :param fields: Iterable[str] | None : Top level fields to keep of every element, all fields if None.
+    :param status: int : HTTP status of the response, reported when the panel answers with success false.
+    :raise ClientError: If the response is truncated or the panel answers with success false.
+    """
+    stream = ArrayStream()
+    fields = frozenset(fields) if fields is not None else None
+    for chunk in chunks:
+        yield from _decode(stream, chunk, fields)
+    _check(stream, status)
+
+
+async def aiter_array(chunks: AsyncIterable[bytes], fields: Iterable[str] | None = None,
+                      status: int = 200) -> AsyncIterator[dict]:
+    """
+    Asynchronous iter_array(): yield the elements of the `obj` array of a panel response from the chunks of its body.
+
+    :param chunks: AsyncIterable[bytes] : The body of the response.
+    :param fields: Iterable[str] | None : Top level fields to keep of every element, all fields if None.
+    :param status: int : HTTP status of the response, reported when the panel answers with success false.
+    :raise ClientError: If the response is truncated or the panel answers with success false.
+    """
+    stream = ArrayStream()
+    fields = frozenset(fields) if fields is not None else None
+    async for chunk in chunks:
+        for element in _decode(stream, chunk, fields):
+            yield element
+    _check(stream, status)
@@ -8,6 +8,9 @@ setup(
         "aiohttp>=3.11.11",
         "requests>=2.32.3",
     ],
+    extras_require={
+        "fast": ["orjson>=3.9"],
+    },
     author="Wert-Rar",
     author_email="wert-rar@mail.ru",
     description="A python Client for 3X-UI client",
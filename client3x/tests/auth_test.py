@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from aiohttp import web
+
+from client3x.client3x import (AuthManager, AsyncAuthManager, AsyncClient3XUI, Client3XUI, ClientError, ClientMetrics,
+                              FakePanel)
+
+
+class AuthManagerTest(unittest.TestCase):
+
+    def test_first_ensure_logs_in_once(self):
+        logins = []
+        auth = AuthManager(lambda: logins.append(1))
+
+        self.assertEqual(auth.ensure(), 1)
+        self.assertEqual(auth.ensure(), 1)
+        self.assertEqual(len(logins), 1)
+
+    def test_concurrent_refreshes_share_one_login(self):
+        logins = []
+
+        def slow_login():
+            time.sleep(0.05)
+            logins.append(1)
+
+        auth = AuthManager(slow_login)
+        generation = auth.ensure()
+
+        threads = [threading.Thread(target=auth.refresh, args=(generation,)) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(logins), 2)
+        self.assertEqual(auth.generation, 2)
+
+    def test_session_older_than_max_age_is_renewed(self):
+        now = [0.0]
+        auth = AuthManager(lambda: None, max_age=10, clock=lambda: now[0])
+        auth.ensure()
+
+        now[0] = 9
+        self.assertEqual(auth.ensure(), 1)
+        now[0] = 10
+        self.assertEqual(auth.ensure(), 2)
+
+    def test_failed_login_is_not_counted(self):
+        def failing_login():
+            raise ClientError('Failed to set client session', 0)
+
+        auth = AuthManager(failing_login)
+
+        with self.assertRaises(ClientError):
+            auth.ensure()
+        self.assertEqual((auth.generation, auth.logins), (0, 0))
+
+    def test_expired_responses(self):
+        self.assertTrue(AuthManager.is_expired(401, []))
+        self.assertTrue(AuthManager.is_expired(200, ['redirect to login']))
+        self.assertFalse(AuthManager.is_expired(200, []))
+        self.assertFalse(AuthManager.is_expired(404, ()))
+
+    def test_redirects_to_the_login_page_are_expiries(self):
+        history = ['redirect']
+
+        self.assertTrue(AuthManager.is_expired(200, history, 'https://panel.example.com/root/'))
+        self.assertTrue(AuthManager.is_expired(200, history, 'https://panel.example.com/root/login'))
+        self.assertFalse(AuthManager.is_expired(200, history, 'https://panel.example.com/root/panel/api/inbounds/list'))
+        self.assertTrue(AuthManager.is_expired(401, history, 'https://panel.example.com/root/panel/api/inbounds/list'))
+
+
+class AsyncAuthManagerTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_refreshes_share_one_login(self):
+        logins = []
+
+        async def slow_login():
+            await asyncio.sleep(0.01)
+            logins.append(1)
+
+        auth = AsyncAuthManager(slow_login)
+        generation = await asyncio.gather(*(auth.ensure() for _ in range(10)))
+        self.assertEqual(set(generation), {1})
+
+        await asyncio.gather(*(auth.refresh(1) for _ in range(10)))
+
+        self.assertEqual(len(logins), 2)
+        self.assertEqual(auth.logins, 2)
+
+
+class MovedPanel(FakePanel):
+    """FakePanel whose old base path /old redirects to the current one, as after moving the panel"""
+
+    def app(self) -> web.Application:
+        app = super().app()
+
+        @web.middleware
+        async def moved(request, handler):
+            if request.path.startswith('/old/'):
+                raise web.HTTPPermanentRedirect(f'/{self.root_url}/' + request.path_qs[len('/old/'):])
+            return await handler(request)
+
+        app.middlewares.insert(0, moved)
+        return app
+
+
+class RedirectedPanelTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_async_client_does_not_log_in_on_every_redirect(self):
+        async with MovedPanel() as panel:
+            panel.populate(1, 10)
+            async with AsyncClient3XUI(**panel.client_kwargs(root_url='old')) as client:
+                responses = [await client.get_client_traffic(f'user{n}@example.com') for n in range(5)]
+
+        self.assertTrue(all(response.success for response in responses))
+        self.assertEqual(panel.logins, 1)
+
+    def test_sync_client_does_not_log_in_on_every_redirect(self):
+        with MovedPanel() as panel:
+            panel.populate(1, 10)
+            client = Client3XUI(**panel.client_kwargs(root_url='old'))
+            responses = [client.get_client_traffic(f'user{n}@example.com') for n in range(5)]
+
+        self.assertTrue(all(response.success for response in responses))
+        self.assertEqual(panel.logins, 1)
+
+
+class RejectedLoginTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_async_client_raises_on_wrong_password(self):
+        metrics = ClientMetrics()
+        async with FakePanel() as panel:
+            client = AsyncClient3XUI(**panel.client_kwargs(password='wrong'), metrics=metrics)
+            with self.assertRaises(ClientError):
+                await client.get_inbounds()
+            await client.close()
+
+        self.assertEqual((client.auth.generation, metrics.logins, panel.logins), (0, 0, 0))
+
+    def test_sync_client_raises_on_wrong_password(self):
+        metrics = ClientMetrics()
+        with FakePanel() as panel:
+            with self.assertRaises(ClientError):
+                Client3XUI(**panel.client_kwargs(password='wrong'), metrics=metrics)
+
+        self.assertEqual((metrics.logins, panel.logins), (0, 0))
+
+    def test_login_error(self):
+        self.assertEqual(AuthManager.login_error(b'{"success":false,"msg":"Wrong username or password"}'),
+                         'Wrong username or password')
+        self.assertIsNone(AuthManager.login_error(b'{"success":true,"msg":"Login Successfully"}'))
+        self.assertIsNone(AuthManager.login_error(b''))
+
+
+if __name__ == '__main__':
+    unittest.main()
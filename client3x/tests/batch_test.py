@@ -0,0 +1,176 @@
+import asyncio
+import threading
+import unittest
+
+from client3x.client3x import AsyncClient3XUI, Client3XUI, FakePanel
+
+
+def make_async_client():
+    return AsyncClient3XUI('admin', 'admin', '', '127.0.0.1', 'root', '127.0.0.1', 'sub', 1)
+
+
+class AsyncBatchMapTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_results_keep_item_order(self):
+        client = make_async_client()
+
+        async def delayed_echo(value):
+            await asyncio.sleep(0.001 * (5 - value))
+            return value * 10
+
+        results = await client.batch_map(delayed_echo, range(5), concurrency=5)
+
+        self.assertEqual([result.item for result in results], [0, 1, 2, 3, 4])
+        self.assertEqual([result.result for result in results], [0, 10, 20, 30, 40])
+        self.assertTrue(all(result.ok for result in results))
+
+    async def test_errors_are_captured_per_item(self):
+        client = make_async_client()
+
+        async def fail_on_odd(value):
+            if value % 2:
+                raise RuntimeError(f'bad {value}')
+            return value
+
+        results = await client.batch_map(fail_on_odd, range(4), concurrency=2)
+
+        self.assertEqual([result.ok for result in results], [True, False, True, False])
+        self.assertIsInstance(results[1].error, RuntimeError)
+        self.assertEqual(results[2].result, 2)
+
+    async def test_concurrency_is_bounded(self):
+        client = make_async_client()
+        running = 0
+        peak = 0
+
+        async def track(_):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.001)
+            running -= 1
+
+        await client.batch_map(track, range(50), concurrency=4)
+
+        self.assertEqual(peak, 4)
+
+    async def test_progress_and_argument_unpacking(self):
+        client = make_async_client()
+        progress = []
+
+        async def combine(email, inbound_id=None):
+            return f'{inbound_id}:{email}'
+
+        results = await client.batch_map(combine, [('a@x', 1), {'email': 'b@x', 'inbound_id': 2}, 'c@x'],
+                                         progress_callback=lambda done, total, _: progress.append((done, total)))
+
+        self.assertEqual([result.result for result in results], ['1:a@x', '2:b@x', 'None:c@x'])
+        self.assertEqual(progress, [(1, 3), (2, 3), (3, 3)])
+
+    async def test_failing_progress_callback_does_not_stop_the_batch(self):
+        client = make_async_client()
+        calls = []
+
+        def progress(done, total, result):
+            calls.append(done)
+            if done == 1:
+                raise RuntimeError('callback failed')
+
+        async def echo(value):
+            await asyncio.sleep(0.001 * value)
+            return value
+
+        results = await client.batch_map(echo, range(6), concurrency=3, progress_callback=progress)
+
+        self.assertEqual([result.result for result in results], list(range(6)))
+        self.assertEqual(calls, [1, 2, 3, 4, 5, 6])
+
+    async def test_method_by_name(self):
+        client = make_async_client()
+        client.echo = lambda value: asyncio.sleep(0, result=value)
+
+        results = await client.batch_map('echo', ['x'])
+
+        self.assertEqual(results[0].result, 'x')
+
+
+class SyncBatchMapTest(unittest.TestCase):
+
+    def setUp(self):
+        self.panel = FakePanel(latency=0.005)
+        self.panel.start_thread()
+        self.panel.populate(1, 20)
+        self.client = Client3XUI(**self.panel.client_kwargs())
+        self.emails = [f'user{n}@example.com' for n in range(20)]
+
+    def tearDown(self):
+        self.panel.stop_thread()
+
+    def test_results_keep_item_order(self):
+        results = self.client.batch_map(self.client.get_client_traffic, reversed(self.emails), workers=4)
+
+        self.assertEqual([result.item for result in results], self.emails[::-1])
+        self.assertEqual([result.result.obj['email'] for result in results], self.emails[::-1])
+
+    def test_errors_are_captured_per_item(self):
+        def traffic(email):
+            if email.endswith('3@example.com'):
+                raise RuntimeError(f'bad {email}')
+            return self.client.get_client_traffic(email)
+
+        results = self.client.batch_map(traffic, self.emails, workers=4)
+
+        self.assertEqual([result.ok for result in results].count(False), 2)
+        self.assertIsInstance(results[3].error, RuntimeError)
+        self.assertTrue(results[4].result.success)
+
+    def test_failing_progress_callback_does_not_stop_the_batch(self):
+        def progress(done, total, result):
+            raise RuntimeError('callback failed')
+
+        results = self.client.batch_map(self.client.get_client_traffic, self.emails[:4], workers=2,
+                                        progress_callback=progress)
+
+        self.assertTrue(all(result.ok for result in results))
+
+    def test_thread_sessions_share_cookies_and_adapter(self):
+        client = self.client
+        seen = []
+
+        def session_of_thread(_):
+            session = client._Client3XUI__thread_session()
+            seen.append((threading.get_ident(), session, session.get_adapter(client.base_url)))
+            return client.get_client_traffic(self.emails[0]).success
+
+        results = client.batch_map(session_of_thread, range(20), workers=4)
+
+        self.assertTrue(all(result.result for result in results))
+        self.assertEqual(self.panel.logins, 1)
+        self.assertNotIn(threading.get_ident(), {thread for thread, _, _ in seen})
+        for _, session, adapter in seen:
+            self.assertIsNot(session, client.session)
+            self.assertIs(session.cookies, client.session.cookies)
+            self.assertIs(adapter, client._Client3XUI__adapter)
+
+    def test_expired_session_is_renewed_once(self):
+        self.panel.expire_sessions()
+
+        results = self.client.batch_map(self.client.get_client_traffic, self.emails, workers=8)
+
+        self.assertTrue(all(result.result.success for result in results))
+        self.assertEqual(self.panel.logins, 2)
+
+    def test_growing_the_pool_closes_the_old_adapter(self):
+        old_adapter = self.client._Client3XUI__adapter
+        self.client.get_client_traffic(self.emails[0])
+        self.assertTrue(old_adapter.poolmanager.pools)
+
+        self.client.batch_map(self.client.get_client_traffic, self.emails, workers=16)
+
+        self.assertIsNot(self.client._Client3XUI__adapter, old_adapter)
+        self.assertFalse(old_adapter.poolmanager.pools)
+        self.assertIs(self.client.session.get_adapter(self.client.base_url), self.client._Client3XUI__adapter)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import json
+import unittest
+
+from client3x.client3x import BulkClientPayload, CLientPayload
+
+
+def make_payload(index, inbound_id=1):
+    return CLientPayload(inbound_id, f'id-{index}', f'user{index}@example.com', 2, 0, f'sub-{index}')
+
+
+class BulkClientPayloadTest(unittest.TestCase):
+
+    def test_from_payloads_merges_clients(self):
+        payload = BulkClientPayload.from_payloads(make_payload(i) for i in range(3))
+
+        self.assertEqual(payload.data["inbound"], 1)
+        self.assertEqual(len(payload), 3)
+        self.assertEqual([client["email"] for client in payload.clients],
+                         ['user0@example.com', 'user1@example.com', 'user2@example.com'])
+
+    def test_from_payloads_rejects_mixed_inbounds(self):
+        with self.assertRaises(ValueError):
+            BulkClientPayload.from_payloads([make_payload(0, inbound_id=1), make_payload(1, inbound_id=2)])
+
+        with self.assertRaises(ValueError):
+            BulkClientPayload.from_payloads([])
+
+    def test_chunks_keep_order_and_inbound(self):
+        payload = BulkClientPayload.from_payloads(make_payload(i, inbound_id=7) for i in range(5))
+
+        chunks = list(payload.chunks(2))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertTrue(all(chunk.data["inbound"] == 7 for chunk in chunks))
+        self.assertEqual([client["id"] for chunk in chunks for client in chunk.clients],
+                         [f'id-{i}' for i in range(5)])
+
+        with self.assertRaises(ValueError):
+            list(payload.chunks(0))
+
+    def test_format_serializes_all_clients(self):
+        payload = BulkClientPayload(3, [{"id": "a", "email": "a@x"}, {"id": "b", "email": "b@x"}])
+
+        formatted = payload.format()
+
+        self.assertEqual(formatted["inbound"], 3)
+        self.assertEqual(json.loads(formatted["settings"]),
+                         {"clients": [{"id": "a", "email": "a@x"}, {"id": "b", "email": "b@x"}]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import json
+import unittest
+
+from client3x.client3x import codec, Payload, InboundPayload
+from client3x.client3x.codec import JsonCodec, OrjsonCodec
+
+
+class RecordingCodec(JsonCodec):
+    name = 'recording'
+
+    def __init__(self):
+        self.dumped = []
+
+    def dumps(self, obj):
+        self.dumped.append(obj)
+        return super().dumps(obj)
+
+
+class CodecTest(unittest.TestCase):
+
+    def setUp(self):
+        self.previous = codec.get_codec()
+
+    def tearDown(self):
+        codec.set_codec(self.previous)
+
+    def test_default_codec(self):
+        expected = 'orjson' if codec.orjson is not None else 'json'
+
+        self.assertEqual(codec.get_codec().name, expected)
+
+    def test_round_trip(self):
+        data = {'remark': 'тест', 'port': 443, 'clients': [{'id': 'a', 'enable': True, 'flow': None}]}
+
+        for backend in (JsonCodec(), OrjsonCodec()) if codec.orjson is not None else (JsonCodec(),):
+            encoded = backend.dumps(data)
+            self.assertIsInstance(encoded, str)
+            self.assertEqual(json.loads(encoded), data)
+            self.assertEqual(backend.loads(encoded), data)
+            self.assertEqual(backend.loads(encoded.encode()), data)
+
+    def test_payloads_use_the_installed_codec(self):
+        recording = RecordingCodec()
+        codec.set_codec(recording)
+
+        Payload({'inbound': 1, 'settings': {'clients': []}}).format()
+        InboundPayload(443, {'network': 'tcp'})
+
+        self.assertEqual(recording.dumped[0], {'clients': []})
+        self.assertIn({'network': 'tcp'}, recording.dumped)
+
+    def test_set_codec_returns_previous(self):
+        stdlib = JsonCodec()
+
+        self.assertIs(codec.set_codec(stdlib), self.previous)
+        self.assertIs(codec.get_codec(), stdlib)
+
+
+if __name__ == '__main__':
+    unittest.main()
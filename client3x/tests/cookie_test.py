@@ -1,39 +1,23 @@
 import asyncio
-import logging
+import unittest
 
-from client3x import AsyncClient3XUI
-from client3x.tests.test_config import *
+from client3x.client3x import AsyncClient3XUI, FakePanel
 
 
+class CookieRenewalTest(unittest.IsolatedAsyncioTestCase):
 
+    async def test_session_is_renewed_after_it_expires(self):
+        async with FakePanel(session_ttl=0.2) as panel:
+            panel.populate(1, 10)
+            async with AsyncClient3XUI(**panel.client_kwargs()) as client:
+                first = await client.get_inbounds()
+                await asyncio.sleep(0.3)
+                second = await client.get_inbounds()
 
+        self.assertTrue(first.success)
+        self.assertTrue(second.success)
+        self.assertEqual(panel.logins, 2)
 
-async def main():
-    client = AsyncClient3XUI(
-        login=PANEL_LOGIN,
-        password=PANEL_PASSWORD,
-        login_key=PANEL_SECRET_KEY,
-        panel_host=PANEL_HOST,
-        root_url=PANEL_ROOT_URL,
-        sub_host=SUB_HOST,
-        sub_path=SUB_PATH,
-        inbound_id=INBOUND_ID,
-        panel_port=PANEL_PORT,
-        sub_port=SUB_PORT,
-        logging_enabled=CLIENT_LOGGING_ENABLED,
-        timeout=30
-    )
 
-    await client.start()
-    print(await client.get_inbounds())
-    await asyncio.sleep(60)
-    print(await client.get_inbounds())
-
-
-if __name__ == "__main__":
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    asyncio.run(main())
+if __name__ == '__main__':
+    unittest.main()
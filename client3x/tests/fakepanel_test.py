@@ -0,0 +1,100 @@
+import time
+import unittest
+
+from client3x.client3x import AsyncClient3XUI, Client3XUI, CLientPayload, FakePanel, RetryPolicy
+
+
+def client(email, client_id=None, **fields):
+    return {'id': client_id or f'id-{email}', 'email': email, 'enable': True, 'expiryTime': 0, 'totalGB': 0,
+            'limitIp': 0, 'subId': f'sub-{email}', 'flow': '', 'reset': 0, **fields}
+
+
+class FakePanelTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.panel = FakePanel(seed=1)
+        await self.panel.start()
+        self.panel.add_inbound(clients=[client('a'), client('b')])
+        self.client = AsyncClient3XUI(**self.panel.client_kwargs())
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.panel.close()
+
+    async def test_inbounds_and_traffic_are_served(self):
+        self.panel.add_traffic('a', up=10, down=20)
+
+        inbounds = (await self.client.get_inbounds()).obj
+        traffic = (await self.client.get_client_traffic('a')).obj
+
+        self.assertEqual([inbound['id'] for inbound in inbounds], [1])
+        self.assertEqual([stat['email'] for stat in inbounds[0]['clientStats']], ['a', 'b'])
+        self.assertEqual((traffic['up'], traffic['down']), (10, 20))
+        self.assertEqual(inbounds[0]['down'], 20)
+
+    async def test_clients_are_added_updated_and_deleted(self):
+        await self.client.add_client(CLientPayload.from_client(1, client('c')))
+        await self.client.update_client('id-a', CLientPayload.from_client(1, client('a', enable=False)))
+        await self.client.delete_client('id-b', 1)
+
+        emails = [item['email'] for item in await self.client.get_clients_in_inbound(1)]
+        self.assertEqual(emails, ['a', 'c'])
+        self.assertFalse(self.panel.client('a')['enable'])
+        self.assertIsNone(self.panel.traffic('b'))
+
+    async def test_duplicate_email_is_rejected(self):
+        result = await self.client.add_clients_bulk([CLientPayload.from_client(1, client('a', 'other'))])
+
+        self.assertFalse(result.success)
+        self.assertEqual(self.panel.client_count, 2)
+
+    async def test_expired_session_is_renewed(self):
+        await self.client.get_inbounds()
+        self.panel.expire_sessions()
+
+        self.assertTrue((await self.client.get_inbounds()).success)
+        self.assertEqual(self.panel.logins, 2)
+
+    async def test_injected_errors_are_retried(self):
+        retrying = AsyncClient3XUI(**self.panel.client_kwargs(retry_policy=RetryPolicy(backoff_base=0.001, jitter=False)))
+        self.panel.fail_next(2, status=503)
+        try:
+            response = await retrying.get_inbounds()
+        finally:
+            await retrying.close()
+
+        self.assertTrue(response.success)
+        self.assertEqual(self.panel.requests['list'], 3)
+
+    async def test_latency_is_added(self):
+        await self.client.get_inbounds()
+        self.panel.latency = 0.05
+
+        started = time.perf_counter()
+        await self.client.get_inbounds()
+
+        self.assertGreaterEqual(time.perf_counter() - started, 0.05)
+
+    async def test_populate_creates_synthetic_clients(self):
+        self.panel.populate(1, 10)
+        ids = self.panel.populate(inbounds=2, clients_per_inbound=500)
+
+        inbound = self.panel.inbound(ids[1])
+        self.assertEqual(self.panel.client_count, 1012)
+        self.assertEqual(len(inbound['clientStats']), 500)
+        self.assertEqual(inbound['clientStats'][0]['email'], 'user510@example.com')
+
+
+class FakePanelThreadTest(unittest.TestCase):
+
+    def test_sync_client_is_served_from_a_thread(self):
+        with FakePanel(session_ttl=60) as panel:
+            panel.populate(1, 10)
+            sync_client = Client3XUI(**panel.client_kwargs())
+
+            self.assertTrue(sync_client.get_inbound(1).success)
+            self.assertEqual(len(sync_client.get_clients_in_inbound(1)), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
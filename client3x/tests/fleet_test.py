@@ -0,0 +1,107 @@
+import asyncio
+import unittest
+
+from client3x.client3x import AsyncFleetClient, ClientError, PanelResponse
+
+
+class FakePanel:
+
+    def __init__(self, base_url, inbounds=(), online=(), delay=0.0, error=None):
+        self.base_url = base_url
+        self.logger = None
+        self.inbounds = list(inbounds)
+        self.online = list(online)
+        self.delay = delay
+        self.error = error
+        self.closed = False
+
+    async def __answer(self, obj):
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return PanelResponse({'success': True, 'msg': '', 'obj': obj})
+
+    async def get_inbounds(self):
+        return await self.__answer(self.inbounds)
+
+    async def online_clients(self):
+        return await self.__answer(self.online)
+
+    async def get_client_traffic(self, email):
+        for inbound in self.inbounds:
+            for stat in inbound['clientStats']:
+                if stat['email'] == email:
+                    return await self.__answer(stat)
+        return await self.__answer(None)
+
+    async def iter_inbounds(self, fields=None):
+        await asyncio.sleep(self.delay)
+        for inbound in self.inbounds:
+            yield {'clientStats': inbound['clientStats']}
+
+    async def close(self):
+        self.closed = True
+
+
+def inbound(inbound_id, *emails):
+    return {'id': inbound_id, 'clientStats': [{'email': email, 'up': 1, 'down': 2} for email in emails]}
+
+
+class AsyncFleetClientTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.fleet = AsyncFleetClient({
+            'de': FakePanel('https://de', [inbound(1, 'a', 'b')], online=['a']),
+            'nl': FakePanel('https://nl', [inbound(1, 'c'), inbound(2, 'd')], online=['c', 'd']),
+        }, timeout=0.5)
+
+    async def test_results_are_merged_with_the_panel(self):
+        result = await self.fleet.online_clients()
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result.merged(), [('de', 'a'), ('nl', 'c'), ('nl', 'd')])
+        self.assertEqual([(panel, item['id']) for panel, item in (await self.fleet.get_inbounds()).merged()],
+                         [('de', 1), ('nl', 1), ('nl', 2)])
+
+    async def test_client_stats_and_find_client(self):
+        stats = (await self.fleet.client_stats()).merged()
+
+        self.assertEqual([(panel, stat['email']) for panel, stat in stats], [('de', 'a'), ('de', 'b'), ('nl', 'c'), ('nl', 'd')])
+        self.assertEqual(await self.fleet.find_client('d'), ('nl', {'email': 'd', 'up': 1, 'down': 2}))
+        self.assertIsNone(await self.fleet.find_client('nobody'))
+
+    async def test_slow_and_failing_panels_give_partial_results(self):
+        self.fleet.clients['slow'] = FakePanel('https://slow', online=['x'], delay=5)
+        self.fleet.clients['down'] = FakePanel('https://down', error=ClientError('Bad gateway', 502))
+
+        started = asyncio.get_running_loop().time()
+        result = await self.fleet.online_clients()
+
+        self.assertLess(asyncio.get_running_loop().time() - started, 2)
+        self.assertFalse(result.ok)
+        self.assertEqual(set(result.errors), {'slow', 'down'})
+        self.assertIsInstance(result.errors['slow'], asyncio.TimeoutError)
+        self.assertEqual(result.merged(), [('de', 'a'), ('nl', 'c'), ('nl', 'd')])
+
+    async def test_unsuccessful_response_is_an_error(self):
+        async def refused():
+            return PanelResponse({'success': False, 'msg': 'Not logged in'})
+
+        self.fleet.clients['de'].online_clients = refused
+
+        result = await self.fleet.online_clients()
+
+        self.assertEqual(result.errors['de'].txt, 'Not logged in')
+        self.assertEqual(result.merged(), [('nl', 'c'), ('nl', 'd')])
+
+    async def test_clients_without_names_and_close(self):
+        panels = [FakePanel('https://de'), FakePanel('https://nl')]
+
+        async with AsyncFleetClient(panels) as fleet:
+            self.assertEqual(fleet.panels, ['https://de', 'https://nl'])
+
+        self.assertTrue(all(panel.closed for panel in panels))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import socket
+import unittest
+
+from client3x.client3x import (AsyncClient3XUI, Client3XUI, ClientError, CLientPayload, FakePanel, RequestHooks,
+                               RetryPolicy)
+
+
+class RequestHooksTest(unittest.TestCase):
+
+    def test_hooks_are_counted_and_removed(self):
+        hooks = RequestHooks()
+        hook = hooks.before_request(lambda event: None)
+        hooks.on_error(print)
+
+        self.assertTrue(hooks)
+        self.assertEqual(len(hooks), 2)
+        hooks.remove('before_request', hook)
+        hooks.remove('on_error', print)
+        self.assertFalse(hooks)
+
+    def test_unknown_event_is_rejected(self):
+        with self.assertRaises(ValueError):
+            RequestHooks().add('after_request', print)
+
+
+class AsyncClientHooksTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.panel = FakePanel()
+        await self.panel.start()
+        self.panel.populate(1, 10)
+        self.events = []
+        self.client = AsyncClient3XUI(**self.panel.client_kwargs(
+            retry_policy=RetryPolicy(backoff_base=0.001, jitter=False)))
+        for name in RequestHooks.EVENTS:
+            self.client.hooks.add(name, lambda event, name=name: self.events.append((name, event)))
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.panel.close()
+
+    async def test_events_describe_the_attempt(self):
+        await self.client.add_client(CLientPayload(1, 'id-a', 'a@example.com', 0, 0, 'sub-a'))
+
+        (before, event), (after, same) = self.events
+        self.assertEqual((before, after), ('before_request', 'after_response'))
+        self.assertIs(event, same)
+        self.assertEqual((event.method, event.endpoint, event.attempt, event.status),
+                         ('POST', '/panel/api/inbounds/addClient', 1, 200))
+        self.assertGreater(event.bytes_out, 100)
+        self.assertGreater(event.bytes_in, 0)
+        self.assertGreater(event.seconds, 0)
+
+    async def test_every_attempt_is_reported(self):
+        self.panel.fail_next(1, status=503)
+
+        await self.client.get_client_traffic('user1@example.com')
+
+        responses = [(event.attempt, event.status) for name, event in self.events if name == 'after_response']
+        self.assertEqual(responses, [(1, 503), (2, 200)])
+        self.assertEqual(self.events[0][1].endpoint, '/panel/api/inbounds/getClientTraffics/{email}')
+
+    async def test_streamed_reads_are_reported(self):
+        inbounds = [inbound async for inbound in self.client.iter_inbounds(fields=('id',))]
+
+        self.assertEqual(len(inbounds), 1)
+        self.assertEqual([name for name, _ in self.events], ['before_request', 'after_response'])
+        self.assertGreater(self.events[1][1].bytes_in, 1000)
+
+    async def test_coroutine_hooks_are_awaited_and_failing_hooks_are_ignored(self):
+        seen = []
+
+        async def record(event):
+            event.context['span'] = 'span-1'
+
+        self.client.hooks.before_request(record)
+        self.client.hooks.before_request(lambda event: 1 / 0)
+        self.client.hooks.after_response(lambda event: seen.append(event.context['span']))
+
+        response = await self.client.get_client_traffic('user1@example.com')
+
+        self.assertTrue(response.success)
+        self.assertEqual(seen, ['span-1'])
+
+
+class ErrorHooksTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_connection_errors_are_reported(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        client = AsyncClient3XUI('admin', 'admin', '', '127.0.0.1', 'panel', '127.0.0.1', 'sub', 1,
+                                 panel_port=port, scheme='http')
+        errors = []
+        client.hooks.on_error(errors.append)
+        try:
+            with self.assertRaises(ClientError):
+                await client.get_client_traffic('user1@example.com')
+        finally:
+            await client.close()
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].status, 0)
+        self.assertIsInstance(errors[0].error, ClientError)
+
+
+class SyncClientHooksTest(unittest.TestCase):
+
+    def test_sync_client_runs_hooks(self):
+        hooks = RequestHooks()
+        events = []
+        hooks.after_response(events.append)
+        with FakePanel() as panel:
+            panel.populate(1, 10)
+            client = Client3XUI(**panel.client_kwargs(hooks=hooks))
+            client.get_client_traffic('user1@example.com')
+            list(client.iter_inbounds())
+
+        self.assertEqual([(event.endpoint, event.status) for event in events],
+                         [('/panel/api/inbounds/getClientTraffics/{email}', 200), ('/panel/api/inbounds/list', 200)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import unittest
+
+from client3x.client3x import InboundCache
+
+
+def make_inbound(inbound_id=1, protocol='vless', clients=None):
+    clients = clients if clients is not None else [{"id": "a", "email": "a@x"}, {"id": "b", "email": "b@x"}]
+    return {"id": inbound_id, "protocol": protocol, "settings": json.dumps({"clients": clients, "decryption": "none"}),
+            "clientStats": [{"email": client["email"], "up": 1, "down": 2} for client in clients]}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class InboundCacheTest(unittest.TestCase):
+
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = InboundCache(ttl=10, clock=clock)
+        cache.put(1, make_inbound())
+
+        clock.now = 9.9
+        self.assertIsNotNone(cache.clients(1))
+        clock.now = 10
+        self.assertIsNone(cache.clients(1))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = InboundCache(max_entries=2)
+        cache.put(1, make_inbound(1))
+        cache.put(2, make_inbound(2))
+        cache.get(1)
+        cache.put(3, make_inbound(3))
+
+        self.assertIsNotNone(cache.get(1))
+        self.assertIsNone(cache.get(2))
+        self.assertIsNotNone(cache.get(3))
+
+    def test_client_writes_update_snapshot(self):
+        cache = InboundCache()
+        cache.put(1, make_inbound())
+
+        cache.add_clients(1, [{"id": "c", "email": "c@x"}])
+        cache.update_client(1, "a", {"id": "a", "email": "a@x", "enable": False})
+        cache.delete_client(1, "b")
+
+        self.assertEqual(cache.clients(1), [{"id": "a", "email": "a@x", "enable": False}, {"id": "c", "email": "c@x"}])
+        obj = cache.inbound(1)
+        self.assertEqual(json.loads(obj["settings"])["clients"], cache.clients(1))
+        self.assertEqual(json.loads(obj["settings"])["decryption"], "none")
+        self.assertEqual([stat["email"] for stat in obj["clientStats"]], ["a@x"])
+
+    def test_unknown_client_write_invalidates(self):
+        cache = InboundCache()
+        cache.put(1, make_inbound())
+
+        cache.update_client(1, "missing", {"id": "missing"})
+
+        self.assertIsNone(cache.get(1))
+
+    def test_trojan_clients_are_addressed_by_password(self):
+        cache = InboundCache()
+        cache.put(1, make_inbound(protocol='trojan', clients=[{"password": "p1", "email": "a@x"}]))
+
+        cache.delete_client(1, "p1")
+
+        self.assertEqual(cache.clients(1), [])
+
+    def test_returned_clients_are_copies(self):
+        cache = InboundCache()
+        cache.put(1, make_inbound())
+
+        cache.clients(1)[0]["email"] = "changed@x"
+
+        self.assertEqual(cache.clients(1)[0]["email"], "a@x")
+
+    def test_invalidate_all(self):
+        cache = InboundCache()
+        cache.put(1, make_inbound(1))
+        cache.put(2, make_inbound(2))
+
+        cache.invalidate()
+
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+
+from client3x.client3x import TrafficMeter, TrafficDelta, ClientError
+
+
+def stat(email, up, down, inbound_id=1):
+    return {'id': 1, 'inboundId': inbound_id, 'enable': True, 'email': email, 'up': up, 'down': down,
+            'expiryTime': 0, 'total': 0, 'reset': 0, 'lastOnline': 0}
+
+
+class FakeClient:
+
+    def __init__(self, polls):
+        self.polls = list(polls)
+
+    async def iter_inbounds(self, fields=None):
+        result = self.polls.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        for inbound_id, stats in result.items():
+            yield {'clientStats': [stat(email, up, down, inbound_id) for email, (up, down) in stats.items()]}
+
+
+class TrafficMeterTest(unittest.TestCase):
+
+    def test_first_poll_records_counters_only(self):
+        meter = TrafficMeter()
+
+        self.assertEqual(meter.update([stat('a', 100, 200)], 1.0), [])
+        self.assertEqual(meter.clients, 1)
+
+    def test_deltas_of_changed_clients(self):
+        meter = TrafficMeter()
+        meter.update([stat('a', 100, 200), stat('b', 5, 5)], 1.0)
+
+        deltas = meter.update([stat('a', 150, 260), stat('b', 5, 5)], 2.0)
+
+        self.assertEqual(deltas, [TrafficDelta('a', 1, 50, 60, False, 2.0)])
+
+    def test_reset_counters(self):
+        meter = TrafficMeter()
+        meter.update([stat('a', 100, 200), stat('b', 100, 200)], 1.0)
+
+        deltas = meter.update([stat('a', 10, 0), stat('b', 0, 0)], 2.0)
+
+        self.assertEqual(deltas, [TrafficDelta('a', 1, 10, 0, True, 2.0), TrafficDelta('b', 1, 0, 0, True, 2.0)])
+        self.assertEqual(meter.resets, 2)
+        self.assertEqual(meter.update([stat('a', 15, 5), stat('b', 0, 0)], 3.0),
+                         [TrafficDelta('a', 1, 5, 5, False, 3.0)])
+
+    def test_new_and_removed_clients(self):
+        meter = TrafficMeter()
+        meter.update([stat('a', 100, 200)], 1.0)
+
+        deltas = meter.update([stat('b', 30, 40, inbound_id=2), stat('c', 0, 0)], 2.0)
+
+        self.assertEqual(deltas, [TrafficDelta('b', 2, 30, 40, False, 2.0)])
+        self.assertEqual(meter.clients, 2)
+        self.assertEqual(meter.update([stat('a', 100, 200)], 3.0), [TrafficDelta('a', 1, 100, 200, False, 3.0)])
+
+    def test_interval_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            TrafficMeter(interval=0)
+
+
+class TrafficMeterPollTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_deltas_generator_polls_all_inbounds(self):
+        client = FakeClient([{1: {'a': (0, 0)}, 2: {'b': (10, 10)}},
+                             {1: {'a': (5, 0)}, 2: {'b': (10, 30)}}])
+        meter = TrafficMeter(client, interval=0.01, clock=lambda: 7.0)
+        deltas = meter.deltas()
+
+        received = [await anext(deltas), await anext(deltas)]
+        await deltas.aclose()
+
+        self.assertEqual(received, [TrafficDelta('a', 1, 5, 0, False, 7.0), TrafficDelta('b', 2, 0, 20, False, 7.0)])
+
+    async def test_failed_poll_keeps_counters(self):
+        client = FakeClient([{1: {'a': (10, 10)}}, ClientError('Panel request failed', 502), {1: {'a': (12, 10)}}])
+        meter = TrafficMeter(client, interval=0.01)
+
+        await meter.poll()
+        with self.assertRaises(ClientError):
+            await meter.poll()
+        deltas = await meter.poll()
+
+        self.assertEqual([(delta.email, delta.up, delta.down) for delta in deltas], [('a', 2, 0)])
+        self.assertEqual(meter.polls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+
+from client3x.client3x import AsyncClient3XUI, Client3XUI, ClientMetrics, FakePanel, RetryPolicy
+from client3x.client3x.metrics import endpoint_template
+
+
+class EndpointTemplateTest(unittest.TestCase):
+
+    def test_ids_and_emails_are_replaced(self):
+        cases = {
+            '/panel/api/inbounds/list': '/panel/api/inbounds/list',
+            '/panel/api/inbounds/get/12': '/panel/api/inbounds/get/{inbound_id}',
+            '/panel/api/inbounds/getClientTraffics/user@example.com': '/panel/api/inbounds/getClientTraffics/{email}',
+            '/panel/api/inbounds/updateClient/5b8f3c2e-0001': '/panel/api/inbounds/updateClient/{client_id}',
+            '/panel/api/inbounds/3/delClient/5b8f3c2e-0001': '/panel/api/inbounds/{inbound_id}/delClient/{client_id}',
+            '/panel/api/inbounds/3/resetClientTraffic/bob': '/panel/api/inbounds/{inbound_id}/resetClientTraffic/{email}',
+            '/panel/api/inbounds/delDepletedClients/-1': '/panel/api/inbounds/delDepletedClients/{inbound_id}',
+            '/login': '/login',
+            '/panel/api/inbounds/unknown/x?y=1': '/panel/api/inbounds/{param}/{param}',
+        }
+        for path, template in cases.items():
+            self.assertEqual(endpoint_template(path), template, path)
+
+
+class ClientMetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = ClientMetrics(buckets=(0.1, 1.0))
+
+    def test_requests_of_one_template_share_an_endpoint(self):
+        self.metrics.observe('GET', '/panel/api/inbounds/getClientTraffics/a', 200, 0.05, 0, 100)
+        self.metrics.observe('GET', '/panel/api/inbounds/getClientTraffics/b', 404, 0.5, 0, 20)
+        self.metrics.observe('GET', '/panel/api/inbounds/getClientTraffics/c', 200, 2.0, 0, 30)
+        self.metrics.retry('GET', '/panel/api/inbounds/getClientTraffics/c')
+
+        endpoints = self.metrics.snapshot()['endpoints']
+        stats = endpoints['GET /panel/api/inbounds/getClientTraffics/{email}']
+        self.assertEqual(len(endpoints), 1)
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['statuses'], {200: 2, 404: 1})
+        self.assertEqual(stats['retries'], 1)
+        self.assertEqual(stats['bytes_in'], 150)
+        self.assertEqual(stats['latency']['buckets'], {0.1: 1, 1.0: 2, '+Inf': 3})
+        self.assertAlmostEqual(stats['latency']['sum'], 2.55)
+
+    def test_prometheus_text(self):
+        self.metrics.observe('POST', '/panel/api/inbounds/addClient', 200, 0.05, 300, 60)
+        self.metrics.login()
+
+        text = self.metrics.to_prometheus()
+
+        labels = 'method="POST",endpoint="/panel/api/inbounds/addClient"'
+        self.assertIn('# TYPE client3x_requests_total counter', text)
+        self.assertIn(f'client3x_requests_total{{{labels},status="200"}} 1', text)
+        self.assertIn(f'client3x_request_duration_seconds_bucket{{{labels},le="0.1"}} 1', text)
+        self.assertIn(f'client3x_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1', text)
+        self.assertIn(f'client3x_request_duration_seconds_count{{{labels}}} 1', text)
+        self.assertIn(f'client3x_request_bytes_total{{{labels}}} 300', text)
+        self.assertIn('client3x_logins_total 1', text)
+        self.assertTrue(text.endswith('\n'))
+
+    def test_reset(self):
+        self.metrics.observe('GET', '/panel/api/inbounds/list', 200, 0.01)
+        self.metrics.reset()
+
+        self.assertEqual(self.metrics.snapshot(), {'endpoints': {}, 'logins': 0, 'auth_refreshes': 0})
+
+
+class ClientMetricsIntegrationTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_async_client_records_requests_retries_and_refreshes(self):
+        metrics = ClientMetrics()
+        async with FakePanel() as panel:
+            panel.populate(1, 10)
+            policy = RetryPolicy(backoff_base=0.001, jitter=False)
+            async with AsyncClient3XUI(**panel.client_kwargs(retry_policy=policy, metrics=metrics)) as client:
+                await client.get_client_traffic('user1@example.com')
+                panel.fail_next(1, status=503)
+                await client.get_client_traffic('user2@example.com')
+                panel.expire_sessions()
+                await client.get_inbounds()
+                inbounds = [inbound async for inbound in client.iter_inbounds(fields=('id',))]
+
+        snapshot = metrics.snapshot()
+        traffic = snapshot['endpoints']['GET /panel/api/inbounds/getClientTraffics/{email}']
+        listed = snapshot['endpoints']['GET /panel/api/inbounds/list']
+        self.assertEqual(len(inbounds), 1)
+        self.assertEqual(traffic['statuses'], {200: 2, 503: 1})
+        self.assertEqual(traffic['retries'], 1)
+        self.assertGreater(traffic['bytes_in'], 0)
+        self.assertEqual(listed['requests'], 2)
+        self.assertGreater(listed['bytes_in'], 1000)
+        self.assertEqual((snapshot['logins'], snapshot['auth_refreshes']), (2, 1))
+
+    def test_sync_client_records_requests(self):
+        metrics = ClientMetrics()
+        with FakePanel() as panel:
+            panel.populate(1, 10)
+            client = Client3XUI(**panel.client_kwargs(metrics=metrics))
+            client.get_client_traffic('user1@example.com')
+            list(client.iter_inbounds())
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['logins'], 1)
+        self.assertEqual(snapshot['endpoints']['GET /panel/api/inbounds/getClientTraffics/{email}']['statuses'], {200: 1})
+        self.assertGreater(snapshot['endpoints']['GET /panel/api/inbounds/list']['bytes_in'], 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
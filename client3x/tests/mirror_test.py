@@ -0,0 +1,139 @@
+import json
+import os
+import tempfile
+import unittest
+
+from client3x.client3x import PanelMirror, ClientError
+
+
+def inbound(inbound_id, clients, protocol='vless'):
+    return {'id': inbound_id, 'up': 0, 'down': 0, 'total': 0, 'remark': f'inbound {inbound_id}', 'enable': True,
+            'expiryTime': 0, 'listen': '', 'port': 1000 + inbound_id, 'protocol': protocol, 'tag': f'inbound-{inbound_id}',
+            'settings': json.dumps({'clients': [{'id': f'uuid-{email}', 'email': email, 'enable': True, 'flow': '',
+                                                 'limitIp': 0, 'totalGB': 0, 'expiryTime': expiry, 'tgId': '',
+                                                 'subId': sub_id, 'reset': 0} for email, sub_id, expiry, _ in clients]}),
+            'streamSettings': '{}', 'sniffing': '{}', 'allocate': '{}',
+            'clientStats': [{'id': i, 'inboundId': inbound_id, 'enable': True, 'email': email, 'up': up, 'down': up,
+                             'expiryTime': expiry, 'total': 0, 'reset': 0, 'lastOnline': 0}
+                            for i, (email, _, expiry, up) in enumerate(clients)]}
+
+
+PANEL = [inbound(1, [('alice', 'sub-a', 1000, 10), ('bob', 'sub-b', 2000, 20)]),
+         inbound(2, [('carol', 'sub-a', 0, 30), ('dave', 'sub-d', -86400000, 0)])]
+
+
+class FakePanel:
+
+    def __init__(self, inbounds):
+        self.inbounds = inbounds
+        self.fail = False
+
+    def iter_inbounds(self):
+        for item in self.inbounds:
+            yield item
+            if self.fail:
+                raise ClientError('Truncated panel response', 0)
+
+
+class AsyncFakePanel(FakePanel):
+
+    async def iter_inbounds(self):
+        for item in self.inbounds:
+            yield item
+
+
+class PanelMirrorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.mirror = PanelMirror()
+        self.panel = FakePanel([dict(item) for item in PANEL])
+        self.result = self.mirror.sync(self.panel)
+
+    def tearDown(self):
+        self.mirror.close()
+
+    def test_first_sync_inserts_everything(self):
+        self.assertEqual((self.result.inserted, self.result.updated, self.result.deleted), (10, 0, 0))
+        self.assertEqual([item.id for item in self.mirror.inbounds()], [1, 2])
+
+    def test_queries(self):
+        alice = self.mirror.client('alice')
+
+        self.assertEqual((alice.inbound_id, alice.id, alice.sub_id, alice.up, alice.enable), (1, 'uuid-alice', 'sub-a', 10, True))
+        self.assertEqual(self.mirror.client_by_id('uuid-carol').email, 'carol')
+        self.assertEqual([client.email for client in self.mirror.clients_by_sub_id('sub-a')], ['alice', 'carol'])
+        self.assertEqual([client.email for client in self.mirror.clients_in_inbound(2)], ['carol', 'dave'])
+        self.assertEqual([client.email for client in self.mirror.clients_expiring(-10 ** 12, 1500)], ['alice'])
+        self.assertEqual(self.mirror.inbound(2).port, 1002)
+        self.assertIsNone(self.mirror.client('nobody'))
+        self.assertIsNone(self.mirror.inbound(3))
+
+    def test_only_changed_rows_are_written(self):
+        self.assertEqual(self.mirror.sync(self.panel).changed, 0)
+
+        self.panel.inbounds[0] = inbound(1, [('alice', 'sub-a', 1000, 15)])
+        result = self.mirror.sync(self.panel)
+
+        self.assertEqual((result.inserted, result.updated, result.deleted), (0, 1, 2))
+        self.assertEqual(self.mirror.client('alice').up, 15)
+        self.assertIsNone(self.mirror.client('bob'))
+
+    def test_failed_sync_keeps_the_mirror(self):
+        self.panel.inbounds = [inbound(1, []), inbound(2, [])]
+        self.panel.fail = True
+
+        with self.assertRaises(ClientError):
+            self.mirror.sync(self.panel)
+
+        self.assertEqual(len(self.mirror.clients_in_inbound(1)), 2)
+        self.panel.fail = False
+        self.assertEqual(self.mirror.sync(self.panel).deleted, 8)
+
+    def test_trojan_clients_are_found_by_password(self):
+        item = inbound(3, [('erin', 'sub-e', 0, 0)], protocol='trojan')
+        settings = json.loads(item['settings'])
+        settings['clients'][0]['password'] = settings['clients'][0].pop('id')
+        item['settings'] = json.dumps(settings)
+
+        self.mirror.load(PANEL + [item])
+
+        self.assertEqual(self.mirror.client_by_id('uuid-erin').email, 'erin')
+
+    def test_structured_fields_are_stored_as_json(self):
+        item = inbound(3, [('erin', 'sub-e', 0, 0)])
+        settings = json.loads(item['settings'])
+        settings['clients'][0].update(tgId=[1, 2], comment={'note': 'vip'})
+        item['settings'] = json.dumps(settings)
+
+        self.mirror.load(PANEL + [item])
+        erin = self.mirror.client('erin')
+
+        self.assertEqual((json.loads(erin.tg_id), json.loads(erin.comment)), ([1, 2], {'note': 'vip'}))
+        self.assertEqual(self.mirror.load(PANEL + [item]).changed, 0)
+
+
+class PanelMirrorFileTest(unittest.TestCase):
+
+    def test_reopened_mirror_keeps_rows_and_writes_only_changes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'panel.db')
+            with PanelMirror(path) as mirror:
+                mirror.load(PANEL)
+
+            with PanelMirror(path) as mirror:
+                self.assertEqual(mirror.client('bob').expiry_time, 2000)
+                self.assertEqual(mirror.load(PANEL).changed, 0)
+
+
+class PanelMirrorAsyncTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_sync_async(self):
+        with PanelMirror() as mirror:
+            result = await mirror.sync_async(AsyncFakePanel(PANEL))
+
+            self.assertEqual(result.inserted, 10)
+            self.assertEqual(mirror.client('dave').inbound_id, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
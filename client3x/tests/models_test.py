@@ -0,0 +1,79 @@
+import json
+import unittest
+
+from client3x.client3x import PanelResponse, Inbound, InboundClient, ClientTraffic
+
+
+CLIENT = {'id': 'uuid-1', 'flow': 'xtls-rprx-vision', 'email': 'user1', 'limitIp': 2, 'totalGB': 0,
+          'expiryTime': 1700000000000, 'enable': True, 'tgId': '', 'subId': 'sub1', 'comment': '', 'reset': 0}
+STAT = {'id': 7, 'inboundId': 1, 'enable': True, 'email': 'user1', 'up': 10, 'down': 20, 'expiryTime': 0,
+        'total': 0, 'reset': 0, 'lastOnline': 0}
+INBOUND = {'id': 1, 'up': 0, 'down': 0, 'total': 0, 'remark': 'main', 'enable': True, 'expiryTime': 0,
+           'listen': '', 'port': 443, 'protocol': 'vless', 'tag': 'inbound-443',
+           'settings': json.dumps({'clients': [CLIENT], 'decryption': 'none'}),
+           'streamSettings': '{}', 'sniffing': '{}', 'allocate': '{}', 'clientStats': [STAT]}
+
+
+class ModelsTest(unittest.TestCase):
+
+    def test_client_round_trip_keeps_unknown_keys(self):
+        data = dict(CLIENT, security='auto')
+
+        client = InboundClient.from_json(data)
+
+        self.assertEqual((client.id, client.email, client.limit_ip, client.sub_id), ('uuid-1', 'user1', 2, 'sub1'))
+        self.assertEqual(client.extra, {'security': 'auto'})
+        self.assertEqual(client.to_json(), data)
+
+    def test_traffic_round_trip(self):
+        traffic = ClientTraffic.from_json(STAT)
+
+        self.assertEqual((traffic.inbound_id, traffic.up, traffic.down), (1, 10, 20))
+        self.assertIsNone(traffic.extra)
+        self.assertEqual(traffic.to_json(), STAT)
+
+    def test_inbound_and_its_clients(self):
+        inbound = Inbound.from_json(INBOUND)
+
+        self.assertEqual(inbound.stream_settings, {})
+        self.assertEqual(inbound.client_stats, [ClientTraffic.from_json(STAT)])
+        self.assertEqual(inbound.clients(), [InboundClient.from_json(CLIENT)])
+
+        data = inbound.to_json()
+        self.assertEqual(json.loads(data.pop('settings')), json.loads(INBOUND['settings']))
+        self.assertEqual(data, {key: value for key, value in INBOUND.items() if key != 'settings'})
+
+    def test_nested_fields_are_decoded_on_first_access(self):
+        inbound = Inbound.from_json(INBOUND)
+
+        self.assertIsNone(inbound._settings)
+        self.assertIs(inbound.settings, inbound.settings)
+        self.assertEqual(inbound.settings['decryption'], 'none')
+        self.assertIsNone(inbound._sniffing)
+        self.assertEqual(inbound.raw_settings, INBOUND['settings'])
+
+    def test_changes_to_decoded_fields_are_encoded(self):
+        inbound = Inbound.from_json(INBOUND)
+
+        inbound.settings['clients'].append(dict(CLIENT, email='user2'))
+        data = inbound.to_json()
+
+        self.assertEqual([client['email'] for client in json.loads(data['settings'])['clients']], ['user1', 'user2'])
+        self.assertEqual(data['streamSettings'], '{}')
+
+    def test_models_have_no_instance_dict(self):
+        for model in (Inbound(), InboundClient(), ClientTraffic()):
+            self.assertFalse(hasattr(model, '__dict__'))
+
+    def test_panel_response_as_model(self):
+        listed = PanelResponse({'success': True, 'msg': '', 'obj': [INBOUND, INBOUND]})
+        single = PanelResponse({'success': True, 'msg': '', 'obj': STAT})
+        failed = PanelResponse({'success': False, 'msg': 'not found', 'obj': None})
+
+        self.assertEqual([inbound.id for inbound in listed.as_model(Inbound)], [1, 1])
+        self.assertEqual(single.as_model(ClientTraffic).email, 'user1')
+        self.assertIsNone(failed.as_model(Inbound))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import json
+import unittest
+
+from client3x.client3x import CLientPayload, BulkClientPayload, ClientPayloadTemplate, Payload
+
+
+class PayloadCacheTest(unittest.TestCase):
+
+    def test_format_is_not_cached_by_default(self):
+        payload = Payload({'settings': {'clients': []}})
+
+        self.assertIsNot(payload.format(), payload.format())
+
+    def test_cached_format_until_data_changes(self):
+        payload = Payload({'settings': {'clients': []}}, cache_format=True)
+        first = payload.format()
+
+        self.assertIs(payload.format(), first)
+
+        payload.data['settings']['clients'].append({'id': 'a'})
+        payload.invalidate()
+        self.assertEqual(json.loads(payload.format()['settings']), {'clients': [{'id': 'a'}]})
+
+        payload.data = {'settings': {'clients': []}}
+        self.assertEqual(payload.format()['settings'], '{"clients":[]}')
+
+    def test_changes_in_place_are_detected(self):
+        payload = Payload({'inbound': 1, 'settings': {'clients': [{'id': 'a', 'expiryTime': 100}]}}, cache_format=True)
+        payload.format()
+
+        payload.data['settings']['clients'][0]['expiryTime'] = 999
+
+        self.assertEqual(json.loads(payload.format()['settings'])['clients'][0]['expiryTime'], 999)
+        self.assertIs(payload.format(), payload.format())
+
+
+class ClientPayloadTemplateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.template = ClientPayloadTemplate(3, limitip=2, expiry_time=1700000000000, additional_fields={'tgId': ''})
+
+    def test_payload_matches_client_payload(self):
+        expected = CLientPayload(3, 'uuid-1', 'user1', 2, 1700000000000, 'sub1', additional_fields={'tgId': ''})
+
+        payload = self.template.payload('uuid-1', 'user1', 'sub1')
+
+        self.assertEqual(payload.data, expected.data)
+        self.assertEqual(payload.format()['inbound'], 3)
+        self.assertEqual(json.loads(payload.format()['settings']), json.loads(expected.format()['settings']))
+
+    def test_values_are_escaped(self):
+        payload = self.template.payload('uuid-"1"', 'user\\1\n', 'пользователь')
+
+        client = json.loads(payload.format()['settings'])['clients'][0]
+
+        self.assertEqual((client['id'], client['email'], client['subId']), ('uuid-"1"', 'user\\1\n', 'пользователь'))
+
+    def test_bulk_chunks_use_prerendered_clients(self):
+        clients = [(f'uuid-{i}', f'user{i}', f'sub{i}') for i in range(5)]
+
+        payload = self.template.bulk(clients)
+        chunks = list(payload.chunks(2))
+
+        self.assertEqual(len(payload), 5)
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        for chunk in chunks:
+            self.assertEqual(json.loads(chunk.format()['settings']), {'clients': chunk.clients})
+            self.assertIs(chunk.format(), chunk.format())
+
+    def test_payload_edited_in_place_is_formatted_from_data(self):
+        payload = self.template.payload('uuid-1', 'user1', 'sub1')
+        cached = payload.format()
+
+        payload.data['settings']['clients'][0]['expiryTime'] = 999
+
+        formatted = payload.format()
+        self.assertIsNot(formatted, cached)
+        self.assertEqual(json.loads(formatted['settings']), {'clients': [payload.data['settings']['clients'][0]]})
+        self.assertEqual(json.loads(formatted['settings'])['clients'][0]['expiryTime'], 999)
+
+    def test_bulk_edited_in_place_renders_changed_clients(self):
+        payload = self.template.bulk([(f'uuid-{i}', f'user{i}', f'sub{i}') for i in range(3)])
+        payload.format()
+
+        payload.clients[1]['enable'] = False
+        self.assertEqual(json.loads(payload.format()['settings']), {'clients': payload.clients})
+
+        payload.clients.append(self.template.client('uuid-3', 'user3', 'sub3'))
+        self.assertEqual(json.loads(payload.format()['settings']), {'clients': payload.clients})
+
+    def test_chunks_see_changes_in_place(self):
+        payload = self.template.bulk([(f'uuid-{i}', f'user{i}', f'sub{i}') for i in range(4)])
+        payload.clients[3]['limitIp'] = 7
+
+        chunks = list(payload.chunks(2))
+
+        self.assertEqual(json.loads(chunks[1].format()['settings'])['clients'][1]['limitIp'], 7)
+
+    def test_invalidated_bulk_is_formatted_from_data(self):
+        payload = self.template.bulk([('uuid-1', 'user1', 'sub1')])
+        payload.clients[0]['email'] = 'renamed'
+        payload.invalidate()
+
+        self.assertEqual(json.loads(payload.format()['settings'])['clients'][0]['email'], 'renamed')
+
+    def test_per_client_fields_can_not_be_shared(self):
+        with self.assertRaises(ValueError):
+            ClientPayloadTemplate(1, additional_fields={'email': 'x'})
+
+    def test_plain_bulk_payload_is_unchanged(self):
+        payload = BulkClientPayload(1, [{'id': 'a'}])
+
+        self.assertEqual(payload.format(), {'inbound': 1, 'settings': '{"clients":[{"id":"a"}]}'})
+
+
+if __name__ == '__main__':
+    unittest.main()
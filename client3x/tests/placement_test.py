@@ -0,0 +1,80 @@
+import unittest
+from collections import Counter
+
+from client3x.client3x import AsyncFleetClient, Placement, PlacementTarget
+
+
+KEYS = [f'user{i}@example.com' for i in range(20000)]
+
+
+def placement(panels=4, **weights):
+    result = Placement()
+    for i in range(panels):
+        result.add(f'panel{i}', 1, weights.get(f'panel{i}', 1.0))
+    return result
+
+
+class PlacementTest(unittest.TestCase):
+
+    def test_locate_is_stable(self):
+        first, second = placement(), placement()
+
+        self.assertEqual([first.locate(key) for key in KEYS[:100]], [second.locate(key) for key in KEYS[:100]])
+        self.assertEqual(first.locate(123456789), first.locate('123456789'))
+        self.assertEqual(placement().locate('user1@example.com'), PlacementTarget('panel2', 1))
+
+    def test_keys_follow_weights(self):
+        counts = Counter(target.panel for target in map(placement(panel0=2.0).locate, KEYS))
+
+        self.assertAlmostEqual(counts['panel0'] / len(KEYS), 0.4, delta=0.05)
+        for panel in ('panel1', 'panel2', 'panel3'):
+            self.assertAlmostEqual(counts[panel] / len(KEYS), 0.2, delta=0.05)
+
+    def test_removing_a_panel_moves_only_its_keys(self):
+        ring = placement(panels=10)
+        before = {key: ring.locate(key) for key in KEYS}
+
+        ring.remove_panel('panel3')
+        moved = [key for key in KEYS if ring.locate(key) != before[key]]
+
+        self.assertTrue(all(before[key].panel == 'panel3' for key in moved))
+        self.assertAlmostEqual(len(moved) / len(KEYS), 0.1, delta=0.03)
+
+    def test_adding_an_inbound_moves_keys_only_to_it(self):
+        ring = placement(panels=10)
+        before = {key: ring.locate(key) for key in KEYS}
+
+        new = ring.add('panel0', 2)
+        moved = [key for key in KEYS if ring.locate(key) != before[key]]
+
+        self.assertTrue(all(ring.locate(key) == new for key in moved))
+        self.assertAlmostEqual(len(moved) / len(KEYS), 1 / 11, delta=0.03)
+
+    def test_errors(self):
+        with self.assertRaises(LookupError):
+            Placement().locate('user@example.com')
+        with self.assertRaises(ValueError):
+            Placement().add('panel', 1, weight=0)
+        with self.assertRaises(KeyError):
+            placement().remove('panel9', 1)
+
+
+class FleetPlacementTest(unittest.TestCase):
+
+    def test_fleet_locates_the_client_of_the_panel(self):
+        clients = {'de': object(), 'nl': object()}
+        ring = Placement()
+        ring.add('de', 1)
+        ring.add('nl', 2)
+        fleet = AsyncFleetClient(clients, placement=ring)
+
+        for key in KEYS[:50]:
+            target = ring.locate(key)
+            self.assertEqual(fleet.locate(key), (clients[target.panel], target.inbound_id))
+
+        with self.assertRaises(ValueError):
+            AsyncFleetClient(clients).locate('user@example.com')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+
+from client3x.client3x import AsyncClient3XUI, RateLimiter, TokenBucket
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_burst_then_sustained_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, burst=3, clock=clock)
+
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0, 0, 0])
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0.5, 1.0, 1.5])
+
+    def test_tokens_refill_up_to_burst(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, burst=2, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+
+        clock.now = 100
+        waits = [bucket.reserve() for _ in range(3)]
+
+        self.assertEqual(waits[:2], [0, 0])
+        self.assertAlmostEqual(waits[2], 0.1)
+
+    def test_stats(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, burst=1, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+        bucket.reserve()
+
+        stats = bucket.stats()
+
+        self.assertEqual(stats['acquired'], 3)
+        self.assertEqual(stats['max_wait'], 2)
+        self.assertEqual(stats['total_wait'], 3)
+        self.assertEqual(stats['queue_depth'], 0)
+
+    def test_waiting_callers_are_counted(self):
+        bucket = TokenBucket(rate=20, burst=1)
+
+        async def run():
+            tasks = [asyncio.create_task(bucket.acquire_async()) for _ in range(4)]
+            await asyncio.sleep(0.01)
+            depth = bucket.stats()['queue_depth']
+            await asyncio.gather(*tasks)
+            return depth
+
+        self.assertEqual(asyncio.run(run()), 3)
+        self.assertEqual(bucket.stats()['queue_depth'], 0)
+
+    def test_invalid_limits(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0, burst=1)
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=1, burst=0)
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def make_client(self, host, limiter):
+        return AsyncClient3XUI('admin', 'admin', '', host, 'root', host, 'sub', 1, rate_limiter=limiter)
+
+    def test_clients_of_one_panel_share_the_limiter(self):
+        limiter = RateLimiter()
+        first = self.make_client('panel-a.local', limiter)
+        second = self.make_client('panel-a.local', RateLimiter())
+        other = self.make_client('panel-b.local', RateLimiter())
+
+        self.assertIs(first.rate_limiter, limiter)
+        self.assertIs(second.rate_limiter, limiter)
+        self.assertIsNot(other.rate_limiter, limiter)
+
+    def test_reads_and_writes_have_separate_buckets(self):
+        clock = FakeClock()
+        limiter = RateLimiter(reads_per_second=1, read_burst=1, writes_per_second=1, write_burst=1, clock=clock)
+
+        limiter.buckets[RateLimiter.WRITE].reserve()
+
+        self.assertEqual(limiter.buckets[RateLimiter.READ].reserve(), 0)
+        self.assertEqual(limiter.buckets[RateLimiter.WRITE].reserve(), 1)
+
+    def test_no_limiter_by_default(self):
+        self.assertIsNone(self.make_client('panel-c.local', None).rate_limiter)
+
+
+if __name__ == '__main__':
+    unittest.main()
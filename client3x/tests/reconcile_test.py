@@ -0,0 +1,148 @@
+import unittest
+
+from client3x.client3x import (AsyncClient3XUI, Client3XUI, CLientPayload, BulkAddResult, ChunkResult, FakePanel,
+                               PanelResponse, codec, plan_clients)
+
+
+def client(index, **fields):
+    settings = {'id': f'id-{index}', 'email': f'user{index}@example.com', 'enable': True, 'limitIp': 0,
+                'expiryTime': 0, 'subId': f'sub-{index}'}
+    settings.update(fields)
+    return settings
+
+
+class PlanClientsTest(unittest.TestCase):
+
+    def test_minimal_plan(self):
+        current = [client(0), client(1), client(2, created_at=1), client(3)]
+        desired = [client(1, limitIp=2), client(2), client(4)]
+
+        plan = plan_clients(1, current, desired)
+
+        self.assertEqual(plan.add, [client(4)])
+        self.assertEqual(plan.update, [('id-1', client(1, limitIp=2))])
+        self.assertEqual(sorted(plan.delete), ['id-0', 'id-3'])
+        self.assertEqual((plan.unchanged, plan.changes), (1, 4))
+
+    def test_update_keeps_fields_left_out(self):
+        current = [client(0, comment='vip', created_at=1)]
+
+        plan = plan_clients(1, current, [{'email': 'user0@example.com', 'enable': False}])
+
+        self.assertEqual(plan.update, [('id-0', client(0, comment='vip', created_at=1, enable=False))])
+
+    def test_current_clients_without_the_key_are_skipped(self):
+        current = [client(0), {'id': 'id-1', 'enable': True}, {'id': 'id-2', 'email': ''}]
+
+        plan = plan_clients(1, current, [client(3)])
+
+        self.assertEqual((plan.add, plan.delete, plan.skipped), ([client(3)], ['id-0'], 2))
+
+    def test_key_by_id_and_trojan_password(self):
+        current = [{'password': 'secret', 'email': 'old@example.com'}]
+
+        plan = plan_clients(1, current, [{'password': 'secret', 'email': 'new@example.com'}], key='password',
+                           protocol='trojan')
+
+        self.assertEqual(plan.update, [('secret', {'password': 'secret', 'email': 'new@example.com'})])
+        self.assertEqual(plan_clients(1, [client(0)], [client(0, email='renamed')], key='id').update,
+                         [('id-0', client(0, email='renamed'))])
+
+    def test_shadowsocks_clients_are_addressed_by_email(self):
+        current = [{'password': 'pw1', 'email': 'a@x', 'enable': True}, {'password': 'pw2', 'email': 'b@x'}]
+
+        plan = plan_clients(1, current, [{'email': 'a@x', 'enable': False}], protocol='shadowsocks')
+
+        self.assertEqual(plan.update, [('a@x', {'password': 'pw1', 'email': 'a@x', 'enable': False})])
+        self.assertEqual(plan.delete, ['b@x'])
+
+    def test_payloads_are_accepted(self):
+        payload = CLientPayload(1, 'id-0', 'user0@example.com', 0, 0, 'sub-0')
+
+        plan = plan_clients(1, [], [payload])
+
+        self.assertEqual(plan.add, [payload.data['settings']['clients'][0]])
+
+    def test_invalid_desired_clients(self):
+        with self.assertRaises(ValueError):
+            plan_clients(1, [], [client(0), client(0)])
+        with self.assertRaises(ValueError):
+            plan_clients(1, [], [{'id': 'no-email'}])
+
+
+class AsyncReconcileClientsTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.panel = AsyncClient3XUI('admin', 'admin', '', '127.0.0.1', 'root', '127.0.0.1', 'sub', 1)
+        self.current = [client(0), client(1)]
+        self.calls = []
+
+        async def get_inbound(inbound_id=None):
+            self.calls.append(('get', inbound_id))
+            settings = codec.dumps({'clients': self.current})
+            return PanelResponse({'success': True, 'msg': '', 'obj': {'protocol': 'vless', 'settings': settings}})
+
+        async def delete_client(client_id, inbound_id=None):
+            self.calls.append(('delete', client_id, inbound_id))
+
+        async def update_client(client_id, payload):
+            self.calls.append(('update', client_id, payload.data['settings']['clients'][0]['limitIp']))
+            return ''
+
+        async def add_clients_bulk(payload, chunk_size=100):
+            emails = [item['email'] for item in payload.clients]
+            self.calls.append(('add', emails, chunk_size))
+            return BulkAddResult([''] * len(emails), [ChunkResult(0, 0, emails, True, 200)])
+
+        self.panel.get_inbound = get_inbound
+        self.panel.delete_client = delete_client
+        self.panel.update_client = update_client
+        self.panel.add_clients_bulk = add_clients_bulk
+
+    async def test_plan_is_executed_deletes_first(self):
+        result = await self.panel.reconcile_clients([client(1, limitIp=3), client(2)], chunk_size=50)
+
+        self.assertTrue(result.success)
+        self.assertEqual(self.calls, [('get', 1), ('delete', 'id-0', 1), ('update', 'id-1', 3),
+                                      ('add', ['user2@example.com'], 50)])
+        self.assertEqual([item.ok for item in result.deleted + result.updated], [True, True])
+
+    async def test_dry_run_does_not_write(self):
+        result = await self.panel.reconcile_clients([client(1)], inbound_id=4, dry_run=True)
+
+        self.assertEqual(self.calls, [('get', 4)])
+        self.assertEqual(result.plan.changes, 1)
+        self.assertIsNone(result.deleted)
+
+    async def test_failed_writes_are_reported(self):
+        async def delete_client(client_id, inbound_id=None):
+            raise RuntimeError('panel down')
+
+        self.panel.delete_client = delete_client
+
+        result = await self.panel.reconcile_clients([client(1)])
+
+        self.assertFalse(result.success)
+        self.assertIsInstance(result.deleted[0].error, RuntimeError)
+
+
+class ShadowsocksReconcileTest(unittest.TestCase):
+
+    def test_updates_and_deletes_reach_the_panel(self):
+        with FakePanel() as panel:
+            inbound_id = panel.populate(1, 3, protocol='shadowsocks')[0]
+            client = Client3XUI(**panel.client_kwargs(inbound_id))
+            desired = [dict(panel.client('user0@example.com'), limitIp=2), panel.client('user1@example.com')]
+
+            result = client.reconcile_clients(desired)
+
+            self.assertTrue(result.success)
+            self.assertEqual(result.plan.update[0][0], 'user0@example.com')
+            self.assertEqual(result.plan.delete, ['user2@example.com'])
+            self.assertEqual(panel.client('user0@example.com')['limitIp'], 2)
+            self.assertIsNone(panel.client('user2@example.com'))
+            self.assertEqual(panel.client_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import asyncio
+import unittest
+
+from client3x.client3x import AsyncClient3XUI, RetryPolicy, CircuitBreaker, CircuitOpenError, FakePanel
+
+
+class RetryPolicyTest(unittest.TestCase):
+
+    def test_backoff_doubles_up_to_max(self):
+        policy = RetryPolicy(backoff_base=0.1, backoff_max=0.5, jitter=False)
+
+        self.assertEqual([policy.backoff(attempt) for attempt in range(1, 6)], [0.1, 0.2, 0.4, 0.5, 0.5])
+
+    def test_jitter_stays_below_backoff(self):
+        policy = RetryPolicy(backoff_base=1, backoff_max=8)
+
+        delays = [policy.backoff(3) for _ in range(200)]
+
+        self.assertTrue(all(0 <= delay <= 4 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+    def test_attempts_and_elapsed_time_are_bounded(self):
+        policy = RetryPolicy(max_attempts=3, backoff_base=1, jitter=False, max_elapsed=10)
+
+        self.assertEqual(policy.next_delay(1, 0, True, True), 1)
+        self.assertIsNone(policy.next_delay(3, 0, True, True))
+        self.assertIsNone(policy.next_delay(2, 8.5, True, True))
+
+    def test_non_idempotent_requests_retry_only_when_not_sent(self):
+        policy = RetryPolicy(jitter=False)
+
+        self.assertIsNone(policy.next_delay(1, 0, idempotent=False, sent=True))
+        self.assertIsNotNone(policy.next_delay(1, 0, idempotent=False, sent=False))
+        self.assertIsNotNone(RetryPolicy(retry_non_idempotent=True).next_delay(1, 0, idempotent=False, sent=True))
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=10, clock=lambda: self.now)
+
+    def fail(self, times):
+        for _ in range(times):
+            self.breaker.before_call()
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.fail(2)
+        self.breaker.before_call()
+        self.breaker.record_success()
+        self.fail(2)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+        self.fail(1)
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError) as error:
+            self.breaker.before_call()
+        self.assertEqual(error.exception.retry_after, 10)
+
+    def test_half_open_lets_one_probe_through(self):
+        self.fail(3)
+        self.now = 10
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.breaker.before_call()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.breaker.before_call()
+
+    def test_failed_probe_opens_again(self):
+        self.fail(3)
+        self.now = 10
+        self.breaker.before_call()
+
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.now = 19
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+    def test_released_probe_lets_the_next_probe_through(self):
+        self.fail(3)
+        self.now = 10
+        self.breaker.before_call()
+
+        self.breaker.release_probe()
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.breaker.before_call()
+
+
+class CancelledProbeTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_cancelled_probe_does_not_block_the_breaker(self):
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10, clock=lambda: now[0])
+        breaker.before_call()
+        breaker.record_failure()
+        now[0] = 10
+
+        async with FakePanel(latency=1.0) as panel:
+            panel.populate(1, 1)
+            async with AsyncClient3XUI(**panel.client_kwargs(circuit_breaker=breaker, coalesce=False)) as client:
+                with self.assertRaises(asyncio.TimeoutError):
+                    await asyncio.wait_for(client.get_client_traffic('user1@example.com'), 0.05)
+
+                panel.latency = 0.0
+                response = await client.get_client_traffic('user1@example.com')
+
+        self.assertTrue(response.success)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import unittest
+
+from client3x.client3x import ExpiryScheduler, CLientPayload
+
+
+DAY = 86400
+
+
+def client(index, expiry_time, **fields):
+    settings = {'id': f'id-{index}', 'email': f'user{index}', 'enable': True, 'expiryTime': expiry_time,
+                'subId': f'sub-{index}'}
+    settings.update(fields)
+    return settings
+
+
+class FakePanel:
+
+    def __init__(self):
+        self.calls = []
+        self.logger = None
+
+    async def update_client(self, client_id, payload):
+        self.calls.append(('update', client_id, payload.data['inbound'], dict(payload.data['settings']['clients'][0])))
+        return ''
+
+    async def delete_client(self, client_id, inbound_id=None):
+        self.calls.append(('delete', client_id, inbound_id))
+
+
+class ExpirySchedulerTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.now = 1000 * DAY
+        self.panel = FakePanel()
+        self.events = []
+
+    def scheduler(self, **kwargs):
+        kwargs.setdefault('on_warning', self.events.append)
+        kwargs.setdefault('on_expired', self.events.append)
+        return ExpiryScheduler(self.panel, clock=lambda: self.now, **kwargs)
+
+    def at(self, seconds):
+        return int((self.now + seconds) * 1000)
+
+    async def test_warnings_then_disable(self):
+        scheduler = self.scheduler(warn_before=(DAY, 3600))
+        scheduler.track(1, client(0, self.at(2 * DAY)))
+
+        self.assertEqual(scheduler.next_due(), self.at(DAY))
+        self.now += DAY
+        self.assertEqual([(event.kind, event.warn_before) for event in await scheduler.run_due()], [('warning', DAY)])
+        self.assertEqual(await scheduler.run_due(), [])
+
+        self.now += DAY
+        events = await scheduler.run_due()
+
+        self.assertEqual([(event.kind, event.warn_before) for event in events], [('warning', 3600), ('expired', None)])
+        self.assertEqual(self.panel.calls, [('update', 'id-0', 1, client(0, self.at(0), enable=False))])
+        self.assertEqual((scheduler.tracked, scheduler.next_due()), (0, None))
+        self.assertEqual(len(self.events), 3)
+
+    async def test_delete_and_renew(self):
+        deleting = self.scheduler(action='delete')
+        deleting.track(2, client(0, self.at(10)))
+        renewing = self.scheduler(action='renew', renew_period=DAY)
+        renewing.track(3, client(1, self.at(10)))
+
+        self.now += 10
+        await deleting.run_due()
+        await renewing.run_due()
+
+        self.assertEqual(self.panel.calls[0], ('delete', 'id-0', 2))
+        self.assertEqual(self.panel.calls[1][3]['expiryTime'], self.at(DAY))
+        self.assertEqual((renewing.tracked, renewing.next_due()), (1, self.at(DAY)))
+
+    async def test_changes_are_incremental(self):
+        scheduler = self.scheduler(action=None)
+        scheduler.track(1, client(0, self.at(10)))
+        scheduler.track(1, client(1, self.at(20)))
+        scheduler.track(1, client(0, self.at(30)))
+        scheduler.forget('user1')
+        scheduler.track_payload(CLientPayload(1, 'id-2', 'user2', 0, self.at(5), 'sub-2', enable=False))
+        scheduler.track(1, client(3, 0))
+
+        self.now += 25
+        self.assertEqual(await scheduler.run_due(), [])
+        self.assertEqual(scheduler.next_due(), self.at(5))
+        self.now += 5
+        self.assertEqual([event.email for event in await scheduler.run_due()], ['user0'])
+
+    async def test_load_and_failed_action(self):
+        async def fail(client_id, payload):
+            raise RuntimeError('panel down')
+
+        self.panel.update_client = fail
+        scheduler = self.scheduler()
+        inbounds = [{'id': 4, 'settings': json.dumps({'clients': [client(0, self.at(-1)), client(1, self.at(60))]})}]
+
+        self.assertEqual(scheduler.load(inbounds), 2)
+        events = await scheduler.run_due()
+
+        self.assertEqual([event.email for event in events], ['user0'])
+        self.assertIsInstance(events[0].error, RuntimeError)
+
+    async def test_failed_renewal_is_retried(self):
+        failures = [RuntimeError('panel down')] * 2
+        update_client = self.panel.update_client
+
+        async def flaky(client_id, payload):
+            if failures:
+                raise failures.pop()
+            return await update_client(client_id, payload)
+
+        self.panel.update_client = flaky
+        scheduler = self.scheduler(action='renew', renew_period=DAY, retry_delay=60)
+        scheduler.track(1, client(0, self.at(10)))
+
+        self.now += 10
+        events = await scheduler.run_due()
+        self.assertIsInstance(events[0].error, RuntimeError)
+        self.assertEqual(scheduler.next_due(), self.at(60))
+
+        self.now += 60
+        self.assertIsInstance((await scheduler.run_due())[0].error, RuntimeError)
+        self.assertEqual(scheduler.next_due(), self.at(120))
+        # tracking the unchanged client again keeps the pending retry
+        scheduler.track(1, client(0, self.at(-60)))
+        self.assertEqual(scheduler.next_due(), self.at(120))
+
+        self.now += 120
+        events = await scheduler.run_due()
+        self.assertEqual([event.error for event in events], [None])
+        self.assertEqual(self.panel.calls, [('update', 'id-0', 1, client(0, self.at(DAY - 180)))])
+        self.assertEqual((scheduler.tracked, scheduler.next_due()), (1, self.at(DAY - 180)))
+
+    async def test_actions_address_clients_by_protocol(self):
+        scheduler = self.scheduler(action='delete')
+        shadowsocks = {'password': 'pw1', 'email': 'a@x', 'enable': True, 'expiryTime': self.at(10)}
+        scheduler.load([{'id': 5, 'protocol': 'shadowsocks', 'settings': json.dumps({'clients': [shadowsocks]})}])
+        scheduler.track(6, {'password': 'pw2', 'email': 'b@x', 'enable': True, 'expiryTime': self.at(10)}, 'trojan')
+
+        self.now += 10
+        await scheduler.run_due()
+
+        self.assertEqual(self.panel.calls, [('delete', 'a@x', 5), ('delete', 'pw2', 6)])
+
+    async def test_failing_hooks_do_not_stop_the_scheduler(self):
+        def fail(event):
+            if event.email == 'user0':
+                raise RuntimeError('hook failed')
+            self.events.append(event)
+
+        scheduler = self.scheduler(action='delete', warn_before=(5,), on_warning=fail, on_expired=fail)
+        scheduler.track(1, client(0, self.at(10)))
+        scheduler.track(1, client(1, self.at(20)))
+
+        self.now += 20
+        events = await scheduler.run_due()
+
+        self.assertEqual([(event.kind, event.email) for event in events],
+                         [('warning', 'user0'), ('expired', 'user0'), ('warning', 'user1'), ('expired', 'user1')])
+        self.assertEqual([event.email for event in self.events], ['user1', 'user1'])
+        self.assertEqual(self.panel.calls, [('delete', 'id-0', 1), ('delete', 'id-1', 1)])
+        self.assertEqual((scheduler.tracked, scheduler.fired), (0, 4))
+
+    async def test_run_wakes_for_earlier_clients(self):
+        self.now = 0
+        scheduler = ExpiryScheduler(self.panel, action='delete')
+        task = asyncio.create_task(scheduler.run())
+        scheduler.track(1, client(0, 10 ** 15))
+        await asyncio.sleep(0.01)
+
+        loop = asyncio.get_running_loop()
+        scheduler.clock = loop.time
+        scheduler.track(1, client(1, int((loop.time() + 0.05) * 1000)))
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+        self.assertEqual(self.panel.calls, [('delete', 'id-1', 1)])
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            ExpiryScheduler(self.panel, action='archive')
+        with self.assertRaises(ValueError):
+            ExpiryScheduler(self.panel, action='renew', renew_period=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
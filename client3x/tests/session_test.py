@@ -0,0 +1,125 @@
+import asyncio
+import gc
+import unittest
+import warnings
+
+from client3x.client3x import AsyncClient3XUI, FakePanel
+
+
+class AsyncSessionTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.panel = FakePanel()
+        await self.panel.start()
+        self.panel.populate(1, 10)
+
+    async def asyncTearDown(self):
+        await self.panel.close()
+
+    async def test_requests_reuse_one_session(self):
+        async with AsyncClient3XUI(**self.panel.client_kwargs()) as client:
+            session = client.session
+            for n in range(5):
+                await client.get_client_traffic(f'user{n}@example.com')
+            await client.get_inbounds()
+
+            self.assertIs(client.session, session)
+            self.assertEqual(len(session.connector._conns), 1)
+
+        self.assertEqual(self.panel.logins, 1)
+
+    async def test_close_releases_the_session(self):
+        client = AsyncClient3XUI(**self.panel.client_kwargs())
+        await client.get_inbounds()
+        session = client.session
+
+        await client.close()
+
+        self.assertTrue(session.closed)
+        self.assertTrue(session.connector is None or session.connector.closed)
+        self.assertIsNone(client.session)
+        await client.close()
+
+    async def test_session_is_reopened_after_close(self):
+        client = AsyncClient3XUI(**self.panel.client_kwargs())
+        await client.get_inbounds()
+        await client.close()
+
+        response = await client.get_inbounds()
+
+        self.assertTrue(response.success)
+        self.assertFalse(client.session.closed)
+        await client.close()
+
+    async def test_unclosed_client_drops_its_connections(self):
+        client = AsyncClient3XUI(**self.panel.client_kwargs())
+        await client.get_inbounds()
+        session, connector = client.session, client.session.connector
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            del client
+            gc.collect()
+            await asyncio.sleep(0)
+
+        self.assertTrue(session.closed)
+        self.assertTrue(connector.closed)
+        self.assertEqual([str(warning.message) for warning in caught if 'Unclosed' in str(warning.message)], [])
+        self.assertTrue(any('was not closed' in str(warning.message) for warning in caught))
+
+
+class EventLoopTest(unittest.TestCase):
+
+    def test_client_is_reused_by_a_new_event_loop(self):
+        with FakePanel() as panel:
+            panel.populate(1, 3)
+            client = AsyncClient3XUI(**panel.client_kwargs())
+
+            async def first():
+                await client.get_inbounds()
+                return client.session
+
+            async def second():
+                responses = await asyncio.gather(*(client.get_inbound(1) for _ in range(3)))
+                await client.close()
+                return responses
+
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                session = asyncio.run(first())
+                responses = asyncio.run(second())
+                gc.collect()
+
+            self.assertTrue(all(response.success for response in responses))
+            self.assertTrue(session.closed)
+            self.assertEqual(panel.logins, 2)
+            self.assertEqual([str(warning.message) for warning in caught if 'Unclosed' in str(warning.message)], [])
+
+    def test_client_cannot_share_a_running_loop(self):
+        with FakePanel() as panel:
+            client = AsyncClient3XUI(**panel.client_kwargs())
+            started, release = asyncio.Event(), None
+
+            async def hold():
+                nonlocal release
+                await client.get_inbounds()
+                release = asyncio.get_running_loop().create_future()
+                started.set()
+                await release
+
+            async def main():
+                task = asyncio.create_task(hold())
+                await started.wait()
+                try:
+                    with self.assertRaises(RuntimeError):
+                        await asyncio.to_thread(asyncio.run, client.get_inbounds())
+                finally:
+                    release.set_result(None)
+                    await task
+                    await client.close()
+
+            asyncio.run(main())
+
+
+if __name__ == '__main__':
+    unittest.main()
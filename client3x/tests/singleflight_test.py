@@ -0,0 +1,89 @@
+import asyncio
+import unittest
+
+from client3x.client3x import AsyncClient3XUI, FakePanel, InboundCache, SingleFlight
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_calls_share_one_result(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {'obj': calls}
+
+        results = await asyncio.gather(*(flight.do('inbounds', fetch) for _ in range(10)))
+
+        self.assertEqual(calls, 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual((flight.misses, flight.hits), (1, 9))
+        self.assertEqual(flight.in_flight, 0)
+
+    async def test_different_keys_and_later_calls_are_not_coalesced(self):
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0)
+            return object()
+
+        first, other = await asyncio.gather(flight.do('a', fetch), flight.do('b', fetch))
+        later = await flight.do('a', fetch)
+
+        self.assertIsNot(first, other)
+        self.assertIsNot(first, later)
+        self.assertEqual(flight.misses, 3)
+
+    async def test_errors_reach_every_caller(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError('panel down')
+
+        results = await asyncio.gather(*(flight.do('a', fail) for _ in range(3)), return_exceptions=True)
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(flight.misses, 1)
+
+    async def test_cancelled_caller_does_not_cancel_the_others(self):
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return 'done'
+
+        first = asyncio.create_task(flight.do('a', fetch))
+        second = asyncio.create_task(flight.do('a', fetch))
+        await asyncio.sleep(0.005)
+        first.cancel()
+
+        self.assertEqual(await second, 'done')
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+
+    async def test_coalescing_can_be_disabled(self):
+        client = AsyncClient3XUI('admin', 'admin', '', '127.0.0.1', 'root', '127.0.0.1', 'sub', 1, coalesce=False)
+
+        self.assertIsNone(client.single_flight)
+
+    async def test_coalesced_callers_get_their_own_results(self):
+        async with FakePanel(latency=0.01) as panel:
+            panel.populate(1, 2)
+            async with AsyncClient3XUI(**panel.client_kwargs(), cache=InboundCache()) as client:
+                first, second = await asyncio.gather(client.get_inbound(1), client.get_inbound(1))
+                first.obj['clientStats'].clear()
+                for response in (first, second):
+                    response.obj['remark'] = 'changed'
+                cached = await client.get_inbound(1)
+
+        self.assertEqual(client.single_flight.hits, 1)
+        self.assertEqual(len(second.obj['clientStats']), 2)
+        self.assertEqual(cached.obj['remark'], 'inbound-1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import unittest
+
+from client3x.client3x import ClientError
+from client3x.client3x.streaming import ArrayStream, iter_array, aiter_array
+
+
+def make_inbound(inbound_id):
+    settings = {'clients': [{'id': f'uuid-{inbound_id}', 'email': f'user"{inbound_id}\\', 'flow': '[{,}]'}]}
+    return {'id': inbound_id, 'remark': f'in {inbound_id} ]}}', 'settings': json.dumps(settings),
+            'clientStats': [{'email': f'user{inbound_id}', 'up': 1, 'down': 2}], 'port': [443, {'x': []}]}
+
+
+def make_body(inbounds, success=True, msg=''):
+    return json.dumps({'success': success, 'msg': msg, 'obj': inbounds}, ensure_ascii=False).encode()
+
+
+def split(body, size):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+class StreamingTest(unittest.TestCase):
+
+    def test_elements_match_full_decoding_for_any_chunking(self):
+        inbounds = [make_inbound(i) for i in range(5)]
+        body = make_body(inbounds)
+
+        for size in (1, 2, 3, 7, 64, len(body)):
+            self.assertEqual(list(iter_array(split(body, size))), inbounds, size)
+
+    def test_fields_are_projected(self):
+        body = make_body([make_inbound(1), make_inbound(2)])
+
+        result = list(iter_array(split(body, 5), fields=('id', 'clientStats')))
+
+        self.assertEqual(result, [{'id': 1, 'clientStats': [{'email': 'user1', 'up': 1, 'down': 2}]},
+                                  {'id': 2, 'clientStats': [{'email': 'user2', 'up': 1, 'down': 2}]}])
+
+    def test_unicode_and_scalar_elements(self):
+        body = make_body(['пользователь', 1, None, {'remark': 'тест'}])
+
+        self.assertEqual(list(iter_array(split(body, 1))), ['пользователь', 1, None, {'remark': 'тест'}])
+
+    def test_long_strings_with_backslashes_and_quotes(self):
+        inbounds = [{'settings': 'x' * 300 + '\\"' * 200 + '\\', 'path': 'C:\\'},
+                    {'settings': '"' * 500 + '\\\\' * 100, 'nested': [[['\\' * 301]]]}]
+        body = make_body(inbounds)
+
+        for size in (1, 2, 5, 97, len(body)):
+            self.assertEqual(list(iter_array(split(body, size))), inbounds, size)
+
+    def test_empty_list(self):
+        self.assertEqual(list(iter_array([b'{"success": true, "msg": "", "obj": [ ]}\n'])), [])
+
+    def test_elements_are_released_while_streaming(self):
+        stream = ArrayStream()
+        body = make_body([make_inbound(i) for i in range(3)])
+        first = body.index(b'}, {') + 2
+
+        self.assertEqual(len(stream.feed(body[:first])), 1)
+        self.assertEqual(len(stream.feed(body[first:])), 2)
+        self.assertTrue(stream.close()['success'])
+
+    def test_failure_raises_client_error(self):
+        with self.assertRaises(ClientError) as error:
+            list(iter_array([make_body(None, success=False, msg='no permission')], status=200))
+
+        self.assertEqual(error.exception.txt, 'no permission')
+
+    def test_truncated_body_raises_client_error(self):
+        body = make_body([make_inbound(1), make_inbound(2)])
+
+        with self.assertRaises(ClientError):
+            list(iter_array([body[:-20]]))
+
+    def test_async_iteration(self):
+        inbounds = [make_inbound(i) for i in range(3)]
+
+        async def chunks():
+            for chunk in split(make_body(inbounds), 11):
+                yield chunk
+
+        async def collect():
+            return [inbound async for inbound in aiter_array(chunks(), fields=['id'])]
+
+        self.assertEqual(asyncio.run(collect()), [{'id': 0}, {'id': 1}, {'id': 2}])
+
+
+if __name__ == '__main__':
+    unittest.main()